@@ -1,22 +1,34 @@
 """
 AdmissAI India — Flask entry point.
 
-Start:
+Start (development):
   python app.py
 
+Production: gunicorn -c gunicorn.conf.py wsgi:app (see wsgi.py).
+
 Requires .env in project root:
   GROQ_API_KEY=gsk_...
 """
 
 import os
-from flask import Flask, render_template
+from flask import Flask, Response, render_template, request, url_for
 from flask_cors import CORS
-from dotenv import load_dotenv
-
-load_dotenv()
 
 from routes.chat import chat_bp
 from routes.programs import programs_bp
+from routes.eligibility import eligibility_bp
+from routes.checklist import checklist_bp
+from routes.compress import compress_bp
+from routes.metrics import metrics_bp
+from routes.admin import admin_bp
+from services.http_client import get_api_key, pool_stats
+from services.admissions_data import catalog_info
+from services.response_cache import get_cache
+from services.scheduler import get_scheduler
+from services.admission import get_controller as get_admission
+from services import metrics
+from services.warmup import is_ready, readiness, warmup
+from services.http_cache import REVALIDATE, apply_static_headers, content_hash, static_hash
 
 
 def create_app() -> Flask:
@@ -31,21 +43,53 @@ def create_app() -> Flask:
 
     app.register_blueprint(chat_bp)
     app.register_blueprint(programs_bp)
+    app.register_blueprint(eligibility_bp)
+    app.register_blueprint(checklist_bp)
+    app.register_blueprint(compress_bp)
+    app.register_blueprint(metrics_bp)
+    app.register_blueprint(admin_bp)
+    metrics.init_app(app)
 
     @app.route("/api/health")
     def health():
-        key = os.getenv("GROQ_API_KEY", "")
+        key = get_api_key()
         has_key = bool(key and key.startswith("gsk_") and len(key) > 20)
+        cache = get_cache()
         return {
             "status": "ok",
             "service": "AdmissAI India",
             "groq_key_configured": has_key,
+            "catalog": catalog_info(),
+            "upstream_pool": pool_stats(),
+            "upstream_scheduler": get_scheduler().stats(),
+            "chat_admission": get_admission().stats(),
+            "chat_admission_async": get_admission(asynchronous=True).stats(),
+            "response_cache": cache.stats() if cache else None,
         }, 200
 
+    @app.route("/api/ready")
+    def ready():
+        """Readiness probe: 503 until warmup has finished."""
+        return readiness(), 200 if is_ready() else 503
+
+    @app.template_global()
+    def static_url(filename: str) -> str:
+        """/static/<filename>?v=<content hash>, cacheable as immutable."""
+        return url_for("static", filename=filename, v=static_hash(app.static_folder, filename))
+
+    @app.after_request
+    def static_cache_headers(resp):
+        if request.endpoint == "static":
+            return apply_static_headers(resp, request, app.static_folder, request.view_args["filename"])
+        return resp
+
     @app.route("/", defaults={"path": ""})
     @app.route("/<path:path>")
     def serve_spa(path):
-        return render_template("index.html")
+        resp = Response(render_template("index.html"), mimetype="text/html")
+        resp.set_etag(content_hash(resp.get_data()))
+        resp.headers["Cache-Control"] = REVALIDATE
+        return resp.make_conditional(request)
 
     return app
 
@@ -53,6 +97,7 @@ def create_app() -> Flask:
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 5000))
     app  = create_app()
+    warmup(app)
     key  = os.getenv("GROQ_API_KEY", "")
     if key and key.startswith("gsk_"):
         print(f"\n✅ GROQ_API_KEY loaded ({key[:12]}...)")
@@ -60,4 +105,4 @@ if __name__ == "__main__":
         print("\n⚠️  GROQ_API_KEY not found. Add it to your .env file.")
         print("   Get a free key at https://console.groq.com\n")
     print(f"🎓 AdmissAI India running at http://localhost:{port}\n")
-    app.run(host="0.0.0.0", port=port, debug=os.getenv("FLASK_DEBUG", "1") == "1")
\ No newline at end of file
+    app.run(host="0.0.0.0", port=port, debug=os.getenv("FLASK_DEBUG", "0") == "1")
\ No newline at end of file
@@ -0,0 +1,171 @@
+"""
+AdmissAI India — async serving mode (ASGI).
+
+/api/chat, /api/chat/stream and /api/compress are served natively on the
+event loop: Groq calls go through httpx.AsyncClient and wait without a
+thread, so thousands of chats can be in flight per process. Every other
+route is the regular Flask app, run through asgiref's WsgiToAsgi.
+
+app.py keeps working unchanged for local development.
+
+Run:
+  pip install -r requirements-async.txt
+  uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 2
+"""
+
+import json
+import time
+
+from asgiref.wsgi import WsgiToAsgi
+
+from app import create_app
+from routes.chat import program_context_for
+from services.admission import Overloaded
+from services.ai_service import chat_async, chat_stream_async
+from services.compression import compress_async, parse_query, parse_ratio
+from services.http_client import close_async_client
+from services.metrics import REQUEST_SECONDS
+from services.warmup import warmup
+from services.sessions import open_session, record_turn
+
+JSON_HEADERS = [(b"content-type", b"application/json"), (b"access-control-allow-origin", b"*")]
+SSE_HEADERS  = [
+    (b"content-type", b"text/event-stream"),
+    (b"cache-control", b"no-cache"),
+    (b"x-accel-buffering", b"no"),
+    (b"access-control-allow-origin", b"*"),
+]
+
+
+class AsyncApp:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi      = WsgiToAsgi(flask_app)
+        self.routes    = {
+            ("POST", "/api/chat"):        self.handle_chat,
+            ("POST", "/api/chat/stream"): self.handle_chat_stream,
+            ("POST", "/api/compress"):    self.handle_compress,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+
+        handler = self.routes.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if handler is None:
+            return await self.wsgi(scope, receive, send)
+
+        start  = time.perf_counter()
+        status = await handler(await _read_json(receive), send)
+        REQUEST_SECONDS.observe(time.perf_counter() - start, route=scope["path"], method="POST", status=status)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                warmup(self.flask_app)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await close_async_client()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    # ── Routes (same request/response shapes as routes/chat.py, routes/compress.py) ──
+    async def handle_chat(self, data: dict, send) -> int:
+        message = str(data.get("message", "")).strip()
+        if not message:
+            return await _send_json(send, 400, {"error": "message is required"})
+
+        session, history, summary = _conversation(data)
+        program_id = data.get("program_id")
+        context = program_context_for(message, program_id, data)
+        try:
+            result = await chat_async(message, history, context, summary, program_id)
+        except Overloaded as e:
+            return await _send_overloaded(send, e)
+        return await _send_json(send, 200, record_turn(session, message, result))
+
+    async def handle_chat_stream(self, data: dict, send) -> int:
+        message = str(data.get("message", "")).strip()
+        if not message:
+            return await _send_json(send, 400, {"error": "message is required"})
+
+        session, history, summary = _conversation(data)
+        program_id = data.get("program_id")
+        context = program_context_for(message, program_id, data)
+        stream = chat_stream_async(message, history, context, summary, program_id)
+        try:
+            first = await stream.__anext__()
+        except Overloaded as e:
+            return await _send_overloaded(send, e)
+
+        await send({"type": "http.response.start", "status": 200, "headers": SSE_HEADERS})
+        async for event in _prepend(first, stream):
+            if event.get("done"):
+                event = record_turn(session, message, event)
+            await send({"type": "http.response.body", "body": f"data: {json.dumps(event)}\n\n".encode(),
+                        "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+        return 200
+
+    async def handle_compress(self, data: dict, send) -> int:
+        text  = str(data.get("text", "")).strip()
+        query, query_error = parse_query(data.get("query"))
+        ratio, error = parse_ratio(data.get("ratio"))
+
+        if not text:
+            return await _send_json(send, 400, {"error": "text field is required"})
+        if error or query_error:
+            return await _send_json(send, 400, {"error": error or query_error})
+
+        return await _send_json(send, 200, await compress_async(text, ratio, query=query))
+
+
+def _conversation(data: dict) -> tuple:
+    """(session, history, summary) for a chat body; session is None without one."""
+    session = open_session(data)
+    if session is None:
+        return None, data.get("history", []), None
+    return session, session.history(), session.summary
+
+
+async def _read_json(receive) -> dict:
+    body = b""
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            break
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+async def _prepend(first, rest):
+    yield first
+    async for event in rest:
+        yield event
+
+
+async def _send_overloaded(send, e: Overloaded) -> int:
+    payload = {"error": "The assistant is busy right now. Please retry shortly.",
+               "reason": e.reason, "retry_after": e.retry_after}
+    return await _send_json(send, 503, payload, [(b"retry-after", str(e.retry_after).encode())])
+
+
+async def _send_json(send, status: int, payload: dict, headers: list = ()) -> int:
+    body = json.dumps(payload).encode()
+    await send({
+        "type":    "http.response.start",
+        "status":  status,
+        "headers": JSON_HEADERS + [(b"content-length", str(len(body)).encode())] + list(headers),
+    })
+    await send({"type": "http.response.body", "body": body})
+    return status
+
+
+app = AsyncApp(create_app())
@@ -0,0 +1,140 @@
+"""
+Benchmark: fallback compressor vs. the previous implementation.
+
+Measures, per implementation:
+  - time per call on each program's context text and on a large synthetic
+    document (all contexts repeated), where the old per-phrase str.replace
+    loop scaled with phrases x length
+  - retained-keyword recall: of the query terms present in the input, the
+    fraction still present in the compressed output
+
+Run from the project root:
+  python bench/bench_compression.py
+  python bench/bench_compression.py --out bench/results/compression.json
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.admissions_data import PROGRAMS, get_program_context_text  # noqa: E402
+from services.compression import _fallback_compress  # noqa: E402
+from services.tokenizer import terms  # noqa: E402
+
+RATIO = 0.5
+
+QUERIES = [
+    ("btech", "What is the JEE Main cutoff for NIT Trichy?"),
+    ("btech", "Which careers and salary can I expect?"),
+    ("bca",   "Can a commerce student with maths apply?"),
+    ("bba",   "Top colleges for BBA and their exams"),
+    ("mba",   "What salary after an MBA from IIM?"),
+    ("mbbs",  "Which colleges are best for MBBS?"),
+    ("llb",   "Career paths after law school"),
+]
+
+
+def legacy_fallback_compress(text: str, ratio: float) -> str:
+    """The implementation this engine replaced, kept verbatim for comparison."""
+    replacements = {
+        "University":          "Univ.",
+        "Department":          "Dept.",
+        "requirement":         "req.",
+        "requirements":        "reqs.",
+        "extracurricular":     "EC",
+        "recommendation":      "rec.",
+        "recommendations":     "recs.",
+        "standardized test":   "std. test",
+        "application deadline":"app. deadline",
+        "personal statement":  "PS",
+        "strongly recommended":"strongly rec.",
+        "is required":         "required",
+        "is not required":     "not required",
+    }
+
+    result = text
+    for phrase, abbrev in replacements.items():
+        result = result.replace(phrase, abbrev)
+
+    result = re.sub(r"\n{3,}", "\n\n", result)
+    result = re.sub(r"[ \t]+\n", "\n", result)
+    result = re.sub(r" {2,}", " ", result)
+
+    target_len = int(len(text) * (1 - ratio + 0.15))
+    if len(result) > target_len:
+        result = result[:target_len].rsplit("\n", 1)[0] + "\n[...compressed]"
+
+    return result.strip()
+
+
+IMPLEMENTATIONS = {
+    "legacy":      lambda text, query: legacy_fallback_compress(text, RATIO),
+    "current":     lambda text, query: _fallback_compress(text, RATIO),
+    "query_aware": lambda text, query: _fallback_compress(text, RATIO, query),
+}
+
+
+def time_per_call(fn, text: str, query: str, min_time: float = 0.2) -> float:
+    """Microseconds per call, averaged over enough runs to fill min_time."""
+    runs, start = 0, time.perf_counter()
+    while True:
+        fn(text, query)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return elapsed / runs * 1e6
+
+
+def keyword_recall(original: str, compressed: str, query: str) -> float:
+    wanted = set(terms(query)) & set(terms(original))
+    if not wanted:
+        return 1.0
+    return len(wanted & set(terms(compressed))) / len(wanted)
+
+
+def run() -> dict:
+    contexts = {pid: get_program_context_text(pid) for pid in PROGRAMS}
+    large    = "\n\n".join(contexts.values()) * 50
+
+    results = {}
+    for name, fn in IMPLEMENTATIONS.items():
+        small_times = [time_per_call(fn, contexts[pid], q) for pid, q in QUERIES]
+        recalls     = [keyword_recall(contexts[pid], fn(contexts[pid], q), q) for pid, q in QUERIES]
+        results[name] = {
+            "us_per_call_context": round(sum(small_times) / len(small_times), 2),
+            "us_per_call_large":   round(time_per_call(fn, large, QUERIES[0][1]), 2),
+            "keyword_recall":      round(sum(recalls) / len(recalls), 3),
+        }
+
+    return {
+        "benchmark": "compression",
+        "ratio":     RATIO,
+        "large_doc_chars": len(large),
+        "results":   results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    report = run()
+    print(f"{'impl':<12} {'us/call (ctx)':>14} {'us/call (large)':>16} {'kw recall':>10}")
+    for name, r in report["results"].items():
+        print(f"{name:<12} {r['us_per_call_context']:>14} {r['us_per_call_large']:>16} {r['keyword_recall']:>10}")
+
+    if args.out:
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved {args.out}")
+
+
+if __name__ == "__main__":
+    main()
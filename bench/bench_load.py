@@ -0,0 +1,200 @@
+"""
+Load test: the real app over HTTP against the local fake Groq server.
+
+Starts tools/fake_groq.py (configurable latency, streaming pace and 429
+injection), points create_app() at it, serves the app on a threaded local
+server, then drives each scenario at fixed concurrency levels.
+
+Reports per scenario and concurrency: requests/sec, p50/p95/p99 latency,
+errors and process RSS after the run.
+
+Scenarios:
+  chat          POST /api/chat (unique messages, so every call reaches upstream
+                unless --cache is given)
+  chat_stream   POST /api/chat/stream, read to the end
+  programs      GET  /api/programs
+  program       GET  /api/programs/<id>, cycling through the catalog
+  compress      POST /api/compress
+
+Run from the project root:
+  python bench/bench_load.py
+  python bench/bench_load.py --concurrency 1 8 32 --requests 400 --latency 0.05
+  python bench/bench_load.py --scenarios chat --fail-first 20 --out bench/results/load.json
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+
+from bench.common import ROOT, environment, percentile, rss_mb, save_report  # noqa: E402
+
+sys.path.insert(0, os.path.join(ROOT, "tools"))
+from fake_groq import start_server as start_fake_groq  # noqa: E402
+
+SCENARIOS = ["chat", "chat_stream", "programs", "program", "compress"]
+
+QUESTIONS = [
+    "What is the JEE Main cutoff for NIT Trichy?",
+    "Which careers can I expect after this?",
+    "What are the fees at top colleges?",
+    "Can a commerce student apply?",
+]
+
+COMPRESS_TEXT = (
+    "The University Department requirement for admission is a standardized test score. "
+    "The application deadline is strongly recommended to be met early. "
+) * 20
+
+
+def start_app(args):
+    """Configure the environment, then import and serve the app. Returns its base URL."""
+    fake = start_fake_groq(
+        latency=args.latency, chunk_delay=args.chunk_delay,
+        rpm=args.rpm, fail_first=args.fail_first, retry_after=args.retry_after,
+    )
+    os.environ["GROQ_BASE_URL"]          = fake.base_url
+    os.environ["GROQ_API_KEY"]           = "gsk_fake_key_for_local_testing_only"
+    os.environ["RESPONSE_CACHE_BACKEND"] = "memory" if args.cache else "off"
+    os.environ.setdefault("SCALEDOWN_API_KEY", "")
+
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)     # no per-request access log
+    server = make_server("127.0.0.1", 0, create_app(), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def make_request(scenario: str, base: str, program_ids: list):
+    """fn(session, i) -> bool (success) for one request of the scenario."""
+    if scenario == "chat":
+        def call(session, i):
+            body = {"message": f"{QUESTIONS[i % len(QUESTIONS)]} #{i}", "program_id": program_ids[i % len(program_ids)]}
+            resp = session.post(f"{base}/api/chat", json=body)
+            return resp.ok and resp.json().get("model_used") != "error"
+    elif scenario == "chat_stream":
+        def call(session, i):
+            body = {"message": f"{QUESTIONS[i % len(QUESTIONS)]} #{i}"}
+            with session.post(f"{base}/api/chat/stream", json=body, stream=True) as resp:
+                data = b"".join(resp.iter_content(chunk_size=None))
+            return resp.ok and b'"done": true' in data and b'"model_used": "error"' not in data
+    elif scenario == "programs":
+        def call(session, i):
+            return session.get(f"{base}/api/programs").ok
+    elif scenario == "program":
+        def call(session, i):
+            return session.get(f"{base}/api/programs/{program_ids[i % len(program_ids)]}").ok
+    elif scenario == "compress":
+        def call(session, i):
+            return session.post(f"{base}/api/compress", json={"text": COMPRESS_TEXT, "ratio": 0.5}).ok
+    else:
+        raise ValueError(f"unknown scenario: {scenario}")
+    return call
+
+
+def run_level(call, concurrency: int, total: int) -> dict:
+    """`total` requests spread over `concurrency` threads, each with its own session."""
+    latencies, errors = [], 0
+    lock    = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        nonlocal errors
+        session = requests.Session()
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            start = time.perf_counter()
+            try:
+                ok = call(session, i)
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                errors += 0 if ok else 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests":    total,
+        "errors":      errors,
+        "rps":         round(total / wall, 1),
+        "p50_ms":      round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms":      round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms":      round(percentile(latencies, 0.99) * 1000, 2),
+        "rss_mb":      rss_mb(),
+    }
+
+
+def run(args) -> dict:
+    base = start_app(args)
+    from services.admissions_data import PROGRAMS
+    program_ids = list(PROGRAMS)
+
+    results = {}
+    for scenario in args.scenarios:
+        call = make_request(scenario, base, program_ids)
+        call(requests.Session(), 0)                 # warm up memos and the upstream pool
+        results[scenario] = [run_level(call, c, args.requests) for c in args.concurrency]
+
+    return {
+        "benchmark":   "load",
+        "environment": environment(),
+        "config": {
+            "requests":    args.requests,
+            "concurrency": args.concurrency,
+            "latency":     args.latency,
+            "chunk_delay": args.chunk_delay,
+            "rpm":         args.rpm,
+            "fail_first":  args.fail_first,
+            "cache":       args.cache,
+        },
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario and level")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake Groq seconds before responding")
+    parser.add_argument("--chunk-delay", type=float, default=0.0, help="fake Groq seconds between stream chunks")
+    parser.add_argument("--rpm", type=int, default=0, help="fake Groq requests/minute before 429s")
+    parser.add_argument("--fail-first", type=int, default=0, help="fake Groq answers the first N calls with 429")
+    parser.add_argument("--retry-after", type=float, default=0.2, help="retry-after on injected 429s")
+    parser.add_argument("--cache", action="store_true", help="keep the chat response cache on")
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    report = run(args)
+    print(f"{'scenario':<12} {'conc':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'rss MB':>7}")
+    for scenario, levels in report["results"].items():
+        for r in levels:
+            print(f"{scenario:<12} {r['concurrency']:>5} {r['rps']:>9} {r['p50_ms']:>9} "
+                  f"{r['p95_ms']:>9} {r['p99_ms']:>9} {r['errors']:>7} {r['rss_mb']:>7}")
+
+    if args.out:
+        save_report(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Microbenchmarks for the hot catalog and compression paths.
+
+  compress                    compression.compress() on a program context (fallback provider)
+  fallback_compress           compression._fallback_compress(), with and without a query
+  context_text (cold / warm)  admissions_data.get_program_context_text(), memo cleared vs. hit
+  search (cold / warm)        search.search_programs() for a few queries, index rebuilt vs. synced
+  retrieval                   retrieval.build_context() for a chat message
+
+Run from the project root:
+  python bench/bench_micro.py
+  python bench/bench_micro.py --out bench/results/micro.json
+"""
+
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ["SCALEDOWN_API_KEY"] = ""        # always measure the local engine
+
+from bench.common import environment, save_report, time_per_call  # noqa: E402
+from services.admissions_data import PROGRAMS, get_program_context_text  # noqa: E402
+from services.catalog_cache import clear_all  # noqa: E402
+from services.compression import compress, _fallback_compress  # noqa: E402
+from services.retrieval import build_context  # noqa: E402
+from services import search  # noqa: E402
+
+QUERY          = "What is the JEE Main cutoff for NIT Trichy?"
+SEARCH_QUERIES = ["eng", "btech", "management", "law colleges", "iit"]
+
+
+def cold_search():
+    search._index = search.SearchIndex()
+    for q in SEARCH_QUERIES:
+        search.search_programs(q)
+
+
+def warm_search():
+    for q in SEARCH_QUERIES:
+        search.search_programs(q)
+
+
+def cold_context(pid):
+    clear_all()
+    get_program_context_text(pid)
+
+
+def run(min_time: float) -> dict:
+    pid     = next(iter(PROGRAMS))
+    context = get_program_context_text(pid)
+
+    cases = {
+        "compress":                lambda: compress(context, 0.5),
+        "fallback_compress":       lambda: _fallback_compress(context, 0.5),
+        "fallback_compress_query": lambda: _fallback_compress(context, 0.5, QUERY),
+        "context_text_cold":       lambda: cold_context(pid),
+        "context_text_warm":       lambda: get_program_context_text(pid),
+        "search_cold":             cold_search,
+        "search_warm":             warm_search,
+        "retrieval":               lambda: build_context(QUERY, pid),
+    }
+    warm_search()
+    build_context(QUERY, pid)
+
+    results = {name: {"us_per_call": round(time_per_call(fn, min_time), 2)} for name, fn in cases.items()}
+    return {
+        "benchmark":   "micro",
+        "environment": environment(),
+        "program_id":  pid,
+        "results":     results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--min-time", type=float, default=0.3, help="seconds to spend per case")
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    report = run(args.min_time)
+    print(f"{'case':<26} {'us/call':>12}")
+    for name, r in report["results"].items():
+        print(f"{name:<26} {r['us_per_call']:>12}")
+
+    if args.out:
+        save_report(report, args.out)
+
+
+if __name__ == "__main__":
+    main()
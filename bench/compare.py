@@ -0,0 +1,68 @@
+"""
+Compare two benchmark reports (from bench_load.py or bench_micro.py).
+
+Prints every numeric metric present in both, with the relative change.
+For latencies and us/call lower is better; for rps higher is better.
+
+  python bench/compare.py bench/results/micro-old.json bench/results/micro-new.json
+  python bench/compare.py old.json new.json --threshold 10     # only show >=10% changes
+"""
+
+import sys
+import json
+import argparse
+
+HIGHER_IS_BETTER = {"rps", "keyword_recall"}
+SKIP             = {"concurrency", "requests", "errors"}
+
+
+def flatten(results, prefix: str = "") -> dict:
+    """{"chat/c16/p95_ms": 12.3, ...}; load levels are keyed by concurrency."""
+    flat = {}
+    if isinstance(results, dict):
+        for key, value in results.items():
+            flat.update(flatten(value, f"{prefix}{key}/"))
+    elif isinstance(results, list):
+        for item in results:
+            label = f"c{item['concurrency']}" if isinstance(item, dict) and "concurrency" in item else str(results.index(item))
+            flat.update(flatten(item, f"{prefix}{label}/"))
+    elif isinstance(results, (int, float)) and not isinstance(results, bool):
+        flat[prefix.rstrip("/")] = results
+    return flat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.0, help="hide changes below this percent")
+    args = parser.parse_args()
+
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+
+    old_flat, new_flat = flatten(old["results"]), flatten(new["results"])
+    print(f"old: {old.get('environment', {}).get('commit')}   new: {new.get('environment', {}).get('commit')}\n")
+    print(f"{'metric':<44} {'old':>12} {'new':>12} {'change':>9}")
+
+    regressions = 0
+    for key in old_flat:
+        if key not in new_flat or key.rsplit("/", 1)[-1] in SKIP:
+            continue
+        a, b   = old_flat[key], new_flat[key]
+        change = (b - a) / a * 100 if a else 0.0
+        if abs(change) < args.threshold:
+            continue
+        better = change > 0 if key.rsplit("/", 1)[-1] in HIGHER_IS_BETTER else change < 0
+        marker = "" if abs(change) < 1 else ("  better" if better else "  worse")
+        regressions += marker == "  worse"
+        print(f"{key:<44} {a:>12} {b:>12} {change:>+8.1f}%{marker}")
+
+    print(f"\n{regressions} metric(s) worse")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+gunicorn settings for wsgi:app.
+
+  gunicorn -c gunicorn.conf.py wsgi:app
+
+preload_app imports (and warms) the app once in the master; workers fork
+from it. Environment overrides:
+  PORT              listen port                        (default 5000)
+  WEB_CONCURRENCY   worker processes                   (default 2 x CPUs + 1, max 8)
+  GUNICORN_THREADS  threads per worker                 (default 8)
+  GUNICORN_TIMEOUT  seconds before a silent worker is restarted (default 60)
+"""
+
+import os
+import multiprocessing
+
+bind        = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+workers     = int(os.getenv("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+threads     = int(os.getenv("GUNICORN_THREADS", 8))
+timeout     = int(os.getenv("GUNICORN_TIMEOUT", 60))
+preload_app = True
+accesslog   = "-"
+
+# Chat turns (in flight + queued) may use at most 3/4 of a worker's threads,
+# so catalog endpoints keep answering while Groq is slow.
+os.environ.setdefault("CHAT_MAX_IN_FLIGHT", str(max(1, threads // 2)))
+os.environ.setdefault("CHAT_MAX_QUEUE", str(max(1, threads // 4)))
+
+
+def post_fork(server, worker):
+    from services.warmup import after_fork
+    after_fork()
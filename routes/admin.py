@@ -0,0 +1,72 @@
+"""
+Route: /api/admin/programs
+Upsert and delete catalog entries without a restart (services.admissions_data
+update_catalog). Each call publishes one new catalog snapshot; the reply
+carries its version and the program ids whose derived data was rebuilt.
+
+Body:
+  {"upsert": [{"id": "btech", "fees": {...}}, ...], "delete": ["old_id", ...]}
+An upsert for an existing id is merged over the current entry (top-level
+fields); a new id must carry every required field.
+
+Route: DELETE /api/admin/programs/<id>
+Removes one program.
+
+Both need "Authorization: Bearer <ADMIN_TOKEN>". Without ADMIN_TOKEN set
+the admin API is disabled (403).
+
+Config (environment):
+  ADMIN_TOKEN  shared secret for the admin API       (default unset = disabled)
+"""
+
+import os
+import hmac
+from flask import Blueprint, request, jsonify
+from services.admissions_data import update_catalog
+
+admin_bp = Blueprint("admin", __name__)
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+MAX_CHANGES = 500
+
+
+@admin_bp.before_request
+def require_token():
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "admin API is disabled (set ADMIN_TOKEN)"}), 403
+    header = request.headers.get("Authorization", "")
+    token  = header[7:] if header.startswith("Bearer ") else ""
+    if not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        return jsonify({"error": "invalid admin token"}), 401
+    return None
+
+
+@admin_bp.route("/api/admin/programs", methods=["POST"])
+def handle_update():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON object body is required"}), 400
+
+    upserts = data.get("upsert") or []
+    deletes = data.get("delete") or []
+    if not isinstance(upserts, list) or not isinstance(deletes, list):
+        return jsonify({"error": "upsert and delete must be lists"}), 400
+    if not upserts and not deletes:
+        return jsonify({"error": "nothing to do: send upsert and/or delete"}), 400
+    if len(upserts) + len(deletes) > MAX_CHANGES:
+        return jsonify({"error": f"at most {MAX_CHANGES} changes per request"}), 400
+
+    try:
+        result = update_catalog(upserts, deletes)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result), 200
+
+
+@admin_bp.route("/api/admin/programs/<program_id>", methods=["DELETE"])
+def handle_delete(program_id):
+    try:
+        result = update_catalog(deletes=[program_id])
+    except ValueError:
+        return jsonify({"error": "Program not found"}), 404
+    return jsonify(result), 200
@@ -1,11 +1,47 @@
 """
 Route: /api/chat
 Handles AI chat with history and optional program context.
+
+Route: /api/chat/stream
+Same request body, but the reply is streamed back as server-sent events.
+
+Route: /api/chat/batch
+Many items in one request, answered with bounded concurrency and streamed
+back as NDJSON (one line per item, in completion order).
+
+When Groq is saturated (services.admission), /api/chat and
+/api/chat/stream answer 503 with a Retry-After header before doing any
+upstream work; batch items wait for a slot (services.batch).
+
+/api/chat responses carry a Server-Timing header (context, faq, prompt,
+cache, queue, upstream phases) unless SERVER_TIMING=0. queue is the wait
+for an admission slot, so upstream is Groq's latency alone.
+
+Sessions: send "session": true (or a "session_id" from an earlier reply)
+instead of "history", and the server keeps the conversation
+(services.sessions). Replies then carry "session_id"; send the new message
+with it next time, plus the recent turns as "history" so a worker that does
+not know the session can rebuild it. DELETE /api/chat/session/<id> ends a
+session.
+
+Common questions ("B.Tech fees", "what is CUET") are answered from the
+local FAQ index without calling Groq (services.faq); those replies carry
+model_used "local/faq".
+
+Program context is retrieved per message: only the program fields relevant
+to the question are injected (services.retrieval). Send
+"retrieve_all": true without a program_id to search every program.
 """
 
-from flask import Blueprint, request, jsonify
-from services.ai_service import chat as ai_chat
-from services.admissions_data import get_program_context_text
+import json
+from itertools import chain
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from services.admission import Overloaded
+from services.ai_service import chat as ai_chat, chat_stream as ai_chat_stream
+from services.retrieval import build_context
+from services.batch import run_batch, MAX_ITEMS
+from services.sessions import get_store, open_session, record_turn
+from services.metrics import phase
 
 chat_bp = Blueprint("chat", __name__)
 
@@ -22,6 +58,112 @@ def handle_chat():
     if not message:
         return jsonify({"error": "message is required"}), 400
 
-    program_context = get_program_context_text(program_id) if program_id else None
-    result = ai_chat(message, history, program_context)
-    return jsonify(result), 200
\ No newline at end of file
+    session = open_session(data)
+    summary = None
+    if session:
+        history, summary = session.history(), session.summary
+
+    with phase("context"):
+        program_context = program_context_for(message, program_id, data)
+    try:
+        result = ai_chat(message, history, program_context, summary, program_id)
+    except Overloaded as e:
+        return overloaded_response(e)
+    return jsonify(record_turn(session, message, result)), 200
+
+
+@chat_bp.route("/api/chat/stream", methods=["POST"])
+def handle_chat_stream():
+    """
+    SSE stream of the reply. Each event is one JSON object:
+      data: {"delta": "..."}                                  partial reply text
+      data: {"done": true, "reply": "...", "model_used": ...} final event
+    With a session, the final event also carries "session_id".
+    """
+    data    = request.get_json(silent=True) or {}
+    message = data.get("message", "").strip()
+
+    history    = data.get("history", [])
+    program_id = data.get("program_id")
+
+    if not message:
+        return jsonify({"error": "message is required"}), 400
+
+    session = open_session(data)
+    summary = None
+    if session:
+        history, summary = session.history(), session.summary
+
+    program_context = program_context_for(message, program_id, data)
+
+    # Run up to the first event now, so an overload is still a plain 503.
+    stream = ai_chat_stream(message, history, program_context, summary, program_id)
+    try:
+        first = next(stream)
+    except Overloaded as e:
+        return overloaded_response(e)
+
+    def events():
+        for event in chain([first], stream):
+            if event.get("done"):
+                event = record_turn(session, message, event)
+            yield f"data: {json.dumps(event)}\n\n"
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@chat_bp.route("/api/chat/session/<session_id>", methods=["DELETE"])
+def handle_end_session(session_id):
+    if not get_store().delete(session_id):
+        return jsonify({"error": "session not found"}), 404
+    return jsonify({"deleted": session_id}), 200
+
+
+@chat_bp.route("/api/chat/batch", methods=["POST"])
+def handle_chat_batch():
+    """
+    Body: {"items": [{"message", "history"?, "program_id"?, "id"?}, ...],
+           "concurrency"?: int}
+    Response: application/x-ndjson, one services.batch result per line.
+    """
+    data  = request.get_json(silent=True) or {}
+    items = data.get("items")
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "items must be a non-empty list"}), 400
+    if len(items) > MAX_ITEMS:
+        return jsonify({"error": f"at most {MAX_ITEMS} items per batch"}), 400
+
+    concurrency = data.get("concurrency")
+    if concurrency is not None and (not isinstance(concurrency, int) or concurrency < 1):
+        return jsonify({"error": "concurrency must be a positive integer"}), 400
+
+    def lines():
+        for row in run_batch(items, concurrency):
+            yield json.dumps(row) + "\n"
+
+    return Response(
+        stream_with_context(lines()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def overloaded_response(e: Overloaded):
+    resp = jsonify({"error": "The assistant is busy right now. Please retry shortly.",
+                    "reason": e.reason, "retry_after": e.retry_after})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = str(e.retry_after)
+    return resp
+
+
+def program_context_for(message: str, program_id, data: dict):
+    """Retrieved context for a chat request body (also used by asgi.py)."""
+    retrieve_all = data.get("retrieve_all")
+    if retrieve_all is not None:
+        retrieve_all = bool(retrieve_all)
+    return build_context(message, program_id, all_programs=retrieve_all)
@@ -1,48 +1,38 @@
-"""Routes: Application checklist endpoint."""
+"""Routes: Application checklist endpoints."""
 
-from flask import Blueprint, jsonify
-from services.admissions_data import get_program
+from flask import Blueprint, request, jsonify
+from services.checklist import program_checklist
 
 checklist_bp = Blueprint("checklist", __name__)
 
+MAX_BULK_IDS = 50
+
 
 @checklist_bp.route("/api/checklist/<program_id>", methods=["GET"])
 def get_checklist(program_id):
-    program = get_program(program_id)
-    if not program:
+    checklist = program_checklist(program_id)
+    if not checklist:
         return jsonify({"error": "Program not found"}), 404
+    return jsonify(checklist), 200
+
+
+@checklist_bp.route("/api/checklists", methods=["GET"])
+def get_checklists():
+    """?ids=btech,mba -> {"checklists": {id: checklist}, "missing": [ids]}"""
+    ids = [pid.strip() for pid in request.args.get("ids", "").split(",") if pid.strip()]
+    ids = list(dict.fromkeys(ids))
+
+    if not ids:
+        return jsonify({"error": "ids is required (comma-separated program ids)"}), 400
+    if len(ids) > MAX_BULK_IDS:
+        return jsonify({"error": f"at most {MAX_BULK_IDS} ids per request"}), 400
+
+    checklists, missing = {}, []
+    for pid in ids:
+        checklist = program_checklist(pid)
+        if checklist:
+            checklists[pid] = checklist
+        else:
+            missing.append(pid)
 
-    items = []
-    for i, item in enumerate(program.get("checklist", []), start=1):
-        items.append({
-            "id": f"{program_id}-{i}",
-            "task": item,
-            "category": _categorize(item),
-        })
-
-    return jsonify({
-        "program_id": program_id,
-        "university": program["university"],
-        "program": program["program"],
-        "deadline": program["application_deadline"],
-        "items": items,
-        "total": len(items),
-    }), 200
-
-
-def _categorize(task: str) -> str:
-    task_lower = task.lower()
-    if any(w in task_lower for w in ["essay", "statement", "write", "answer"]):
-        return "Essays"
-    elif any(w in task_lower for w in ["recommendation", "reference"]):
-        return "Recommendations"
-    elif any(w in task_lower for w in ["test", "sat", "act", "toefl", "ielts", "lnat", "score"]):
-        return "Testing"
-    elif any(w in task_lower for w in ["transcript", "grade", "academic"]):
-        return "Academics"
-    elif any(w in task_lower for w in ["fee", "pay", "submit", "complete", "application"]):
-        return "Application"
-    elif any(w in task_lower for w in ["interview"]):
-        return "Interviews"
-    else:
-        return "Other"
\ No newline at end of file
+    return jsonify({"checklists": checklists, "missing": missing}), 200
@@ -1,7 +1,16 @@
-"""Routes: Raw compression endpoint."""
+"""
+Routes: Raw compression endpoints.
+
+Route: /api/compress
+One text.
+
+Route: /api/compress/batch
+Many texts in one call; Scaledown calls run in parallel
+(services.compression.compress_many). Results come back in input order.
+"""
 
 from flask import Blueprint, request, jsonify
-from services.compression import compress
+from services.compression import compress, compress_many, parse_ratio, parse_query, BATCH_MAX_ITEMS
 
 compress_bp = Blueprint("compress", __name__)
 
@@ -9,14 +18,43 @@ compress_bp = Blueprint("compress", __name__)
 @compress_bp.route("/api/compress", methods=["POST"])
 def compress_text():
     data = request.get_json(silent=True) or {}
-    text = data.get("text", "").strip()
-    ratio = float(data.get("ratio", 0.45))
+    text = str(data.get("text", "")).strip()
+    query, query_error = parse_query(data.get("query"))
+    ratio, error = parse_ratio(data.get("ratio"))
 
     if not text:
         return jsonify({"error": "text field is required"}), 400
 
-    if not (0.1 <= ratio <= 0.9):
-        return jsonify({"error": "ratio must be between 0.1 and 0.9"}), 400
+    if error or query_error:
+        return jsonify({"error": error or query_error}), 400
+
+    result = compress(text, ratio, query=query)
+    return jsonify(result), 200
+
+
+@compress_bp.route("/api/compress/batch", methods=["POST"])
+def compress_batch():
+    """
+    Body: {"items": [{"text", "ratio"?, "query"?, "id"?}, ...], "ratio"?: float,
+           "concurrency"?: int}
+    "ratio" at the top level is the default for items that do not set one.
+    Response: {"results": [...]}, one per item, in input order.
+    """
+    data  = request.get_json(silent=True) or {}
+    items = data.get("items")
+
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "items must be a non-empty list"}), 400
+    if len(items) > BATCH_MAX_ITEMS:
+        return jsonify({"error": f"at most {BATCH_MAX_ITEMS} items per batch"}), 400
+
+    default_ratio, error = parse_ratio(data.get("ratio"))
+    if error:
+        return jsonify({"error": error}), 400
+
+    concurrency = data.get("concurrency")
+    if concurrency is not None and (not isinstance(concurrency, int) or concurrency < 1):
+        return jsonify({"error": "concurrency must be a positive integer"}), 400
 
-    result = compress(text, ratio)
-    return jsonify(result), 200
\ No newline at end of file
+    items = [{"ratio": default_ratio, **item} if isinstance(item, dict) else item for item in items]
+    return jsonify({"results": compress_many(items, concurrency)}), 200
@@ -0,0 +1,44 @@
+"""
+Route: /api/eligibility
+Which programs a student (or a whole roster) qualifies for.
+
+Body, one student:
+  {"stream": "pcm", "marks": 82, "level": "ug", "scores": {"jee": 96.5}}
+Body, many:
+  {"profiles": [{"id": "s1", "stream": "pcb", "marks": 91}, ...]}
+"""
+
+import os
+from flask import Blueprint, request, jsonify
+from services.eligibility import check_profile, check_profiles, get_index
+
+eligibility_bp = Blueprint("eligibility", __name__)
+
+MAX_PROFILES = int(os.getenv("ELIGIBILITY_MAX_PROFILES", 1000))
+
+
+@eligibility_bp.route("/api/eligibility", methods=["POST"])
+def handle_eligibility():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON object body is required"}), 400
+
+    if "profiles" not in data:
+        result = check_profile(data)
+        if "error" in result:
+            return jsonify(result), 400
+        return jsonify(result), 200
+
+    profiles = data["profiles"]
+    if not isinstance(profiles, list) or not profiles:
+        return jsonify({"error": "profiles must be a non-empty list"}), 400
+    if len(profiles) > MAX_PROFILES:
+        return jsonify({"error": f"at most {MAX_PROFILES} profiles per request"}), 400
+
+    results = check_profiles(profiles)
+    return jsonify({
+        "results": results,
+        "count":   len(results),
+        "errors":  sum(1 for r in results if "error" in r),
+        "streams": get_index().streams,
+    }), 200
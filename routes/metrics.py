@@ -0,0 +1,114 @@
+"""
+Route: /api/metrics
+Prometheus text exposition of services.metrics, plus the counters other
+services already keep (response cache, catalog memos, upstream scheduler,
+connection pool, chat sessions, Scaledown breaker, chat admission), read at
+scrape time.
+"""
+
+from flask import Blueprint, Response
+from services.admission import get_controller as get_admission
+from services.catalog_cache import memo_stats
+from services.compression import provider_stats
+from services.http_client import pool_stats
+from services.metrics import register_collector, render
+from services.response_cache import get_cache
+from services.scheduler import get_scheduler
+from services.sessions import get_store as get_session_store
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/api/metrics", methods=["GET"])
+def handle_metrics():
+    return Response(render(), mimetype="text/plain; version=0.0.4")
+
+
+def _response_cache():
+    cache = get_cache()
+    if not cache:
+        return []
+    stats  = cache.stats()
+    labels = {"backend": stats["backend"]}
+    return [
+        ("response_cache_hits_total", "counter", "Chat response cache hits", [(labels, stats["hits"])]),
+        ("response_cache_misses_total", "counter", "Chat response cache misses", [(labels, stats["misses"])]),
+        ("response_cache_stores_total", "counter", "Chat replies stored", [(labels, stats["stores"])]),
+        ("response_cache_evictions_total", "counter", "Entries evicted for size", [(labels, stats.get("evictions"))]),
+    ]
+
+
+def _catalog_memos():
+    stats = memo_stats()
+    return [
+        ("catalog_memo_hits_total", "counter", "Catalog-derived values served from memo",
+         [({"memo": name}, s["hits"]) for name, s in stats.items()]),
+        ("catalog_memo_misses_total", "counter", "Catalog-derived values rebuilt",
+         [({"memo": name}, s["misses"]) for name, s in stats.items()]),
+        ("catalog_memo_entries", "gauge", "Entries held per memo",
+         [({"memo": name}, s["entries"]) for name, s in stats.items()]),
+    ]
+
+
+def _scheduler():
+    stats = get_scheduler().stats()
+    return [
+        ("groq_queue_depth", "gauge", "Calls waiting for rate-limit capacity", [({}, stats["queue_depth"])]),
+        ("groq_in_flight", "gauge", "Groq calls in progress", [({}, stats["in_flight"])]),
+        ("groq_retries_total", "counter", "Groq attempts retried", [({}, stats["retries"])]),
+        ("groq_coalesced_total", "counter", "Calls answered by an identical in-flight call", [({}, stats["coalesced"])]),
+        ("groq_rate_limited_total", "counter", "429 responses from Groq", [({}, stats["rate_limited"])]),
+        ("groq_ratelimit_remaining", "gauge", "Remaining quota per Groq's last headers",
+         [({"limit": name}, limit["remaining"]) for name, limit in stats["limits"].items()]),
+    ]
+
+
+def _pool():
+    stats = pool_stats()
+    return [
+        ("groq_pool_connections", "gauge", "Pooled upstream connections",
+         [({"state": "open"}, stats["open"]), ({"state": "in_use"}, stats["in_use"])]),
+        ("groq_pool_requests_total", "counter", "Requests sent through the pool", [({}, stats["requests"])]),
+        ("groq_pool_connections_created_total", "counter", "New upstream connections opened",
+         [({}, stats["connections_created"])]),
+    ]
+
+
+def _sessions():
+    stats = get_session_store().stats()
+    return [
+        ("chat_sessions_active", "gauge", "Server-side chat sessions held", [({}, stats["active"])]),
+        ("chat_sessions_created_total", "counter", "Chat sessions started", [({}, stats["created"])]),
+        ("chat_sessions_dropped_total", "counter", "Chat sessions removed before being ended",
+         [({"reason": "idle"}, stats["expired"]), ({"reason": "capacity"}, stats["evicted"])]),
+        ("chat_sessions_rehydrated_total", "counter", "Unknown sessions rebuilt from client history",
+         [({}, stats["rehydrated"])]),
+    ]
+
+
+def _scaledown():
+    stats   = provider_stats()
+    breaker = stats["breaker"]
+    return [
+        ("scaledown_circuit_open", "gauge", "1 while Scaledown calls are skipped (open or half-open circuit)",
+         [({}, int(breaker["state"] != "closed"))]),
+        ("scaledown_circuit_opened_total", "counter", "Times the Scaledown circuit opened", [({}, breaker["opened"])]),
+        ("scaledown_compressors", "gauge", "Pooled Scaledown compressor instances",
+         [({"state": "idle"}, stats["pool"]["idle"])]),
+        ("scaledown_compressors_created_total", "counter", "Scaledown compressor instances created",
+         [({}, stats["pool"]["created"])]),
+    ]
+
+
+def _admission():
+    stats = {"sync": get_admission().stats(), "async": get_admission(asynchronous=True).stats()}
+    return [
+        ("chat_admission_in_flight", "gauge", "Chat turns holding an upstream slot",
+         [({"mode": mode}, s["in_flight"]) for mode, s in stats.items()]),
+        ("chat_admission_queued", "gauge", "Chat turns waiting for an upstream slot",
+         [({"mode": mode, "lane": lane}, n) for mode, s in stats.items() for lane, n in s["queued"].items()]),
+    ]
+
+
+for _collector in (_response_cache, _catalog_memos, _scheduler, _pool, _sessions, _scaledown, _admission):
+    register_collector(_collector)
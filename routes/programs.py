@@ -1,50 +1,130 @@
-"""Routes: Programs endpoints."""
+"""
+Routes: Programs endpoints.
+
+Responses are serialized once per catalog version (per program revision for
+detail pages) and served as bytes with an ETag and gzip/brotli variants;
+If-None-Match requests for unchanged data get a 304. Detail responses built
+on this request carry context/compress/serialize phases in Server-Timing.
+
+Route: /api/programs/rank
+Programs scored against a student profile (services.ranking), best first.
+Body: {"stream", "marks", "level"?, "budget"?, "salary_weight"?, "limit"?}
+
+Route: /api/programs/compare
+Parsed features side by side, the best program per feature and, with a
+profile, each program's score.
+Body: {"program_ids": [...], "profile"?: {...}}
+"""
 
 from flask import Blueprint, request, jsonify
-from services.admissions_data import get_all_programs, get_program, get_program_context_text, CATEGORIES
-from services.compression import compress
+from services.admissions_data import get_program, get_program_summary, get_program_context_text, get_categories
+from services.catalog_cache import memoize
+from services.compression import compress_program, is_cacheable
+from services.http_cache import PreparedResponse
+from services.metrics import phase
+from services.ranking import rank_programs, compare_programs, MAX_RANK_LIMIT, MAX_COMPARE
+from services.search import search_programs
 
 programs_bp = Blueprint("programs", __name__)
 
 
 @programs_bp.route("/api/programs", methods=["GET"])
 def list_programs():
-    query = request.args.get("q", "").lower()
+    query    = request.args.get("q", "").strip()
     category = request.args.get("category", "All")
+    level    = request.args.get("level")
+
+    try:
+        limit  = min(max(int(request.args.get("limit", 50)), 1), 200)
+        offset = max(int(request.args.get("offset", 0)), 0)
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+
+    return _list_response(query, category, level, limit, offset).to_response(request)
+
+
+@memoize(max_entries=512)
+def _list_response(query, category, level, limit, offset) -> PreparedResponse:
+    result   = search_programs(query, category, level, limit, offset)
+    programs = [get_program_summary(pid) for pid in result["ids"]]
+
+    return PreparedResponse.json({
+        "programs": programs,
+        "categories": get_categories(),
+        "total": result["total"],
+        "limit": limit,
+        "offset": offset,
+        "facets": result["facets"],
+    })
+
 
-    programs = get_all_programs()
+@programs_bp.route("/api/programs/rank", methods=["POST"])
+def rank():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON object body is required"}), 400
 
-    if query:
-        programs = [
-            p for p in programs
-            if query in p["university"].lower()
-            or query in p["program"].lower()
-            or query in p["short_name"].lower()
-        ]
+    limit = data.get("limit", 20)
+    if not isinstance(limit, int) or isinstance(limit, bool) or not 1 <= limit <= MAX_RANK_LIMIT:
+        return jsonify({"error": f"limit must be an integer between 1 and {MAX_RANK_LIMIT}"}), 400
 
-    if category and category != "All":
-        programs = [p for p in programs if p["category"] == category]
+    result = rank_programs(data, limit)
+    if "error" in result:
+        return jsonify(result), 400
+    return jsonify(result), 200
 
-    return jsonify({"programs": programs, "categories": CATEGORIES, "total": len(programs)}), 200
+
+@programs_bp.route("/api/programs/compare", methods=["POST"])
+def compare():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "JSON object body is required"}), 400
+
+    program_ids = data.get("program_ids")
+    if not isinstance(program_ids, list) or not program_ids or \
+            not all(isinstance(pid, str) for pid in program_ids):
+        return jsonify({"error": "program_ids must be a non-empty list of program ids"}), 400
+    if len(program_ids) > MAX_COMPARE:
+        return jsonify({"error": f"at most {MAX_COMPARE} programs per comparison"}), 400
+
+    result = compare_programs(program_ids, data.get("profile"))
+    if "error" in result:
+        return jsonify(result), 400
+    if not result["programs"]:
+        return jsonify({"error": "None of the programs were found", "missing": result["missing"]}), 404
+    return jsonify(result), 200
 
 
 @programs_bp.route("/api/programs/<program_id>", methods=["GET"])
 def get_program_detail(program_id):
+    prepared = _detail_response(program_id)
+    if prepared is None:
+        return jsonify({"error": "Program not found"}), 404
+    return prepared.to_response(request)
+
+
+@memoize(per_program=True, should_cache=lambda prepared: prepared is not None and prepared.cacheable)
+def _detail_response(program_id):
     program = get_program(program_id)
     if not program:
-        return jsonify({"error": "Program not found"}), 404
+        return None
+
+    with phase("context"):
+        context_text = get_program_context_text(program_id)
+    with phase("compress"):
+        compression_result = compress_program(program_id)
 
-    context_text = get_program_context_text(program_id)
-    compression_result = compress(context_text)
-
-    return jsonify({
-        "program": program,
-        "context_text": context_text,
-        "compression": {
-            "original_tokens": compression_result["original_tokens"],
-            "compressed_tokens": compression_result["compressed_tokens"],
-            "compression_ratio": compression_result["compression_ratio"],
-            "tokens_saved": compression_result["tokens_saved"],
-            "provider": compression_result["provider"],
-        }
-    }), 200
\ No newline at end of file
+    with phase("serialize"):
+        prepared = PreparedResponse.json({
+            "program": program,
+            "context_text": context_text,
+            "compression": {
+                "original_tokens": compression_result["original_tokens"],
+                "compressed_tokens": compression_result["compressed_tokens"],
+                "compression_ratio": compression_result["compression_ratio"],
+                "tokens_saved": compression_result["tokens_saved"],
+                "provider": compression_result["provider"],
+            }
+        })
+    prepared.cacheable = is_cacheable(compression_result)
+    return prepared
\ No newline at end of file
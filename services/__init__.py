@@ -0,0 +1,9 @@
+"""
+Services package. Loads .env once, here, so every entry point (app.py,
+wsgi.py, asgi.py, the CLIs under services/) sees the same configuration
+before any service module reads it.
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv()
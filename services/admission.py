@@ -0,0 +1,252 @@
+"""
+Admission control for upstream chat calls.
+
+Only the part of a chat turn that waits on Groq is admitted here; cache
+hits and key errors never queue. At most CHAT_MAX_IN_FLIGHT turns talk to
+Groq at once, and at most CHAT_MAX_QUEUE wait for a slot. Beyond that a
+turn is shed at once with Overloaded (routes answer 503 + Retry-After), so
+a slow upstream cannot tie up every worker thread and starve cheap
+endpoints like /api/programs.
+
+Lanes:
+  fast  prompts up to CHAT_FAST_LANE_TOKENS (short history, no big context)
+  slow  everything else
+A freed slot goes to the oldest fast waiter before any slow one. When the
+queue is full, a fast arrival takes the place of the newest slow waiter,
+which is shed instead.
+
+Deadlines: every admitted turn gets CHAT_REQUEST_DEADLINE seconds from
+arrival, less the time it spent queued; the remainder is what the upstream
+scheduler may spend on pacing and retries. A waiter still queued after
+CHAT_QUEUE_TIMEOUT seconds is shed.
+
+The async serving mode (asgi.py) has its own controller with much larger
+limits: there a waiting turn costs a coroutine, not a worker thread, so
+the CHAT_MAX_* thread limits would shed chats the event loop can hold.
+
+Config (environment):
+  CHAT_MAX_IN_FLIGHT     turns calling Groq at once            (default 16)
+  CHAT_MAX_QUEUE         turns waiting for a slot              (default 32)
+  CHAT_ASYNC_MAX_IN_FLIGHT  same, async serving mode           (default 512)
+  CHAT_ASYNC_MAX_QUEUE      same, async serving mode           (default 1024)
+  CHAT_QUEUE_TIMEOUT     seconds a turn may wait for a slot    (default 5)
+  CHAT_REQUEST_DEADLINE  seconds per turn, queueing included   (default 20)
+  CHAT_FAST_LANE_TOKENS  prompt tokens that still count as short (default 1500)
+"""
+
+import os
+import math
+import time
+import asyncio
+import threading
+from collections import deque
+from contextlib import contextmanager, asynccontextmanager
+
+from services.metrics import Counter
+
+MAX_IN_FLIGHT    = int(os.getenv("CHAT_MAX_IN_FLIGHT", 16))
+MAX_QUEUE        = int(os.getenv("CHAT_MAX_QUEUE", 32))
+QUEUE_TIMEOUT    = float(os.getenv("CHAT_QUEUE_TIMEOUT", 5))
+REQUEST_DEADLINE = float(os.getenv("CHAT_REQUEST_DEADLINE", 20))
+FAST_LANE_TOKENS = int(os.getenv("CHAT_FAST_LANE_TOKENS", 1500))
+
+ASYNC_MAX_IN_FLIGHT = int(os.getenv("CHAT_ASYNC_MAX_IN_FLIGHT", 512))
+ASYNC_MAX_QUEUE     = int(os.getenv("CHAT_ASYNC_MAX_QUEUE", 1024))
+
+LANES = ("fast", "slow")
+
+ADMISSIONS = Counter("chat_admissions_total", "Chat turns admitted to call Groq", ("lane",))
+SHED       = Counter("chat_shed_total", "Chat turns rejected with 503", ("lane", "reason"))
+
+
+class Overloaded(Exception):
+    """No upstream slot for this turn; retry after `retry_after` seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Chat is overloaded ({reason}); retry in {retry_after}s")
+        self.reason      = reason
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """An admitted turn: its lane and its overall deadline."""
+
+    def __init__(self, lane: str, deadline: float):
+        self.lane     = lane
+        self.deadline = deadline
+
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+
+class _Waiter:
+    """A queued turn. settle() may be called from any thread."""
+
+    def __init__(self, lane: str, loop=None):
+        self.lane    = lane
+        self.outcome = None                 # "granted" | reason it was shed
+        self.loop    = loop
+        if loop is None:
+            self.event = threading.Event()
+        else:
+            self.future = loop.create_future()
+
+    def settle(self, outcome: str) -> None:
+        self.outcome = outcome
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class AdmissionController:
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, max_queue: int = MAX_QUEUE,
+                 queue_timeout: float = QUEUE_TIMEOUT, deadline: float = REQUEST_DEADLINE):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue     = max(0, max_queue)
+        self.queue_timeout = queue_timeout
+        self.deadline      = deadline
+        self._lock         = threading.Lock()
+        self._queues       = {lane: deque() for lane in LANES}
+        self._in_flight    = 0
+        self._hold_ewma    = 1.0            # seconds a slot is typically held
+
+    def lane_for(self, prompt_tokens: int) -> str:
+        return "fast" if prompt_tokens <= FAST_LANE_TOKENS else "slow"
+
+    @contextmanager
+    def admit(self, prompt_tokens: int):
+        """Hold an upstream slot for the block; raises Overloaded instead of waiting too long."""
+        start  = time.monotonic()
+        lane   = self.lane_for(prompt_tokens)
+        waiter = self._enter(lane, None)
+        if waiter is not None:
+            waiter.event.wait(self.queue_timeout)
+            self._settle_wait(waiter)
+
+        ticket   = self._ticket(lane, start)
+        admitted = time.monotonic()
+        try:
+            yield ticket
+        finally:
+            self._release(time.monotonic() - admitted)
+
+    @asynccontextmanager
+    async def admit_async(self, prompt_tokens: int):
+        """admit() for the event loop: waiting does not block the loop."""
+        start  = time.monotonic()
+        lane   = self.lane_for(prompt_tokens)
+        waiter = self._enter(lane, asyncio.get_running_loop())
+        if waiter is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(waiter.future), self.queue_timeout)
+            except asyncio.TimeoutError:
+                pass
+            except asyncio.CancelledError:
+                self._abandon(waiter)
+                raise
+            self._settle_wait(waiter)
+
+        ticket   = self._ticket(lane, start)
+        admitted = time.monotonic()
+        try:
+            yield ticket
+        finally:
+            self._release(time.monotonic() - admitted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight":     self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "queued":        {lane: len(q) for lane, q in self._queues.items()},
+                "max_queue":     self.max_queue,
+                "retry_after":   self._retry_after(),
+            }
+
+    # ── Internals ─────────────────────────────────────────────────────
+    def _enter(self, lane: str, loop):
+        """None if admitted at once, else a queued _Waiter. Raises Overloaded when full."""
+        with self._lock:
+            ahead = len(self._queues["fast"]) + (len(self._queues["slow"]) if lane == "slow" else 0)
+            if self._in_flight < self.max_in_flight and not ahead:
+                self._in_flight += 1
+                ADMISSIONS.inc(lane=lane)
+                return None
+
+            if self._queued() >= self.max_queue:
+                if lane == "fast" and self._queues["slow"]:
+                    # Priority: the newest slow waiter gives up its place.
+                    self._queues["slow"].pop().settle("preempted")
+                else:
+                    SHED.inc(lane=lane, reason="queue_full")
+                    raise Overloaded("queue_full", self._retry_after())
+
+            waiter = _Waiter(lane, loop)
+            self._queues[lane].append(waiter)
+            return waiter
+
+    def _settle_wait(self, waiter: _Waiter) -> None:
+        """After waiting: admitted, or removed from the queue and shed."""
+        with self._lock:
+            if waiter.outcome is None:
+                self._queues[waiter.lane].remove(waiter)
+                waiter.outcome = "queue_timeout"
+            outcome = waiter.outcome
+            if outcome == "granted":
+                ADMISSIONS.inc(lane=waiter.lane)
+                return
+            retry_after = self._retry_after()
+        SHED.inc(lane=waiter.lane, reason=outcome)
+        raise Overloaded(outcome, retry_after)
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """A cancelled async waiter: leave the queue, or hand back a slot it was just given."""
+        with self._lock:
+            if waiter.outcome is None:
+                self._queues[waiter.lane].remove(waiter)
+                waiter.outcome = "cancelled"
+                return
+            granted = waiter.outcome == "granted"
+        if granted:
+            self._release(None)
+
+    def _ticket(self, lane: str, start: float) -> Ticket:
+        ticket = Ticket(lane, start + self.deadline)
+        if ticket.remaining() <= 0:
+            self._release(None)
+            SHED.inc(lane=lane, reason="deadline")
+            raise Overloaded("deadline", self._retry_after())
+        return ticket
+
+    def _release(self, held: float) -> None:
+        """Free a slot, or pass it straight to the next waiter (fast lane first)."""
+        with self._lock:
+            if held is not None:
+                self._hold_ewma = 0.8 * self._hold_ewma + 0.2 * held
+            for lane in LANES:
+                if self._queues[lane]:
+                    self._queues[lane].popleft().settle("granted")
+                    return
+            self._in_flight -= 1
+
+    def _queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _retry_after(self) -> int:
+        """Rough seconds until the queue ahead of a new arrival drains."""
+        waves = (self._queued() + 1) / self.max_in_flight
+        return max(1, min(60, math.ceil(self._hold_ewma * waves)))
+
+
+_controller       = AdmissionController()
+_async_controller = AdmissionController(ASYNC_MAX_IN_FLIGHT, ASYNC_MAX_QUEUE)
+
+
+def get_controller(asynchronous: bool = False) -> AdmissionController:
+    """The thread-mode controller, or with asynchronous=True the event-loop one."""
+    return _async_controller if asynchronous else _controller
@@ -1,9 +1,43 @@
 """
 Indian college admissions data.
 Each entry is a course or college with structured information.
+
+Storage:
+  If the SQLite catalog (data/catalog.sqlite3, or $CATALOG_DB) exists, programs
+  are read from it: lazily, row by row, through an in-process cache. The
+  file is re-checked at most every CATALOG_RELOAD_INTERVAL seconds (default
+  2), and changed rows are reloaded without restarting workers.
+  Otherwise the SEED_PROGRAMS literal below is served directly.
+
+  Build the file from the seed:  python -m services.catalog_store import
+
+PROGRAMS is a live read-only view of whichever catalog is current, and
+CATEGORIES is derived from it on access.
+
+Snapshots: each loaded catalog is an immutable _CatalogState, published by
+swapping one module reference, so readers never take a lock (a reader
+arriving mid-reload keeps serving the previous snapshot). update_catalog()
+writes upserts and deletes to the SQLite file, creating it from the
+current catalog if needed, and publishes a new snapshot. It carries over
+unchanged rows and then bumps the catalog version for the changed program
+ids only. Everything memoized per program revision (summaries, context
+text, compression, checklists, retrieval chunks, search and ranking rows)
+is rebuilt for those programs alone. Other workers pick the change up from
+the file on their next reload check.
 """
 
-PROGRAMS = {
+import os
+import time
+import logging
+import threading
+from collections.abc import Mapping
+
+from services.catalog_cache import memoize, catalog_version, mark_catalog_changed, set_refresh_hook
+from services.catalog_store import CatalogStore, checksum
+
+logger = logging.getLogger(__name__)
+
+SEED_PROGRAMS = {
     "btech": {
         "id": "btech",
         "name": "B.Tech",
@@ -122,35 +156,328 @@ PROGRAMS = {
     },
 }
 
-# ✅ Auto-generate categories dynamically
-CATEGORIES = sorted(
-    list({program["category"] for program in PROGRAMS.values()})
-)
+RELOAD_INTERVAL = float(os.getenv("CATALOG_RELOAD_INTERVAL", 2))
+
+# Fields every program must carry (read with [] by the views below).
+REQUIRED_FIELDS = {
+    "id": str, "name": str, "full": str, "short_name": str, "level": str, "duration": str,
+    "category": str, "logo_color": str, "salary": str, "description": str,
+    "streams": list, "exams": list, "top_colleges": list, "min_percent": (int, float),
+}
+
+
+class _CatalogState:
+    """
+    One loaded view of the catalog (a snapshot). Never mutated after
+    publication except for read-through caching of rows into `programs`.
+    """
+
+    def __init__(self, ids: list, programs: dict, checksums: dict = None, stamp=None):
+        self.ids       = ids              # catalog order
+        self.id_set    = set(ids)
+        self.programs  = programs         # rows loaded so far
+        self.checksums = checksums        # None for the in-code seed
+        self.stamp     = stamp
+        self.checked   = 0.0              # time.monotonic() of last stat()
+
+    @property
+    def complete(self) -> bool:
+        return len(self.programs) == len(self.ids)
+
+
+_store = CatalogStore()
+_state = None
+_reload_lock = threading.Lock()
+
+
+def _seed_state() -> _CatalogState:
+    return _CatalogState(list(SEED_PROGRAMS), SEED_PROGRAMS)
+
+
+def _store_state(stamp) -> _CatalogState:
+    checksums = _store.checksums()
+    return _CatalogState(list(checksums), {}, checksums, stamp)
+
+
+def _current() -> _CatalogState:
+    """Current catalog state; loads it on first use and hot-reloads on file change."""
+    state = _state
+    if state is not None and time.monotonic() - state.checked < RELOAD_INTERVAL:
+        return state
+
+    # Only the first load waits; otherwise whoever holds the lock (a reload
+    # or update_catalog) publishes the next snapshot and this reader keeps
+    # the current one.
+    if not _reload_lock.acquire(blocking=state is None):
+        return state
+    try:
+        return _reload()
+    finally:
+        _reload_lock.release()
+
+
+def _reload(force: bool = False) -> _CatalogState:
+    """Re-check the file and publish a new snapshot if it changed. Caller holds _reload_lock."""
+    global _state
+    state = _state
+    now = time.monotonic()
+    if not force and state is not None and now - state.checked < RELOAD_INTERVAL:
+        return state
+
+    stamp = _store.stamp()
+    if state is not None and stamp == state.stamp:
+        state.checked = now
+        return state
+
+    try:
+        new = _store_state(stamp) if stamp else _seed_state()
+    except Exception as e:
+        logger.error(f"Catalog load from {_store.path} failed: {e}. Keeping current catalog.")
+        if state is None:
+            state = _seed_state()
+            _state = state
+        state.checked = now
+        return state
+
+    new.checked = now
+    if state is None:
+        _state = new
+        return new
+
+    changed = _changed_ids(state, new)
+    if state.checksums is not None and new.checksums is not None:
+        _carry_over(state, new, changed)
+    _publish(new, changed if state.checksums is not None and new.checksums is not None else None)
+    logger.info(f"Catalog reloaded: {len(changed)} program(s) changed")
+    return new
+
+
+def _publish(new: _CatalogState, changed) -> None:
+    """Swap in a snapshot, then bump versions, so no reader caches old rows under the new version."""
+    global _state
+    _state = new
+    mark_catalog_changed(changed)
+
+
+def _carry_over(old: _CatalogState, new: _CatalogState, changed: set) -> None:
+    """Reuse rows already loaded into `old` that did not change."""
+    for pid, program in old.programs.items():
+        if pid in new.id_set and pid not in changed:
+            new.programs[pid] = program
+
+
+def validate_program(program) -> str:
+    """An error message for a program dict that cannot be served, else None."""
+    if not isinstance(program, dict):
+        return "program must be an object"
+    for field, kind in REQUIRED_FIELDS.items():
+        if field not in program:
+            return f"{program.get('id', 'program')}: {field} is required"
+        if not isinstance(program[field], kind) or isinstance(program[field], bool):
+            return f"{program.get('id', 'program')}: {field} has the wrong type"
+    if not program["id"].strip():
+        return "id must not be empty"
+    if not 0 <= program["min_percent"] <= 100:
+        return f"{program['id']}: min_percent must be between 0 and 100"
+    for field in ("streams", "exams", "top_colleges", "careers"):
+        value = program.get(field)
+        if value is not None and not (isinstance(value, list) and all(isinstance(v, str) for v in value)):
+            return f"{program['id']}: {field} must be a list of strings"
+    for field in ("fees", "cutoffs"):
+        value = program.get(field)
+        if value is not None and not (isinstance(value, dict) and all(isinstance(v, str) for v in value.values())):
+            return f"{program['id']}: {field} must be an object of strings"
+    return None
+
+
+def update_catalog(upserts: list = (), deletes: list = ()) -> dict:
+    """
+    Upsert and delete programs as one new catalog snapshot.
+
+    Args:
+        upserts: Program dicts. A dict for an existing id is merged over the
+                 current entry (top-level fields), so {"id": "btech",
+                 "fees": {...}} edits only the fees; new ids need every
+                 REQUIRED_FIELDS field.
+        deletes: Program ids to remove.
+
+    Returns:
+        {"version", "changed", "upserted", "deleted", "unchanged"}
+
+    Raises:
+        ValueError: invalid program, or an unknown id in deletes
+    """
+    for pid in deletes:
+        if not isinstance(pid, str) or not pid.strip():
+            raise ValueError("each delete must be a non-empty program id string")
+
+    with _reload_lock:
+        old      = _reload(force=True)
+        current  = {}
+        for item in upserts:
+            if not isinstance(item, dict) or not isinstance(item.get("id"), str):
+                raise ValueError("each upsert must be an object with a string id")
+            pid  = item["id"]
+            base = current.get(pid) or _load_row(old, pid) or {}
+            current[pid] = {**base, **item}
+
+        for pid, program in current.items():
+            error = validate_program(program)
+            if error:
+                raise ValueError(error)
+        missing = [pid for pid in deletes if pid not in old.id_set or pid in current]
+        if missing:
+            raise ValueError(f"cannot delete unknown or upserted program id(s): {', '.join(map(str, missing))}")
+
+        sums      = old.checksums if old.checksums is not None else \
+            {pid: checksum(p) for pid, p in old.programs.items()}
+        unchanged = [pid for pid, p in current.items() if sums.get(pid) == checksum(p)]
+        upserted  = {pid: p for pid, p in current.items() if pid not in unchanged}
+        deleted   = list(dict.fromkeys(deletes))
+        if not upserted and not deleted:
+            return {"version": catalog_version(), "changed": [], "upserted": [],
+                    "deleted": [], "unchanged": unchanged}
+
+        if _store.exists():
+            _store.apply(upserted, deleted)
+        else:
+            # First edit of the in-code seed: persist the whole catalog so the
+            # change survives restarts and reaches every worker.
+            programs = {pid: upserted.get(pid, p) for pid, p in _load_all(old).items() if pid not in deleted}
+            programs.update({pid: p for pid, p in upserted.items() if pid not in programs})
+            _store.write_all(programs)
+
+        new = _store_state(_store.stamp())
+        new.checked = time.monotonic()
+        changed = {pid for pid in old.id_set | new.id_set if sums.get(pid) != new.checksums.get(pid)}
+        _carry_over(old, new, changed)
+        new.programs.update({pid: p for pid, p in upserted.items() if pid in new.id_set})
+        _publish(new, changed)
+
+    logger.info(f"Catalog updated: {len(upserted)} upserted, {len(deleted)} deleted")
+    return {
+        "version":   catalog_version(),
+        "changed":   sorted(changed),
+        "upserted":  list(upserted),
+        "deleted":   deleted,
+        "unchanged": unchanged,
+    }
+
+
+def catalog_info() -> dict:
+    state = _current()
+    return {
+        "version":  catalog_version(),
+        "programs": len(state.ids),
+        "source":   "sqlite" if state.checksums is not None else "seed",
+        "path":     _store.path if state.checksums is not None else None,
+    }
+
+
+def _changed_ids(old: _CatalogState, new: _CatalogState) -> set:
+    if old.checksums is None or new.checksums is None:
+        return old.id_set | new.id_set
+    return {
+        pid for pid in old.id_set | new.id_set
+        if old.checksums.get(pid) != new.checksums.get(pid)
+    }
+
+
+def _load_row(state: _CatalogState, program_id: str):
+    program = state.programs.get(program_id)
+    if program is None and program_id in state.id_set:
+        program = _store.get(program_id)
+        if program is not None:
+            state.programs[program_id] = program
+    return program
+
+
+def _load_all(state: _CatalogState) -> dict:
+    if not state.complete:
+        missing = [pid for pid in state.ids if pid not in state.programs]
+        state.programs.update(_store.get_many(missing))
+    return state.programs
+
+
+class _LivePrograms(Mapping):
+    """Read-only {program_id: program} view that always reflects the current catalog."""
+
+    def __getitem__(self, program_id):
+        program = _load_row(_current(), program_id)
+        if program is None:
+            raise KeyError(program_id)
+        return program
+
+    def __iter__(self):
+        return iter(_current().ids)
+
+    def __len__(self):
+        return len(_current().ids)
+
+    def __contains__(self, program_id):
+        return program_id in _current().id_set
+
+    def values(self):
+        state = _current()
+        programs = _load_all(state)
+        return [programs[pid] for pid in state.ids if pid in programs]
+
+    def items(self):
+        state = _current()
+        programs = _load_all(state)
+        return [(pid, programs[pid]) for pid in state.ids if pid in programs]
+
+
+PROGRAMS = _LivePrograms()
+set_refresh_hook(_current)
+
+
+def get_categories() -> list:
+    return _categories()
+
+
+@memoize()
+def _categories() -> list:
+    return sorted({program["category"] for program in PROGRAMS.values()})
+
+
+def __getattr__(name):
+    # CATEGORIES stays importable but is derived from the current catalog.
+    if name == "CATEGORIES":
+        return get_categories()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_all_programs():
-    return [
-        {
-            "id": p["id"],
-            "name": p["name"],
-            "full": p["full"],
-            "level": p["level"],
-            "duration": p["duration"],
-            "category": p["category"],
-            "logo_color": p["logo_color"],
-            "short_name": p["short_name"],
-            "salary": p["salary"],
-            "description": p["description"],
-            "top_colleges": p["top_colleges"],
-        }
-        for p in PROGRAMS.values()
-    ]
+    return [get_program_summary(pid) for pid in PROGRAMS]
+
+
+@memoize(per_program=True)
+def get_program_summary(program_id: str):
+    """Card-sized view of one program, built once per program revision. Treat as read-only."""
+    p = PROGRAMS.get(program_id)
+    if not p:
+        return None
+    return {
+        "id": p["id"],
+        "name": p["name"],
+        "full": p["full"],
+        "level": p["level"],
+        "duration": p["duration"],
+        "category": p["category"],
+        "logo_color": p["logo_color"],
+        "short_name": p["short_name"],
+        "salary": p["salary"],
+        "description": p["description"],
+        "top_colleges": p["top_colleges"],
+    }
 
 
 def get_program(program_id: str):
-    return PROGRAMS.get(program_id)
+    return _load_row(_current(), program_id)
 
 
+@memoize(per_program=True)
 def get_program_context_text(program_id: str):
     p = PROGRAMS.get(program_id)
     if not p:
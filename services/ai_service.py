@@ -7,19 +7,52 @@ Setup:
   3. Run:  python app.py
 
 The key is read once from environment. No changes needed anywhere else.
+
+Common questions the local FAQ index answers confidently (services.faq)
+never reach Groq; those replies carry model_used == "local/faq".
+
+Upstream calls are admitted through services.admission: when Groq is
+saturated, chat() raises Overloaded instead of queueing without bound.
+
+chat_async / chat_stream_async are the asyncio versions used by the async
+serving mode (asgi.py). They share prompt building, caching and metrics
+with the sync functions; only the upstream call differs.
 """
 
 import os
+import json
 import logging
+from collections import namedtuple
+from contextlib import ExitStack, AsyncExitStack
 import requests as http
-from dotenv import load_dotenv
 
-load_dotenv()
+from services import http_client, faq
+from services.admission import get_controller as get_admission
+from services.metrics import Counter, phase
+from services.scheduler import get_scheduler
+from services.response_cache import get_cache, make_key
+from services.tokenizer import count_tokens, count_message_tokens, MESSAGE_OVERHEAD
 
 logger = logging.getLogger(__name__)
 
-GROQ_URL   = "https://api.groq.com/openai/v1/chat/completions"
-GROQ_MODEL = "llama-3.3-70b-versatile"
+CHAT_TOKENS  = Counter("chat_tokens_total", "Tokens per chat reply", ("kind", "source"))
+CHAT_REPLIES = Counter("chat_replies_total", "Chat replies by outcome", ("outcome",))
+
+# Everything chat() needs for the upstream call, built by _prepare().
+_Turn = namedtuple("_Turn", "api_key messages usage cache cache_key")
+
+# Usage attached to replies answered from the local FAQ index.
+LOCAL_USAGE = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "source": "local"}
+
+# GROQ_BASE_URL can point at any OpenAI-compatible server (e.g. tools/fake_groq.py).
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1").rstrip("/")
+GROQ_URL      = f"{GROQ_BASE_URL}/chat/completions"
+GROQ_MODEL    = "llama-3.3-70b-versatile"
+
+# Prompt tokens (system + context + history + message) allowed per request.
+# Older history turns are dropped first when a request would exceed it.
+PROMPT_TOKEN_BUDGET = int(os.getenv("CHAT_PROMPT_TOKEN_BUDGET", 6000))
+MAX_HISTORY_TURNS   = 50
 
 SYSTEM_PROMPT = """You are AdmissAI India — a knowledgeable, warm assistant for Indian college admissions.
 
@@ -40,7 +73,8 @@ Guidelines:
 """
 
 
-def chat(message: str, history: list, program_context: str = None) -> dict:
+def chat(message: str, history: list, program_context: str = None, summary: str = None,
+         program_id: str = None) -> dict:
     """
     Send a message to Groq and return the reply.
 
@@ -49,12 +83,254 @@ def chat(message: str, history: list, program_context: str = None) -> dict:
         history:         Previous turns only: [{"role": "user"|"assistant", "content": str}, ...]
                          Do NOT include the current message in history.
         program_context: Optional extra context string about a selected college/program
+        summary:         Optional rolling summary of turns older than history
+                         (services.sessions), added to the system prompt
+        program_id:      Selected program, if any; lets short questions ("fees")
+                         match that program's local FAQ answers
+
+    Returns:
+        {"reply": str, "model_used": str, "cached": bool, "usage": dict}
+        usage: prompt/completion/total tokens, history turns kept and dropped.
+    """
+    answered, turn = _prepare(message, history, program_context, summary, program_id)
+    if answered:
+        return answered
+
+    # Waiting for an admission slot is timed as "queue", apart from Groq's own latency.
+    with ExitStack() as slot:
+        with phase("queue"):
+            ticket = slot.enter_context(get_admission().admit(turn.usage["prompt_tokens"]))
+        with phase("upstream"):
+            result = _chat_upstream(turn.api_key, turn.messages, turn.usage["prompt_tokens"], ticket.remaining())
+    return _finish(turn, result)
+
+
+async def chat_async(message: str, history: list, program_context: str = None, summary: str = None,
+                     program_id: str = None) -> dict:
+    """chat() without blocking the event loop on Groq. Same arguments and result."""
+    answered, turn = _prepare(message, history, program_context, summary, program_id)
+    if answered:
+        return answered
+
+    async with AsyncExitStack() as slot:
+        with phase("queue"):
+            ticket = await slot.enter_async_context(
+                get_admission(asynchronous=True).admit_async(turn.usage["prompt_tokens"]))
+        with phase("upstream"):
+            result = await _chat_upstream_async(turn.api_key, turn.messages, turn.usage["prompt_tokens"],
+                                                ticket.remaining())
+    return _finish(turn, result)
+
+
+def _prepare(message: str, history: list, program_context: str = None, summary: str = None,
+             program_id: str = None) -> tuple:
+    """
+    Front half of a chat turn: local FAQ, key check, prompt, cache lookup.
 
     Returns:
-        {"reply": str, "model_used": str}
+        (reply, None) when the turn is answered without Groq (FAQ match,
+        bad key or cache hit), else (None, _Turn).
+    """
+    with phase("faq"):
+        local = faq.answer(message, program_id)
+    if local:
+        return _record({**local, "cached": False, "usage": dict(LOCAL_USAGE)}), None
+
+    api_key = http_client.get_api_key()
+    key_error = _check_key(api_key)
+    if key_error:
+        return _record(key_error), None
+
+    with phase("prompt"):
+        messages, usage = _build_messages(message, history, program_context, summary)
+    cache     = get_cache()
+    cache_key = make_key(message, program_context, messages[1:-1], summary) if cache else None
+    if cache:
+        with phase("cache"):
+            hit = cache.get(cache_key)
+        if hit:
+            return _record({**hit, "cached": True, "usage": _finish_usage(usage, hit["reply"])}), None
+
+    return None, _Turn(api_key, messages, usage, cache, cache_key)
+
+
+def _finish(turn: _Turn, result: dict) -> dict:
+    """Back half: cache the upstream result and attach usage."""
+    if turn.cache:
+        turn.cache.set(turn.cache_key, result)
+    upstream_usage = result.pop("usage", None)
+    return _record({**result, "cached": False,
+                    "usage": _finish_usage(turn.usage, result["reply"], upstream_usage)})
+
+
+def _chat_upstream(api_key: str, messages: list, est_tokens: int = 0, deadline: float = None) -> dict:
+    try:
+        # Paced, retried and coalesced with identical in-flight requests.
+        resp = get_scheduler().post_json(
+            GROQ_URL,
+            _headers(api_key),
+            _payload(messages),
+            est_tokens=est_tokens,
+            deadline=deadline,
+        )
+        return _parse_reply(resp)
+
+    except Exception as e:
+        return _request_error(e)
+
+
+async def _chat_upstream_async(api_key: str, messages: list, est_tokens: int = 0,
+                               deadline: float = None) -> dict:
+    try:
+        resp = await get_scheduler().post_json_async(
+            GROQ_URL,
+            _headers(api_key),
+            _payload(messages),
+            est_tokens=est_tokens,
+            deadline=deadline,
+        )
+        return _parse_reply(resp)
+
+    except Exception as e:
+        return _request_error(e)
+
+
+def _parse_reply(resp) -> dict:
+    if not resp.ok:
+        return _status_error(resp.status_code, resp.text)
+
+    data  = resp.data
+    reply = data["choices"][0]["message"]["content"]
+    return {"reply": reply, "model_used": f"groq/{GROQ_MODEL}", "usage": data.get("usage")}
+
+
+def chat_stream(message: str, history: list, program_context: str = None, summary: str = None,
+                program_id: str = None):
     """
-    api_key = os.getenv("GROQ_API_KEY", "").strip()
+    Streaming variant of chat(). Same history and context handling.
+
+    Yields:
+        {"delta": str} for each piece of the reply as Groq produces it, then
+        {"done": True, "reply": str, "model_used": str, "cached": bool, "usage": dict}
+        once. Errors are yielded as a single delta followed by done with
+        model_used == "error". Cache hits arrive as one delta.
+
+    Raises:
+        Overloaded (services.admission) before the first event when no
+        upstream slot frees up; chat() and the async variants raise it too.
+    """
+    answered, turn = _prepare(message, history, program_context, summary, program_id)
+    if answered:
+        yield from _as_events(answered)
+        return
+
+    stream = _StreamState()
+    with get_admission().admit(turn.usage["prompt_tokens"]) as ticket:
+        try:
+            with get_scheduler().stream(
+                GROQ_URL,
+                _headers(turn.api_key),
+                _payload(turn.messages, stream=True),
+                est_tokens=turn.usage["prompt_tokens"],
+                deadline=ticket.remaining(),
+            ) as resp:
+                if not resp.ok:
+                    yield from _as_events(_record(_status_error(resp.status_code, resp.text)))
+                    return
+
+                for line in resp.iter_lines(decode_unicode=True):
+                    if stream.feed(line):
+                        break
+                    if stream.delta:
+                        yield {"delta": stream.delta}
+
+        except Exception as e:
+            yield from stream.failed(e)
+            return
+
+    yield stream.finish(turn)
+
+
+async def chat_stream_async(message: str, history: list, program_context: str = None, summary: str = None,
+                            program_id: str = None):
+    """chat_stream() as an async generator. Same events."""
+    answered, turn = _prepare(message, history, program_context, summary, program_id)
+    if answered:
+        for event in _as_events(answered):
+            yield event
+        return
+
+    stream = _StreamState()
+    async with get_admission(asynchronous=True).admit_async(turn.usage["prompt_tokens"]) as ticket:
+        try:
+            async with get_scheduler().stream_async(
+                GROQ_URL,
+                _headers(turn.api_key),
+                _payload(turn.messages, stream=True),
+                est_tokens=turn.usage["prompt_tokens"],
+                deadline=ticket.remaining(),
+            ) as resp:
+                if not 200 <= resp.status_code < 300:
+                    for event in _as_events(_record(_status_error(resp.status_code, resp.text))):
+                        yield event
+                    return
 
+                async for line in resp.aiter_lines():
+                    if stream.feed(line):
+                        break
+                    if stream.delta:
+                        yield {"delta": stream.delta}
+
+        except Exception as e:
+            for event in stream.failed(e):
+                yield event
+            return
+
+    yield stream.finish(turn)
+
+
+class _StreamState:
+    """Accumulates one streamed reply from Groq's SSE lines."""
+
+    def __init__(self):
+        self.parts = []
+        self.usage = None
+        self.delta = None
+
+    def feed(self, line: str) -> bool:
+        """Parse one SSE line; sets .delta. True at the end of the stream."""
+        self.delta = None
+        if not line or not line.startswith("data:"):
+            return False
+        chunk = line[5:].strip()
+        if chunk == "[DONE]":
+            return True
+        event = json.loads(chunk)
+        # Groq reports usage on the last chunk under x_groq; OpenAI-style servers at top level.
+        self.usage = event.get("usage") or (event.get("x_groq") or {}).get("usage") or self.usage
+        choices    = event.get("choices") or [{}]
+        self.delta = (choices[0].get("delta") or {}).get("content")
+        if self.delta:
+            self.parts.append(self.delta)
+        return False
+
+    def failed(self, e: Exception):
+        if self.parts:
+            # Part of the reply already reached the client; finish it with a note.
+            logger.error(f"Groq stream interrupted: {e}")
+            note = "\n\n**Stream interrupted.** Try again in a moment."
+            yield {"delta": note}
+            yield _record({"done": True, "reply": "".join(self.parts) + note, "model_used": "error"})
+        else:
+            yield from _as_events(_record(_request_error(e)))
+
+    def finish(self, turn: _Turn) -> dict:
+        result = {"reply": "".join(self.parts), "model_used": f"groq/{GROQ_MODEL}", "usage": self.usage}
+        return {"done": True, **_finish(turn, result)}
+
+
+def _check_key(api_key: str):
+    """Return an error reply dict if the key is missing or malformed, else None."""
     if not api_key:
         return {
             "reply": (
@@ -78,72 +354,152 @@ def chat(message: str, history: list, program_context: str = None) -> dict:
             "model_used": "error",
         }
 
+    return None
+
+
+def _clean_history(history: list) -> list:
+    """Well-formed turns, stripped, newest MAX_HISTORY_TURNS at most."""
+    turns = []
+    for turn in history[-MAX_HISTORY_TURNS:]:
+        role    = turn.get("role", "").strip()
+        content = turn.get("content", "").strip()
+        if role in ("user", "assistant") and content:
+            turns.append({"role": role, "content": content})
+    return turns
+
+
+def _pack_history(turns: list, used: int, budget: int) -> list:
+    """Newest turns that fit in `budget` after `used` tokens, oldest first."""
+    kept = []
+    for turn in reversed(turns):
+        cost = count_tokens(turn["content"]) + MESSAGE_OVERHEAD
+        if used + cost > budget:
+            break
+        kept.append(turn)
+        used += cost
+    kept.reverse()
+    return kept
+
+
+def _build_messages(message: str, history: list, program_context: str = None, summary: str = None) -> tuple:
+    """
+    Build the messages array: system (+ program context, + conversation
+    summary) -> history -> message.
+    History is packed newest-first into whatever PROMPT_TOKEN_BUDGET leaves
+    after the system prompt and the current message.
+
+    Returns:
+        (messages, usage) where usage holds the prompt-side token accounting.
+    """
     # Build system prompt, optionally injecting program context
     system = SYSTEM_PROMPT
     if program_context:
         system += f"\n\n--- Selected Program Context ---\n{program_context}\n---"
+    if summary:
+        system += f"\n\n--- Earlier in this conversation ---\n{summary}\n---"
 
-    # Build messages array: system -> history -> current message
     # history contains ONLY previous completed turns.
-    messages = [{"role": "system", "content": system}]
+    turns  = _clean_history(history)
+    fixed  = [{"role": "system", "content": system}, {"role": "user", "content": message}]
+    packed = _pack_history(turns, count_message_tokens(fixed), PROMPT_TOKEN_BUDGET)
 
-    for turn in history[-10:]:
-        role    = turn.get("role", "").strip()
-        content = turn.get("content", "").strip()
-        if role in ("user", "assistant") and content:
-            messages.append({"role": role, "content": content})
+    messages = [fixed[0], *packed, fixed[1]]
+    usage = {
+        "prompt_tokens":         count_message_tokens(messages),
+        "context_tokens":        count_tokens(program_context) if program_context else 0,
+        "summary_tokens":        count_tokens(summary) if summary else 0,
+        "history_turns":         len(packed),
+        "history_turns_dropped": len(turns) - len(packed),
+        "budget":                PROMPT_TOKEN_BUDGET,
+    }
+    return messages, usage
 
-    messages.append({"role": "user", "content": message})
 
-    try:
-        resp = http.post(
-            GROQ_URL,
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type":  "application/json",
-            },
-            json={
-                "model":       GROQ_MODEL,
-                "messages":    messages,
-                "max_tokens":  1024,
-                "temperature": 0.7,
-            },
-            timeout=30,
-        )
+def _finish_usage(usage: dict, reply: str, upstream: dict = None) -> dict:
+    """Add completion counts; prefer Groq's own numbers when it sent them."""
+    usage = dict(usage)
+    if upstream and upstream.get("prompt_tokens") is not None:
+        usage["prompt_tokens"]     = upstream["prompt_tokens"]
+        usage["completion_tokens"] = upstream.get("completion_tokens", count_tokens(reply))
+        usage["source"]            = "groq"
+    else:
+        usage["completion_tokens"] = count_tokens(reply)
+        usage["source"]            = "estimate"
+    usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+    return usage
+
+
+def _record(result: dict) -> dict:
+    """Count a finished reply in the chat metrics and return it unchanged."""
+    if result.get("model_used") == "error":
+        CHAT_REPLIES.inc(outcome="error")
+        return result
+    if result.get("model_used") == faq.MODEL_TAG:
+        CHAT_REPLIES.inc(outcome="faq")
+        return result
+
+    CHAT_REPLIES.inc(outcome="cached" if result.get("cached") else "upstream")
+    usage = result["usage"]
+    CHAT_TOKENS.inc(usage["prompt_tokens"], kind="prompt", source=usage["source"])
+    CHAT_TOKENS.inc(usage["completion_tokens"], kind="completion", source=usage["source"])
+    return result
+
+
+def _headers(api_key: str) -> dict:
+    return {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type":  "application/json",
+    }
+
+
+def _payload(messages: list, stream: bool = False) -> dict:
+    payload = {
+        "model":       GROQ_MODEL,
+        "messages":    messages,
+        "max_tokens":  1024,
+        "temperature": 0.7,
+    }
+    if stream:
+        payload["stream"] = True
+    return payload
+
+
+def _status_error(status_code: int, body: str) -> dict:
+    if status_code == 401:
+        return {
+            "reply": (
+                "**Invalid API key (401 error).**\n\n"
+                "Groq rejected the key in your `.env` file.\n"
+                "- Get a fresh key at https://console.groq.com\n"
+                "- Update `GROQ_API_KEY` in `.env`\n"
+                "- Restart: `python app.py`"
+            ),
+            "model_used": "error",
+        }
 
-        if resp.status_code == 401:
-            return {
-                "reply": (
-                    "**Invalid API key (401 error).**\n\n"
-                    "Groq rejected the key in your `.env` file.\n"
-                    "- Get a fresh key at https://console.groq.com\n"
-                    "- Update `GROQ_API_KEY` in `.env`\n"
-                    "- Restart: `python app.py`"
-                ),
-                "model_used": "error",
-            }
-
-        if resp.status_code == 429:
-            return {
-                "reply": "**Rate limit reached.** Groq's free tier has per-minute limits. Wait 30 seconds and try again.",
-                "model_used": "error",
-            }
-
-        if not resp.ok:
-            logger.error(f"Groq error {resp.status_code}: {resp.text}")
-            return {
-                "reply": f"**Groq API error {resp.status_code}.** Check your terminal for details.",
-                "model_used": "error",
-            }
-
-        data  = resp.json()
-        reply = data["choices"][0]["message"]["content"]
-        return {"reply": reply, "model_used": f"groq/{GROQ_MODEL}"}
-
-    except http.exceptions.ConnectionError:
+    if status_code == 429:
+        return {
+            "reply": "**Rate limit reached.** Groq's free tier has per-minute limits. Wait 30 seconds and try again.",
+            "model_used": "error",
+        }
+
+    logger.error(f"Groq error {status_code}: {body}")
+    return {
+        "reply": f"**Groq API error {status_code}.** Check your terminal for details.",
+        "model_used": "error",
+    }
+
+
+def _request_error(e: Exception) -> dict:
+    if isinstance(e, http.exceptions.ConnectionError):
         return {"reply": "**No connection.** Cannot reach Groq API. Check your internet.", "model_used": "error"}
-    except http.exceptions.Timeout:
+    if isinstance(e, http.exceptions.Timeout):
         return {"reply": "**Timeout.** Groq took too long to respond. Try again in a moment.", "model_used": "error"}
-    except Exception as e:
-        logger.error(f"Groq unexpected error: {e}", exc_info=True)
-        return {"reply": f"**Unexpected error:** {e}\n\nCheck your terminal.", "model_used": "error"}
\ No newline at end of file
+    logger.error(f"Groq unexpected error: {e}", exc_info=True)
+    return {"reply": f"**Unexpected error:** {e}\n\nCheck your terminal.", "model_used": "error"}
+
+
+def _as_events(result: dict):
+    """A finished reply as stream events. Callers have already _record()ed it."""
+    yield {"delta": result["reply"]}
+    yield {"done": True, **result}
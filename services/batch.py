@@ -0,0 +1,150 @@
+"""
+Batch chat — many questions through the normal chat path at once.
+
+Each item is {"message", "history"?, "program_id"?, "retrieve_all"?, "id"?}.
+Items run on a small thread pool (at most `concurrency` in flight), each
+going through the same retrieval, response cache and upstream scheduler as
+/api/chat. Results are yielded as items finish, not in input order:
+
+  {"index": 3, "id": "q3", "status": "ok", "reply": ..., "model_used": ...,
+   "cached": false, "usage": {...}, "elapsed_ms": 812.4}
+
+status is "ok", "error" (upstream returned an error reply) or "invalid"
+(bad item; nothing was sent upstream).
+
+Batches share chat admission (services.admission) with interactive turns.
+Concurrency is clamped to the controller's in-flight limit, and an item
+that is shed anyway waits out Retry-After and tries again, for up to
+CHAT_BATCH_ADMISSION_WAIT seconds, before it is reported as "error".
+
+Config (environment):
+  CHAT_BATCH_CONCURRENCY   default items in flight      (default 4)
+  CHAT_BATCH_MAX_CONCURRENCY  cap a caller can ask for  (default 16)
+  CHAT_BATCH_MAX_ITEMS     items accepted per batch     (default 500)
+  CHAT_BATCH_ADMISSION_WAIT  seconds an item may wait out overload (default 30)
+
+From the command line (JSONL in, NDJSON out):
+  python -m services.batch questions.jsonl --concurrency 8 > answers.ndjson
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from services.admission import Overloaded, get_controller as get_admission
+from services.ai_service import chat as ai_chat
+from services.retrieval import build_context
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = int(os.getenv("CHAT_BATCH_CONCURRENCY", 4))
+MAX_CONCURRENCY     = int(os.getenv("CHAT_BATCH_MAX_CONCURRENCY", 16))
+MAX_ITEMS           = int(os.getenv("CHAT_BATCH_MAX_ITEMS", 500))
+ADMISSION_WAIT      = float(os.getenv("CHAT_BATCH_ADMISSION_WAIT", 30))
+
+
+def run_batch(items: list, concurrency: int = None):
+    """
+    Answer every item, at most `concurrency` at a time.
+
+    Yields:
+        One result dict per item, in completion order (see module docstring).
+        Closing the generator early stops items that have not started.
+    """
+    concurrency = max(1, min(concurrency or DEFAULT_CONCURRENCY, MAX_CONCURRENCY, get_admission().max_in_flight))
+    pending     = iter(enumerate(items))
+    executor    = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="chat-batch")
+    running     = set()
+
+    try:
+        # Submit lazily so a long batch never sits in the executor's queue.
+        for index, item in pending:
+            running.add(executor.submit(_run_item, index, item))
+            if len(running) >= concurrency:
+                break
+
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+                nxt = next(pending, None)
+                if nxt is not None:
+                    running.add(executor.submit(_run_item, *nxt))
+    finally:
+        for future in running:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def _run_item(index: int, item) -> dict:
+    start  = time.perf_counter()
+    result = {"index": index}
+    if isinstance(item, dict) and "id" in item:
+        result["id"] = item["id"]
+
+    error = _validate(item)
+    if error:
+        return {**result, "status": "invalid", "error": error, "elapsed_ms": 0.0}
+
+    message = item["message"].strip()
+    try:
+        retrieve_all = item.get("retrieve_all")
+        if retrieve_all is not None:
+            retrieve_all = bool(retrieve_all)
+        context = build_context(message, item.get("program_id"), all_programs=retrieve_all)
+        reply   = _chat_admitted(message, item.get("history") or [], context, item.get("program_id"))
+    except Overloaded as e:
+        reply = {"reply": str(e), "model_used": "error", "retry_after": e.retry_after}
+    except Exception as e:
+        logger.error(f"Batch item {index} failed: {e}", exc_info=True)
+        reply = {"reply": f"Unexpected error: {e}", "model_used": "error"}
+
+    status = "error" if reply.get("model_used") == "error" else "ok"
+    return {
+        **result,
+        "status":     status,
+        **reply,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
+
+
+def _chat_admitted(message: str, history: list, context, program_id) -> dict:
+    """ai_chat(), waiting out Overloaded for up to ADMISSION_WAIT seconds: a batch is not interactive."""
+    give_up = time.monotonic() + ADMISSION_WAIT
+    while True:
+        try:
+            return ai_chat(message, history, context, program_id=program_id)
+        except Overloaded as e:
+            if time.monotonic() + e.retry_after > give_up:
+                raise
+            time.sleep(e.retry_after)
+
+
+def _validate(item) -> str:
+    """Error message for a malformed item, else None."""
+    if not isinstance(item, dict):
+        return "item must be an object"
+    if not isinstance(item.get("message"), str) or not item["message"].strip():
+        return "message is required"
+    if not isinstance(item.get("history", []), list):
+        return "history must be a list"
+    return None
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of chat items, NDJSON to stdout")
+    parser.add_argument("path", nargs="?", help="JSONL input (default: stdin)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    args = parser.parse_args()
+
+    source = open(args.path) if args.path else sys.stdin
+    with source:
+        batch = [json.loads(line) for line in source if line.strip()]
+
+    for row in run_batch(batch, args.concurrency):
+        print(json.dumps(row), flush=True)
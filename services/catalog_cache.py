@@ -0,0 +1,163 @@
+"""
+Catalog versioning and memoization of catalog-derived values.
+
+The program catalog is static between deploys, so anything derived from it
+(context text, compression results, ...) is computed once and reused until
+the catalog changes.
+
+Every change bumps a global catalog version. Each program also carries the
+version at which it last changed (its revision), so a change to one program
+only invalidates values derived from that program.
+
+Usage:
+    @memoize(per_program=True)          # first argument is a program_id
+    def build_something(program_id, ...): ...
+
+    @memoize(exclusive=True)            # whole-catalog value, built once per version
+    def get_index(): ...
+
+    mark_catalog_changed(["btech"])     # after editing one entry
+    mark_catalog_changed()              # after replacing the whole catalog
+"""
+
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+_lock             = threading.Lock()
+_catalog_version  = 0
+_base_revision    = 0    # revision of every program not listed below
+_revisions        = {}   # program_id -> version of its last change
+
+_memos = []
+
+# Called before reporting versions so a catalog backend can notice changes
+# (e.g. admissions_data re-checking its file). Must be cheap.
+_refresh_hook = None
+
+
+def set_refresh_hook(fn) -> None:
+    global _refresh_hook
+    _refresh_hook = fn
+
+
+def catalog_version() -> int:
+    if _refresh_hook is not None:
+        _refresh_hook()
+    return _catalog_version
+
+
+def program_revision(program_id: str) -> int:
+    if _refresh_hook is not None:
+        _refresh_hook()
+    return _revisions.get(program_id, _base_revision)
+
+
+def mark_catalog_changed(program_ids=None) -> int:
+    """
+    Record a catalog change and return the new version.
+
+    Args:
+        program_ids: Programs that were added, edited or removed.
+                     None means the whole catalog may have changed.
+    """
+    global _catalog_version, _base_revision, _revisions
+    with _lock:
+        _catalog_version += 1
+        if program_ids is None:
+            _base_revision = _catalog_version
+            _revisions     = {}
+        else:
+            revisions = dict(_revisions)
+            for pid in program_ids:
+                revisions[pid] = _catalog_version
+            _revisions = revisions
+    return _catalog_version
+
+
+class CatalogMemo:
+    """
+    Dict memo whose entries are valid for one catalog version (or, with
+    per_program=True, one revision of the program named by key[0]).
+    With max_entries, the least recently used entries are dropped beyond it
+    (for keys taken from user input, e.g. search parameters).
+    With exclusive=True, misses are built one at a time and re-checked under
+    the lock, so concurrent callers of an expensive builder (a whole-catalog
+    index) wait for one build instead of each running their own.
+    """
+
+    def __init__(self, name: str, per_program: bool = False, should_cache=None,
+                 max_entries: int = None, exclusive: bool = False):
+        self.name         = name
+        self.per_program  = per_program
+        self.should_cache = should_cache
+        self.max_entries  = max_entries
+        self.hits         = 0
+        self.misses       = 0
+        self._data        = OrderedDict()
+        self._lock        = threading.Lock()
+        self._build_lock  = threading.Lock() if exclusive else None
+        _memos.append(self)
+
+    def _revision(self, key: tuple) -> int:
+        return program_revision(key[0]) if self.per_program else catalog_version()
+
+    def get(self, key: tuple, build):
+        revision = self._revision(key)
+        entry    = self._data.get(key)
+        if entry is not None and entry[0] == revision:
+            self.hits += 1
+            if self.max_entries:
+                with self._lock:
+                    if key in self._data:
+                        self._data.move_to_end(key)
+            return entry[1]
+
+        if self._build_lock is None:
+            return self._build(key, revision, build)
+        with self._build_lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] == revision:
+                self.hits += 1
+                return entry[1]
+            return self._build(key, revision, build)
+
+    def _build(self, key: tuple, revision: int, build):
+        self.misses += 1
+        value = build()
+        if self.should_cache is None or self.should_cache(value):
+            with self._lock:
+                self._data[key] = (revision, value)
+                self._data.move_to_end(key)
+                while self.max_entries and len(self._data) > self.max_entries:
+                    self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {"entries": len(self._data), "hits": self.hits, "misses": self.misses}
+
+
+def memoize(per_program: bool = False, should_cache=None, max_entries: int = None, exclusive: bool = False):
+    """Decorator form of CatalogMemo. Arguments must be hashable."""
+    def decorator(fn):
+        memo = CatalogMemo(fn.__qualname__, per_program, should_cache, max_entries, exclusive)
+
+        @wraps(fn)
+        def wrapper(*args):
+            return memo.get(args, lambda: fn(*args))
+
+        wrapper.memo = memo
+        return wrapper
+    return decorator
+
+
+def memo_stats() -> dict:
+    return {memo.name: memo.stats() for memo in _memos}
+
+
+def clear_all() -> None:
+    for memo in _memos:
+        memo.clear()
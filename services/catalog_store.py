@@ -0,0 +1,161 @@
+"""
+SQLite storage for the program catalog.
+
+One row per program: the full program dict as JSON plus a checksum, so a
+reader can tell which rows changed without loading all of them.
+
+Build the database from the PROGRAMS seed in admissions_data.py:
+  python -m services.catalog_store import
+or from a JSON file (a list of program dicts, or {id: program}):
+  python -m services.catalog_store import --json programs.json
+
+The file is written to a temp path and swapped in with os.replace, so
+running workers never see a half-written catalog; they pick up the new
+file on their next reload check (see admissions_data). Single-program
+edits from the admin API (routes/admin.py) go through apply(), one SQLite
+transaction per change.
+"""
+
+import os
+import json
+import sqlite3
+import hashlib
+import argparse
+from contextlib import closing
+
+ROOT_DIR     = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PATH = os.path.join(ROOT_DIR, "data", "catalog.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS programs (
+    id        TEXT PRIMARY KEY,
+    position  INTEGER NOT NULL,
+    category  TEXT,
+    level     TEXT,
+    data      TEXT NOT NULL,
+    checksum  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS programs_position ON programs (position);
+"""
+
+
+def catalog_path() -> str:
+    return os.getenv("CATALOG_DB", DEFAULT_PATH)
+
+
+def checksum(program: dict) -> str:
+    return hashlib.sha1(json.dumps(program, sort_keys=True).encode()).hexdigest()
+
+
+class CatalogStore:
+    """Thin reader/writer over the catalog file. Opens a connection per call."""
+
+    def __init__(self, path: str = None):
+        self.path = path or catalog_path()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def stamp(self):
+        """(mtime_ns, size) of the file, or None if it does not exist."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _query(self, sql: str, params=()) -> list:
+        with closing(sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)) as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def checksums(self) -> dict:
+        """{program_id: checksum} in catalog order."""
+        return dict(self._query("SELECT id, checksum FROM programs ORDER BY position"))
+
+    def get(self, program_id: str):
+        rows = self._query("SELECT data FROM programs WHERE id = ?", (program_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def get_many(self, program_ids: list) -> dict:
+        if not program_ids:
+            return {}
+        marks = ",".join("?" * len(program_ids))
+        rows  = self._query(f"SELECT id, data FROM programs WHERE id IN ({marks})", list(program_ids))
+        return {pid: json.loads(data) for pid, data in rows}
+
+    def load_all(self) -> dict:
+        rows = self._query("SELECT id, data FROM programs ORDER BY position")
+        return {pid: json.loads(data) for pid, data in rows}
+
+    def write_all(self, programs: dict) -> None:
+        """Replace the whole catalog atomically."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp-{os.getpid()}"
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.executescript(SCHEMA)
+            conn.executemany(
+                "INSERT INTO programs (id, position, category, level, data, checksum) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (pid, position, p.get("category"), p.get("level"),
+                     json.dumps(p, ensure_ascii=False), checksum(p))
+                    for position, (pid, p) in enumerate(programs.items())
+                ],
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp, self.path)
+
+    def apply(self, upserts: dict, deletes=()) -> None:
+        """
+        Insert or replace `upserts` ({id: program}) and delete `deletes` in one
+        transaction. Existing rows keep their position; new ones go last.
+        """
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            conn.executescript(SCHEMA)
+            last = conn.execute("SELECT COALESCE(MAX(position), -1) FROM programs").fetchone()[0]
+            for pid, p in upserts.items():
+                row = conn.execute("SELECT position FROM programs WHERE id = ?", (pid,)).fetchone()
+                if row:
+                    position = row[0]
+                else:
+                    last    += 1
+                    position = last
+                conn.execute(
+                    "INSERT OR REPLACE INTO programs (id, position, category, level, data, checksum) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (pid, position, p.get("category"), p.get("level"),
+                     json.dumps(p, ensure_ascii=False), checksum(p)),
+                )
+            conn.executemany("DELETE FROM programs WHERE id = ?", [(pid,) for pid in deletes])
+
+
+def _read_json(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return {p["id"]: p for p in data}
+    return data
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the SQLite program catalog")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="write the catalog file from PROGRAMS (or --json)")
+    imp.add_argument("--json", help="import from a JSON file instead of the built-in PROGRAMS seed")
+    imp.add_argument("--path", default=None, help=f"catalog file (default: $CATALOG_DB or {DEFAULT_PATH})")
+    args = parser.parse_args()
+
+    if args.json:
+        programs = _read_json(args.json)
+    else:
+        from services.admissions_data import SEED_PROGRAMS
+        programs = SEED_PROGRAMS
+
+    store = CatalogStore(args.path)
+    store.write_all(programs)
+    print(f"Wrote {len(programs)} programs to {store.path}")
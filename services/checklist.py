@@ -0,0 +1,83 @@
+"""
+Application checklists, categorized once per program.
+
+Each task is tagged with a category by keyword (substring) match. All
+keywords live in one compiled regex; a single scan finds every keyword in
+the task and the highest-priority category among them wins — the same
+answer the old chain of `any(w in task ...)` checks gave.
+
+Programs without a stored "checklist" get one derived from their catalog
+entry (eligibility, entrance exams, colleges). Results are memoized per
+program revision, so they are rebuilt only when that program changes.
+"""
+
+import re
+
+from services.admissions_data import get_program
+from services.catalog_cache import memoize
+
+# In priority order: the first category with a matching keyword wins.
+CATEGORY_KEYWORDS = [
+    ("Essays",          ["essay", "statement", "write", "answer"]),
+    ("Recommendations", ["recommendation", "reference"]),
+    ("Testing",         ["test", "sat", "act", "toefl", "ielts", "lnat", "score"]),
+    ("Academics",       ["transcript", "grade", "academic"]),
+    ("Application",     ["fee", "pay", "submit", "complete", "application"]),
+    ("Interviews",      ["interview"]),
+]
+DEFAULT_CATEGORY = "Other"
+
+_PRIORITY = {}
+for _rank, (_category, _words) in enumerate(CATEGORY_KEYWORDS):
+    for _word in _words:
+        _PRIORITY.setdefault(_word, _rank)
+
+# Zero-width lookahead so overlapping keywords ("test" inside "contest") all match.
+_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(re.escape(w) for w in sorted(_PRIORITY, key=len, reverse=True)) + "))"
+)
+
+
+def categorize(task: str) -> str:
+    ranks = [_PRIORITY[m.group(1)] for m in _KEYWORD_RE.finditer(task.lower())]
+    return CATEGORY_KEYWORDS[min(ranks)][0] if ranks else DEFAULT_CATEGORY
+
+
+@memoize(per_program=True, should_cache=lambda checklist: checklist is not None)
+def program_checklist(program_id: str) -> dict:
+    """
+    Categorized checklist for one program, or None if it doesn't exist.
+    Misses are not cached: ids come straight from the request.
+    """
+    program = get_program(program_id)
+    if not program:
+        return None
+
+    tasks = program.get("checklist") or _default_tasks(program)
+    items = [
+        {"id": f"{program_id}-{i}", "task": task, "category": categorize(task)}
+        for i, task in enumerate(tasks, start=1)
+    ]
+    return {
+        "program_id": program_id,
+        "university": program.get("university", program.get("full")),
+        "program":    program.get("program", program.get("name")),
+        "deadline":   program.get("application_deadline"),
+        "items":      items,
+        "total":      len(items),
+    }
+
+
+def _default_tasks(program: dict) -> list:
+    tasks = [
+        f"Confirm eligibility: {' / '.join(program.get('streams', []))} "
+        f"with at least {program.get('min_percent')}% in 12th",
+        "Keep 12th marksheet and academic documents ready",
+    ]
+    for exam in program.get("exams", [])[:3]:
+        tasks.append(f"Register for the {exam} exam and note its test date")
+    if program.get("top_colleges"):
+        tasks.append(f"Shortlist colleges ({', '.join(program['top_colleges'][:3])}, ...)")
+    tasks.append("Submit application forms and pay the application fee")
+    tasks.append("Prepare for counselling or interview rounds")
+    return tasks
@@ -0,0 +1,105 @@
+"""
+Circuit breaker for a remote dependency with a local fallback.
+
+  closed     calls go through; consecutive failures are counted
+  open       after `failures` consecutive failures (or slow calls), calls are
+             skipped for `cooldown` seconds and the caller falls back at once
+  half_open  after the cooldown one trial call goes through; success closes
+             the circuit, failure opens it for another cooldown
+
+A call slower than `slow_seconds` counts as a failure even when it
+succeeds, so a dependency that is up but crawling trips the breaker too.
+
+    if breaker.allow():
+        start = time.monotonic()
+        try:
+            result = remote()
+        except Exception:
+            breaker.record_failure()
+        else:
+            breaker.record_success(time.monotonic() - start)
+"""
+
+import time
+import threading
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failures: int = 3, cooldown: float = 30.0, slow_seconds: float = None):
+        self.name         = name
+        self.failures     = max(1, failures)
+        self.cooldown     = cooldown
+        self.slow_seconds = slow_seconds
+        self._lock        = threading.Lock()
+        self._state       = CLOSED
+        self._streak      = 0        # consecutive failures while closed
+        self._opened_at   = 0.0
+        self._trial       = False    # a half-open trial call is in flight
+        self.opened       = 0        # times the circuit opened
+        self.skipped      = 0        # calls refused while open
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def allow(self) -> bool:
+        """True if the remote call should be attempted now."""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            self.skipped += 1
+            return False
+
+    def record_success(self, elapsed: float = 0.0) -> None:
+        if self.slow_seconds is not None and elapsed > self.slow_seconds:
+            self.record_failure()
+            return
+        with self._lock:
+            self._state  = CLOSED
+            self._streak = 0
+            self._trial  = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            if self._current_state(now) == HALF_OPEN:
+                self._open(now)
+                return
+            self._streak += 1
+            if self._streak >= self.failures:
+                self._open(now)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state  = CLOSED
+            self._streak = 0
+            self._trial  = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state":   self._current_state(time.monotonic()),
+                "streak":  self._streak,
+                "opened":  self.opened,
+                "skipped": self.skipped,
+            }
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.cooldown:
+            self._state = HALF_OPEN
+            self._trial = False
+        return self._state
+
+    def _open(self, now: float) -> None:
+        self._state     = OPEN
+        self._opened_at = now
+        self._streak    = 0
+        self._trial     = False
+        self.opened    += 1
@@ -1,97 +1,436 @@
 """
 Scaledown API compression wrapper.
-Falls back to basic text shortening if Scaledown is not configured.
+Falls back to local compression if Scaledown is not configured.
+
+Scaledown calls:
+  - ScaleDownCompressor instances are pooled per ratio (rounded to two
+    decimals) and reused; the API key is set once, not per call.
+  - A circuit breaker (services.circuit_breaker) skips Scaledown for a
+    cooldown after repeated failures or slow calls, so requests fall back
+    immediately instead of each waiting for the failure.
+  - SCALEDOWN_MODULE picks the SDK module, e.g. tools.fake_scaledown for a
+    local stand-in with configurable latency and failures.
+
+Fallback engine:
+  1. One regex pass over a precompiled prefix-trie alternation of all
+     abbreviations (longest phrase wins), then one line-by-line pass for
+     whitespace cleanup.
+  2. If the text is still over the target length, whole lines are kept by
+     score: which of the query's terms they contain (IDF-weighted across
+     the lines), plus a small bonus for earlier lines. Kept lines stay in
+     original order.
+
+Config (environment):
+  SCALEDOWN_API_KEY            enables Scaledown
+  SCALEDOWN_MODULE             SDK module to import              (default scaledown)
+  SCALEDOWN_POOL_SIZE          idle compressors kept per ratio   (default 8)
+  SCALEDOWN_BREAKER_FAILURES   consecutive failures to open      (default 3)
+  SCALEDOWN_BREAKER_COOLDOWN   seconds to skip Scaledown         (default 30)
+  SCALEDOWN_SLOW_SECONDS       slower calls count as failures    (default 5)
+  COMPRESS_BATCH_CONCURRENCY   parallel Scaledown calls per batch (default 8)
+  COMPRESS_BATCH_MAX_ITEMS     texts accepted per batch          (default 100)
+
+Benchmark against the previous implementation: python bench/bench_compression.py
 """
 
 import os
 import re
+import math
+import time
+import asyncio
 import logging
-from dotenv import load_dotenv
+import importlib
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from services.catalog_cache import memoize
+from services.circuit_breaker import CircuitBreaker, OPEN
+from services.metrics import Counter
+from services.admissions_data import get_program_context_text
+from services.tokenizer import count_tokens, terms
 
-load_dotenv()
 logger = logging.getLogger(__name__)
 
-try:
-    import scaledown
-    SCALEDOWN_AVAILABLE = True
-except ImportError:
-    SCALEDOWN_AVAILABLE = False
+SCALEDOWN_MODULE  = os.getenv("SCALEDOWN_MODULE", "scaledown")
+POOL_SIZE         = int(os.getenv("SCALEDOWN_POOL_SIZE", 8))
+BATCH_CONCURRENCY = int(os.getenv("COMPRESS_BATCH_CONCURRENCY", 8))
+BATCH_MAX_ITEMS   = int(os.getenv("COMPRESS_BATCH_MAX_ITEMS", 100))
+DEFAULT_RATIO     = 0.45
+
+COMPRESSIONS        = Counter("compressions_total", "compress() calls by provider", ("provider",))
+COMPRESSION_SAVINGS = Counter("compression_tokens_saved_total", "Tokens removed by compress()", ("provider",))
+SCALEDOWN_FALLBACKS = Counter("scaledown_fallbacks_total", "Calls served by the fallback while Scaledown "
+                              "is configured", ("reason",))
 
+BREAKER = CircuitBreaker(
+    "scaledown",
+    failures=int(os.getenv("SCALEDOWN_BREAKER_FAILURES", 3)),
+    cooldown=float(os.getenv("SCALEDOWN_BREAKER_COOLDOWN", 30)),
+    slow_seconds=float(os.getenv("SCALEDOWN_SLOW_SECONDS", 5)),
+)
 
-def compress(text: str, ratio: float = 0.5) -> dict:
-    original_chars  = len(text)
+# The Scaledown SDK is imported on first use, and only when a key is set.
+_scaledown = None     # module once imported, False if not installed
+
+
+def compress(text: str, ratio: float = 0.5, query: str = None) -> dict:
+    """
+    Args:
+        text:  Text to compress
+        ratio: Fraction of the text to remove (0.1 - 0.9)
+        query: Optional user message; the fallback keeps the lines most
+               relevant to it. Scaledown ignores it.
+    """
     original_tokens = _estimate_tokens(text)
-    api_key         = os.getenv("SCALEDOWN_API_KEY", "")
 
-    if SCALEDOWN_AVAILABLE and api_key and not api_key.startswith("sk-your"):
-        try:
-            scaledown.set_api_key(api_key)
-            compressor      = scaledown.ScaleDownCompressor(compression_ratio=ratio)
-            compressed_text = compressor.compress(text)
+    if _scaledown_configured():
+        if BREAKER.allow():
+            compressed_text = _scaledown_compress(text, ratio)
+            if compressed_text is not None:
+                return _result(text, compressed_text, original_tokens, "scaledown")
+        else:
+            SCALEDOWN_FALLBACKS.inc(reason="circuit_open")
 
-            compressed_tokens = _estimate_tokens(compressed_text)
-            actual_ratio      = round(1 - (compressed_tokens / max(original_tokens, 1)), 3)
+    compressed_text = _fallback_compress(text, ratio, query)
+    return _result(text, compressed_text, original_tokens, "fallback")
 
-            return {
-                "compressed_text":  compressed_text,
-                "original_chars":   original_chars,
-                "compressed_chars": len(compressed_text),
-                "original_tokens":  original_tokens,
-                "compressed_tokens":compressed_tokens,
-                "compression_ratio":actual_ratio,
-                "tokens_saved":     original_tokens - compressed_tokens,
-                "provider":         "scaledown",
-            }
-        except Exception as e:
-            logger.error(f"Scaledown failed: {e}. Using fallback.")
 
-    compressed_text   = _fallback_compress(text, ratio)
+async def compress_async(text: str, ratio: float = 0.5, query: str = None) -> dict:
+    """
+    compress() for asyncio callers. The Scaledown SDK is blocking, so the
+    call runs on the default thread pool instead of the event loop.
+    """
+    return await asyncio.get_running_loop().run_in_executor(None, compress, text, ratio, query)
+
+
+def compress_many(items: list, concurrency: int = None) -> list:
+    """
+    compress() over many items: [{"text", "ratio"?, "query"?, "id"?}, ...].
+
+    Scaledown calls run in parallel (at most `concurrency` at a time); the
+    local fallback is CPU-bound, so it runs inline when Scaledown is off or
+    its circuit is open.
+
+    Returns:
+        One dict per item, in input order: {"index", "id"?, "status": "ok",
+        **compress() result} or {"index", "id"?, "status": "invalid", "error"}.
+    """
+    concurrency = max(1, min(concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY))
+    jobs = [(index, item) for index, item in enumerate(items)]
+
+    if concurrency == 1 or len(jobs) == 1 or not _scaledown_configured() or BREAKER.state == OPEN:
+        return [_batch_item(index, item) for index, item in jobs]
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(jobs)), thread_name_prefix="compress-batch") as pool:
+        return list(pool.map(lambda job: _batch_item(*job), jobs))
+
+
+def compress_program(program_id: str, ratio: float = 0.5):
+    """
+    compress() applied to a program's context text, computed once per
+    (program_id, ratio) and reused until that program changes.
+    Returns None for unknown programs. Treat the result as read-only.
+    """
+    return _compress_program(program_id, float(ratio))
+
+
+def parse_ratio(value, default: float = DEFAULT_RATIO):
+    """(ratio, None) or (None, error message) for a request's "ratio" field."""
+    try:
+        ratio = float(default if value is None else value)
+    except (TypeError, ValueError):
+        return None, "ratio must be a number"
+    if not 0.1 <= ratio <= 0.9:
+        return None, "ratio must be between 0.1 and 0.9"
+    return ratio, None
+
+
+def parse_query(value):
+    """(query or None, None) or (None, error message) for a request's "query" field."""
+    if value is None:
+        return None, None
+    if not isinstance(value, str):
+        return None, "query must be a string"
+    return value.strip() or None, None
+
+
+def provider_stats() -> dict:
+    return {
+        "configured": _scaledown_configured(),
+        "module":     SCALEDOWN_MODULE,
+        "breaker":    BREAKER.stats(),
+        "pool":       _pool.stats(),
+    }
+
+
+def reset_provider() -> None:
+    """Drop pooled compressors (after a fork, or a key change in tests)."""
+    _pool.clear()
+
+
+def _batch_item(index: int, item) -> dict:
+    result = {"index": index}
+    if isinstance(item, dict) and "id" in item:
+        result["id"] = item["id"]
+
+    if not isinstance(item, dict):
+        return {**result, "status": "invalid", "error": "item must be an object"}
+    text = item.get("text")
+    if not isinstance(text, str) or not text.strip():
+        return {**result, "status": "invalid", "error": "text is required"}
+    ratio, error = parse_ratio(item.get("ratio"))
+    if error:
+        return {**result, "status": "invalid", "error": error}
+    query, error = parse_query(item.get("query"))
+    if error:
+        return {**result, "status": "invalid", "error": error}
+
+    return {**result, "status": "ok", **compress(text.strip(), ratio, query=query)}
+
+
+def _result(text: str, compressed_text: str, original_tokens: int, provider: str) -> dict:
     compressed_tokens = _estimate_tokens(compressed_text)
     actual_ratio      = round(1 - (compressed_tokens / max(original_tokens, 1)), 3)
 
+    COMPRESSIONS.inc(provider=provider)
+    COMPRESSION_SAVINGS.inc(max(0, original_tokens - compressed_tokens), provider=provider)
     return {
         "compressed_text":  compressed_text,
-        "original_chars":   original_chars,
+        "original_chars":   len(text),
         "compressed_chars": len(compressed_text),
         "original_tokens":  original_tokens,
         "compressed_tokens":compressed_tokens,
         "compression_ratio":actual_ratio,
         "tokens_saved":     original_tokens - compressed_tokens,
-        "provider":         "fallback",
+        "provider":         provider,
     }
 
 
+def _scaledown_compress(text: str, ratio: float):
+    """Scaledown's output, or None after recording the failure with the breaker."""
+    start = time.monotonic()
+    try:
+        with _pool.compressor(ratio) as compressor:
+            compressed_text = compressor.compress(text)
+    except Exception as e:
+        BREAKER.record_failure()
+        SCALEDOWN_FALLBACKS.inc(reason="error")
+        logger.error(f"Scaledown failed: {e}. Using fallback.")
+        return None
+
+    elapsed = time.monotonic() - start
+    BREAKER.record_success(elapsed)
+    if BREAKER.slow_seconds is not None and elapsed > BREAKER.slow_seconds:
+        logger.warning(f"Scaledown took {elapsed:.1f}s (slow threshold {BREAKER.slow_seconds}s)")
+    return compressed_text
+
+
+class _CompressorPool:
+    """
+    Idle ScaleDownCompressor instances per ratio. A call checks one out and
+    returns it afterwards, so an instance is never used by two threads at
+    once; one that raised is dropped rather than reused.
+    """
+
+    def __init__(self, max_idle: int):
+        self.max_idle = max_idle
+        self._lock    = threading.Lock()
+        self._idle    = {}       # ratio -> [compressor, ...]
+        self._api_key = None     # key the SDK was last configured with
+        self.created  = 0
+        self.reused   = 0
+
+    @contextmanager
+    def compressor(self, ratio: float):
+        sdk     = _load_scaledown()
+        api_key = os.getenv("SCALEDOWN_API_KEY", "")
+        ratio   = round(ratio, 2)
+
+        with self._lock:
+            if api_key != self._api_key:
+                sdk.set_api_key(api_key)
+                self._api_key = api_key
+                self._idle.clear()
+            idle     = self._idle.setdefault(ratio, [])
+            instance = idle.pop() if idle else None
+            if instance is None:
+                self.created += 1
+            else:
+                self.reused += 1
+        if instance is None:
+            instance = sdk.ScaleDownCompressor(compression_ratio=ratio)
+
+        yield instance
+
+        with self._lock:
+            idle = self._idle.get(ratio)
+            if idle is not None and api_key == self._api_key and len(idle) < self.max_idle:
+                idle.append(instance)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._idle.clear()
+            self._api_key = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "idle":    sum(len(idle) for idle in self._idle.values()),
+                "ratios":  len(self._idle),
+                "created": self.created,
+                "reused":  self.reused,
+            }
+
+
+_pool = _CompressorPool(POOL_SIZE)
+
+
+def _scaledown_configured() -> bool:
+    api_key = os.getenv("SCALEDOWN_API_KEY", "")
+    return bool(api_key) and not api_key.startswith("sk-your") and _load_scaledown() is not None
+
+
+def _load_scaledown():
+    global _scaledown
+    if _scaledown is None:
+        try:
+            _scaledown = importlib.import_module(SCALEDOWN_MODULE)
+        except ImportError:
+            _scaledown = False
+    return _scaledown or None
+
+
+def is_cacheable(result) -> bool:
+    """
+    False for a fallback result while Scaledown is configured: that means
+    Scaledown just failed, so retry it next time instead of pinning the
+    fallback output (also applies to anything built from the result).
+    """
+    return result is None or result["provider"] != "fallback" or not _scaledown_configured()
+
+
+@memoize(per_program=True, should_cache=is_cacheable)
+def _compress_program(program_id: str, ratio: float):
+    context_text = get_program_context_text(program_id)
+    if context_text is None:
+        return None
+    return compress(context_text, ratio)
+
+
 def _estimate_tokens(text: str) -> int:
-    return max(1, len(text) // 4)
-
-
-def _fallback_compress(text: str, ratio: float) -> str:
-    replacements = {
-        "University":          "Univ.",
-        "Department":          "Dept.",
-        "requirement":         "req.",
-        "requirements":        "reqs.",
-        "extracurricular":     "EC",
-        "recommendation":      "rec.",
-        "recommendations":     "recs.",
-        "standardized test":   "std. test",
-        "application deadline":"app. deadline",
-        "personal statement":  "PS",
-        "strongly recommended":"strongly rec.",
-        "is required":         "required",
-        "is not required":     "not required",
-    }
+    return max(1, count_tokens(text))
+
+
+ABBREVIATIONS = {
+    "University":          "Univ.",
+    "Department":          "Dept.",
+    "requirement":         "req.",
+    "requirements":        "reqs.",
+    "extracurricular":     "EC",
+    "recommendation":      "rec.",
+    "recommendations":     "recs.",
+    "standardized test":   "std. test",
+    "application deadline":"app. deadline",
+    "personal statement":  "PS",
+    "strongly recommended":"strongly rec.",
+    "is required":         "required",
+    "is not required":     "not required",
+}
+
+
+def _trie_pattern(phrases) -> str:
+    """
+    Regex for a set of literal phrases, factored as a prefix trie
+    ("re(?:commendations?|quirements?)"), so one left-to-right pass tries
+    at most one branch per character instead of every phrase.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node) -> str:
+        alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+# Greedy quantifiers make the longest phrase win ("requirements" over "requirement").
+_ABBREV_RE     = re.compile(_trie_pattern(ABBREVIATIONS))
+_MULTISPACE_RE = re.compile(r" {2,}")
+
+_MARKER = "[...compressed]"
+
+
+def _clean_lines(text: str) -> list:
+    """Strip trailing whitespace, squeeze runs of spaces, allow at most one blank line in a row."""
+    lines, blank = [], False
+    for line in text.split("\n"):
+        line = line.rstrip(" \t")
+        if "  " in line:
+            line = _MULTISPACE_RE.sub(" ", line)
+        if not line:
+            if blank:
+                continue
+            blank = True
+        else:
+            blank = False
+        lines.append(line)
+    return lines
+
+
+def _select_lines(lines: list, target_len: int, query: str = None) -> str:
+    """Keep the highest-scoring lines that fit in target_len, in original order."""
+    lines = [line for line in lines if line]
+    n     = len(lines)
+    if not n:
+        return ""
+
+    scores = [0.1 * (1 - i / n) for i in range(n)]   # earlier lines first when tied
+    scores[0] += 1.0                                  # the heading names the program
+
+    query_terms = set(terms(query)) if query else set()
+    if query_terms:
+        # Substring tests are C-speed; a term also matches inside longer
+        # words ("cutoff" in "cutoffs"), which is fine for ranking.
+        lowered = [line.lower() for line in lines]
+        for term in query_terms:
+            found = [i for i, line in enumerate(lowered) if term in line]
+            if found:
+                idf = math.log(1 + n / len(found))
+                for i in found:
+                    scores[i] += idf
+
+    budget = target_len - len(_MARKER) - 1
+    kept, used = [], 0
+    for i in sorted(range(n), key=scores.__getitem__, reverse=True):
+        cost = len(lines[i]) + 1
+        if used + cost <= budget:
+            kept.append(i)
+            used += cost
+
+    if not kept:
+        best = max(range(n), key=scores.__getitem__)
+        return lines[best][:max(budget, 0)] + "\n" + _MARKER
+
+    kept.sort()
+    body = "\n".join(lines[i] for i in kept)
+    return body if len(kept) == n else body + "\n" + _MARKER
 
-    result = text
-    for phrase, abbrev in replacements.items():
-        result = result.replace(phrase, abbrev)
 
-    result = re.sub(r"\n{3,}", "\n\n", result)
-    result = re.sub(r"[ \t]+\n", "\n", result)
-    result = re.sub(r" {2,}", " ", result)
+def _fallback_compress(text: str, ratio: float, query: str = None) -> str:
+    result = _ABBREV_RE.sub(lambda m: ABBREVIATIONS[m.group(0)], text)
+    lines  = _clean_lines(result)
 
     target_len = int(len(text) * (1 - ratio + 0.15))
-    if len(result) > target_len:
-        result = result[:target_len].rsplit("\n", 1)[0] + "\n[...compressed]"
+    if sum(len(line) + 1 for line in lines) - 1 > target_len:
+        return _select_lines(lines, target_len, query).strip()
 
-    return result.strip()
\ No newline at end of file
+    return "\n".join(lines).strip()
@@ -0,0 +1,242 @@
+"""
+Eligibility engine — which programs a student qualifies for, and how well.
+
+An index is built once per catalog version: for every (stream, level) pair,
+the programs open to that stream sorted by min_percent. A lookup is a single
+bisect per pair — everything left of the insertion point of the student's
+marks is eligible — so scoring a whole class roster stays cheap.
+
+Streams use the keys the frontend sends (pcm, pcb, commerce, commerce_maths,
+arts, arts_maths, any_graduate); catalog labels like "Commerce+Maths" or
+"Any graduate" are normalized to them. A student with maths in commerce or
+arts also qualifies for programs open to plain commerce or arts.
+
+Eligible programs are then scored from 12th marks and any entrance exam
+results the profile carries, and ranked best match first.
+"""
+
+import re
+from bisect import bisect_right
+
+from services.admissions_data import PROGRAMS
+from services.catalog_cache import memoize
+
+LEVELS = ("UG", "PG")
+
+# A student in the key stream also qualifies for the listed streams.
+STREAM_IMPLIES = {
+    "commerce_maths": ("commerce",),
+    "arts_maths":     ("arts",),
+}
+
+# exam score key -> (catalog exam name, higher_is_better, [(threshold, points, reason)], points otherwise)
+# Reasons are formatted with the score. Percentiles/scores: higher is better; ranks: lower is better.
+EXAM_RULES = {
+    "jee":  ("JEE Main", True, [
+        (99, 38, "JEE {}%ile — IIT zone"),
+        (97, 28, "JEE {}%ile — NIT/BITS zone"),
+        (90, 16, "JEE {}%ile"),
+    ], 7),
+    "cat":  ("CAT", True, [
+        (99, 38, "CAT {}%ile — IIM A/B/C zone"),
+        (95, 28, "CAT {}%ile — top IIMs"),
+        (85, 16, "CAT {}%ile"),
+    ], 7),
+    "gate": ("GATE", True, [
+        (700, 36, "GATE {} — IIT zone"),
+        (550, 22, "GATE {} — NIT zone"),
+    ], 9),
+    "neet": ("NEET-UG", False, [
+        (50,    38, "NEET rank {} — AIIMS level"),
+        (5000,  28, "NEET rank {} — Govt medical"),
+        (50000, 14, "NEET rank {}"),
+    ], 5),
+    "clat": ("CLAT", False, [
+        (100,  36, "CLAT rank {} — Top NLU"),
+        (1000, 22, "CLAT rank {}"),
+    ], 9),
+    "cuet": ("CUET", True, [
+        (700, 26, "CUET {} — DU top colleges"),
+        (550, 15, "CUET {}"),
+    ], 7),
+}
+
+MARKS_RULES = [
+    (95, 28, "Outstanding 12th ({}%)"),
+    (85, 20, "Strong 12th ({}%)"),
+    (75, 13, "Good 12th ({}%)"),
+]
+
+MATCH_LABELS = [(70, "Strong Match"), (50, "Good Match"), (30, "Possible"), (0, "Low Match")]
+
+_STREAM_RE = re.compile(r"[^a-z]+")
+
+
+def normalize_stream(label: str) -> str:
+    """"Commerce+Maths" -> "commerce_maths", "Any graduate" -> "any_graduate"."""
+    return _STREAM_RE.sub("_", str(label).lower()).strip("_")
+
+
+class EligibilityIndex:
+    """(stream, level) -> min_percent-sorted program ids, with parallel bisect keys."""
+
+    def __init__(self, programs: dict):
+        buckets = {}
+        for pid, p in programs.items():
+            level = p.get("level")
+            for label in p.get("streams", ()):
+                buckets.setdefault((normalize_stream(label), level), []).append((float(p["min_percent"]), pid))
+
+        self.ids     = {}
+        self.keys    = {}
+        self.streams = sorted({stream for stream, _ in buckets} | set(STREAM_IMPLIES))
+        for key, entries in buckets.items():
+            entries.sort()
+            self.keys[key] = [m for m, _ in entries]
+            self.ids[key]  = [pid for _, pid in entries]
+
+    def lookup(self, stream: str, marks: float, levels=LEVELS) -> list:
+        """Program ids open to `stream` whose min_percent <= marks."""
+        found = []
+        for s in (stream, *STREAM_IMPLIES.get(stream, ())):
+            for level in levels:
+                key = (s, level)
+                if key in self.keys:
+                    found.extend(self.ids[key][:bisect_right(self.keys[key], marks)])
+        return list(dict.fromkeys(found))
+
+
+@memoize(exclusive=True)
+def get_index() -> EligibilityIndex:
+    return EligibilityIndex(dict(PROGRAMS.items()))
+
+
+def check_profile(profile: dict) -> dict:
+    """
+    Eligible programs for one profile, best match first.
+
+    Args:
+        profile: {"stream": str, "marks": number, "level"?: "ug"|"pg"|"all",
+                  "scores"?: {"jee", "cat", "gate", "neet", "clat", "cuet"}, "id"?: any}
+
+    Returns:
+        {"stream", "marks", "level", "count", "results": [...]} (plus "id" if
+        given), or {"error": str} when the profile is invalid.
+    """
+    result = {"id": profile["id"]} if isinstance(profile, dict) and "id" in profile else {}
+    parsed = _parse_profile(profile)
+    if isinstance(parsed, str):
+        return {**result, "error": parsed}
+
+    stream, marks, level, scores = parsed
+    index  = get_index()
+    levels = LEVELS if level == "all" else (level.upper(),)
+
+    ranked = []
+    for pid in index.lookup(stream, marks, levels):
+        p = PROGRAMS.get(pid)
+        if not p:
+            continue
+        score, reasons = score_program(p, marks, scores)
+        ranked.append({
+            "program_id":  pid,
+            "name":        p["name"],
+            "full":        p["full"],
+            "level":       p["level"],
+            "min_percent": p["min_percent"],
+            "exams":       p["exams"],
+            "score":       score,
+            "match":       next(label for cutoff, label in MATCH_LABELS if score >= cutoff),
+            "reasons":     reasons,
+        })
+
+    # Best score (marks + exam results) first, then UG before PG.
+    ranked.sort(key=lambda r: (-r["score"], LEVELS.index(r["level"]), r["program_id"]))
+    return {**result, "stream": stream, "marks": marks, "level": level, "count": len(ranked), "results": ranked}
+
+
+def check_profiles(profiles: list) -> list:
+    return [check_profile(p) for p in profiles]
+
+
+def score_program(program: dict, marks: float, scores: dict) -> tuple:
+    """(score 0-100, reasons) from 12th marks and the exams this program accepts."""
+    score   = 10
+    reasons = []
+
+    points, reason = _tier(marks, True, MARKS_RULES, 5)
+    score += points
+    reasons.append(reason.format(_fmt(marks)) if reason else f"Meets minimum ({_fmt(marks)}%)")
+
+    exams = program.get("exams", ())
+    for key, value in scores.items():
+        exam, higher, tiers, otherwise = EXAM_RULES[key]
+        if exam not in exams:
+            continue
+        points, reason = _tier(value, higher, tiers, otherwise)
+        score += points
+        if reason:
+            reasons.append(reason.format(_fmt(value)))
+
+    return min(score, 100), reasons
+
+
+def _tier(value: float, higher_is_better: bool, tiers: list, otherwise: int) -> tuple:
+    for threshold, points, reason in tiers:
+        if (value >= threshold) if higher_is_better else (value <= threshold):
+            return points, reason
+    return otherwise, None
+
+
+def parse_student(profile, streams: list):
+    """
+    (stream, marks, level) from a student profile, or an error message.
+    Shared by every endpoint that takes a profile (eligibility, ranking).
+    """
+    if not isinstance(profile, dict):
+        return "profile must be an object"
+
+    stream = normalize_stream(profile.get("stream", ""))
+    if stream not in streams:
+        return f"unknown stream; expected one of {', '.join(streams)}"
+
+    try:
+        marks = float(profile.get("marks"))
+    except (TypeError, ValueError):
+        return "marks must be a number"
+    if not 0 <= marks <= 100:
+        return "marks must be between 0 and 100"
+
+    level = str(profile.get("level") or "all").lower()
+    if level not in ("ug", "pg", "all"):
+        return "level must be ug, pg or all"
+
+    return stream, marks, level
+
+
+def _parse_profile(profile):
+    """(stream, marks, level, scores) or an error message."""
+    student = parse_student(profile, get_index().streams)
+    if isinstance(student, str):
+        return student
+    stream, marks, level = student
+
+    raw_scores = profile.get("scores") or {}
+    if not isinstance(raw_scores, dict):
+        return "scores must be an object of exam scores"
+    scores = {}
+    for key, value in raw_scores.items():
+        if key not in EXAM_RULES or value in (None, ""):
+            continue
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return f"scores.{key} must be a number"
+        if value > 0:
+            scores[key] = value
+
+    return stream, marks, level, scores
+
+
+def _fmt(value: float):
+    return int(value) if float(value).is_integer() else value
@@ -0,0 +1,273 @@
+"""
+Local FAQ answers — common questions answered without a Groq call.
+
+Two sources, one index:
+  catalog   question variants generated per program and field (exams,
+            eligibility / min_percent, fees, cutoffs, salary, top colleges,
+            careers, duration, overview), answered straight from PROGRAMS
+  curated   services/data/faq.json: [{"id", "questions": [...], "answer"}]
+            for general questions (JEE Main vs Advanced, CUET, NEET, ...)
+
+Matching is lexical nearest neighbour: every question variant is a row of
+a precomputed NumPy TF-IDF matrix (sublinear tf, L2-normalized), and a
+message is scored against all rows with one matrix-vector product. Query
+terms the index has never seen still count towards the query's length, so
+a question that goes beyond the FAQ ("B.Tech fees at IIT Bombay hostel")
+scores low and falls through to Groq.
+
+A match is answered locally only when its cosine score is at least
+FAQ_THRESHOLD and beats the best row with a *different* answer by
+FAQ_MARGIN; comparisons ("BCA vs BBA fees") tie and fall through.
+
+A program's rows only match when the message names that program (id, name
+or full name); with a program selected, short program-less variants
+("fees", "cutoff") match too, for that program only.
+
+The index is rebuilt per catalog version from per-program question sets,
+which are regenerated only for programs that changed. Replies carry
+model_used == "local/faq".
+
+Config (environment):
+  FAQ_ENABLED    1 = answer matches locally                (default 1)
+  FAQ_THRESHOLD  minimum cosine score                      (default 0.8)
+  FAQ_MARGIN     lead over the best different answer       (default 0.08)
+  FAQ_PATH       curated Q&A file                (default services/data/faq.json)
+"""
+
+import os
+import re
+import json
+import math
+import logging
+import numpy as np
+
+from services.admissions_data import PROGRAMS
+from services.catalog_cache import memoize
+from services.tokenizer import terms
+
+logger = logging.getLogger(__name__)
+
+ENABLED   = os.getenv("FAQ_ENABLED", "1") == "1"
+THRESHOLD = float(os.getenv("FAQ_THRESHOLD", 0.8))
+MARGIN    = float(os.getenv("FAQ_MARGIN", 0.08))
+FAQ_PATH  = os.getenv("FAQ_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "faq.json"))
+
+MODEL_TAG = "local/faq"
+FOOTER    = "\n\n_Answered instantly from the AdmissAI catalog. Ask a follow-up for more detail._"
+
+# "B.Tech" -> "btech", "M.B.B.S" -> "mbbs", so dotted and plain spellings match.
+_DOTTED_RE = re.compile(r"\b([a-z])\.(?=[a-z])")
+
+# intent -> question templates; "{p}" is the program alias, "{full}" its full name.
+# Templates without a program are added as scoped rows (selected program only).
+TEMPLATES = {
+    "overview":    ["what is {p}", "tell me about {p}", "{p} course details", "about {full}"],
+    "exams":       ["{p} entrance exams", "which exams for {p}", "exams required for {p} admission",
+                    "entrance test for {p}"],
+    "eligibility": ["{p} eligibility", "eligibility criteria for {p}", "minimum percentage for {p}",
+                    "marks needed in 12th for {p}", "which stream for {p}"],
+    "fees":        ["{p} fees", "how much does {p} cost", "{p} fee structure"],
+    "cutoffs":     ["{p} cutoff", "cutoffs for {p}", "rank needed for {p}"],
+    "salary":      ["{p} salary", "average salary after {p}", "{p} package"],
+    "colleges":    ["top colleges for {p}", "best {p} colleges", "{p} colleges"],
+    "careers":     ["careers after {p}", "jobs after {p}", "{p} career options"],
+    "duration":    ["how long is {p}", "{p} duration", "how many years is {p}"],
+}
+
+
+def normalize(text: str) -> str:
+    return _DOTTED_RE.sub(r"\1", text.lower())
+
+
+def answer(message: str, program_id: str = None):
+    """
+    A local reply for the message, or None to fall through to Groq.
+
+    Returns:
+        {"reply": str, "model_used": "local/faq", "faq": {"id", "score", "question"}}
+    """
+    if not ENABLED or not message:
+        return None
+    if not isinstance(program_id, str):
+        program_id = None
+    match = get_index().match(message, program_id)
+    if match is None:
+        return None
+    entry, score, question = match
+    return {
+        "reply":      entry["answer"] + FOOTER,
+        "model_used": MODEL_TAG,
+        "faq":        {"id": entry["id"], "score": round(score, 3), "question": question},
+    }
+
+
+class FaqIndex:
+    """
+    TF-IDF rows over question variants:
+      rows[i] -> (entry index, program_id or None, scoped, question text)
+    """
+
+    def __init__(self, entries: list, rows: list):
+        self.entries = entries
+        self.rows    = rows
+        vocab, counts = {}, []
+        for _, _, _, question in rows:
+            tf = {}
+            for t in terms(normalize(question)):
+                tid = vocab.setdefault(t, len(vocab))
+                tf[tid] = tf.get(tid, 0) + 1
+            counts.append(tf)
+
+        n_rows     = max(1, len(rows))
+        df         = np.zeros(len(vocab), dtype=np.float32)
+        for tf in counts:
+            df[list(tf)] += 1
+        self.vocab   = vocab
+        self.idf     = np.log((1 + n_rows) / (1 + df)) + 1
+        self.oov_idf = math.log(1 + n_rows) + 1          # weight of a term no row contains
+
+        matrix = np.zeros((len(rows), len(vocab)), dtype=np.float32)
+        for i, tf in enumerate(counts):
+            for tid, c in tf.items():
+                matrix[i, tid] = (1 + math.log(c)) * self.idf[tid]
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        self.matrix = matrix / np.maximum(norms, 1e-9)
+
+        self.entry_ids = np.array([r[0] for r in rows], dtype=np.int64)
+        self.row_pids  = np.array([r[1] or "" for r in rows], dtype=object)
+        self.scoped    = np.array([r[2] for r in rows], dtype=bool)
+        self.general   = self.row_pids == ""
+        self.aliases   = {pid: [set(terms(normalize(a))) for a in _aliases(p)] for pid, p in PROGRAMS.items()}
+
+    def match(self, message: str, program_id: str = None):
+        """(entry, score, question) for a confident match, else None."""
+        counts = {}
+        for t in terms(normalize(message)):
+            counts[t] = counts.get(t, 0) + 1
+        if not counts or not len(self.rows):
+            return None
+
+        query, oov = np.zeros(len(self.vocab), dtype=np.float32), 0.0
+        for t, c in counts.items():
+            weight = 1 + math.log(c)
+            tid = self.vocab.get(t)
+            if tid is None:
+                oov += (weight * self.oov_idf) ** 2
+            else:
+                query[tid] = weight * self.idf[tid]
+        norm = math.sqrt(float(query @ query) + oov)
+        if norm == 0:
+            return None
+
+        named   = [pid for pid, aliases in self.aliases.items() if any(a and a <= counts.keys() for a in aliases)]
+        allowed = self.general | (~self.scoped & np.isin(self.row_pids, named))
+        if program_id:
+            allowed |= self.scoped & (self.row_pids == program_id)
+        scores = np.where(allowed, self.matrix @ (query / norm), -1.0)
+
+        best = int(np.argmax(scores))
+        top  = float(scores[best])
+        if top < THRESHOLD:
+            return None
+        rivals = scores[self.entry_ids != self.entry_ids[best]]
+        if len(rivals) and top - float(rivals.max()) < MARGIN:
+            return None
+        return self.entries[self.entry_ids[best]], top, self.rows[best][3]
+
+
+def catalog_entries() -> tuple:
+    """(entries, rows) generated from PROGRAMS."""
+    entries, rows = [], []
+    for pid in PROGRAMS:
+        for entry, questions in program_entries(pid):
+            index = len(entries)
+            entries.append(entry)
+            rows.extend((index, pid, scoped, question) for scoped, question in questions)
+    return entries, rows
+
+
+@memoize(per_program=True)
+def program_entries(program_id: str) -> tuple:
+    """((entry, [(scoped, question), ...]), ...) for one program, built once per revision."""
+    p = PROGRAMS.get(program_id)
+    if not p:
+        return ()
+    result  = []
+    aliases = dict.fromkeys(_aliases(p)[:-1])
+    for intent, templates in TEMPLATES.items():
+        text = _catalog_answer(intent, p)
+        if text is None:
+            continue
+        questions = []
+        for template in templates:
+            if "{full}" in template:
+                questions.append((False, template.format(full=p["full"])))
+                continue
+            questions.extend((False, template.format(p=alias)) for alias in aliases)
+            scoped = " ".join(template.format(p="").split())
+            if terms(scoped):
+                questions.append((True, scoped))
+        result.append(({"id": f"{program_id}:{intent}", "answer": text}, questions))
+    return tuple(result)
+
+
+def curated_entries(offset: int = 0) -> tuple:
+    """(entries, rows) from FAQ_PATH; missing or malformed files are logged and skipped."""
+    try:
+        with open(FAQ_PATH, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"FAQ file {FAQ_PATH} not loaded: {e}")
+        return [], []
+
+    entries, rows = [], []
+    for item in data:
+        if not isinstance(item, dict) or not item.get("answer") or not item.get("questions"):
+            continue
+        index = offset + len(entries)
+        entries.append({"id": item.get("id", f"faq:{index}"), "answer": item["answer"]})
+        rows.extend((index, None, False, q) for q in item["questions"])
+    return entries, rows
+
+
+@memoize(exclusive=True)
+def get_index() -> FaqIndex:
+    entries, rows = catalog_entries()
+    extra, extra_rows = curated_entries(len(entries))
+    return FaqIndex(entries + extra, rows + extra_rows)
+
+
+def _aliases(p: dict) -> list:
+    """Ways a message names the program; the full name last."""
+    return [p["id"], normalize(p["name"]), normalize(p.get("short_name") or p["name"]), p["full"]]
+
+
+def _catalog_answer(intent: str, p: dict):
+    name = f"**{p['name']}** ({p['full']})"
+    if intent == "overview":
+        return (f"{name} — {p['level']}, {p['duration']}.\n\n{p['description']}\n\n"
+                f"**Entrance exams:** {', '.join(p['exams'])}")
+    if intent == "exams":
+        return f"Entrance exams for {name}:\n" + "\n".join(f"- {e}" for e in p["exams"])
+    if intent == "eligibility":
+        return (f"{name} eligibility: 12th in **{' / '.join(p['streams'])}** with at least "
+                f"**{p['min_percent']}%**.\n\nEntrance exams: {', '.join(p['exams'])}.")
+    if intent == "fees":
+        if not p.get("fees"):
+            return None
+        return f"{name} fees (approx.):\n" + "\n".join(f"- {k}: {v}" for k, v in p["fees"].items())
+    if intent == "cutoffs":
+        if not p.get("cutoffs"):
+            return None
+        return f"{name} cutoffs:\n" + "\n".join(f"- {k}: {v}" for k, v in p["cutoffs"].items())
+    if intent == "salary":
+        return f"Average salary after {name}: **{p['salary']}**."
+    if intent == "colleges":
+        return f"Top colleges for {name}:\n" + "\n".join(f"- {c}" for c in p["top_colleges"])
+    if intent == "careers":
+        if not p.get("careers"):
+            return None
+        return f"Career paths after {name}:\n" + "\n".join(f"- {c}" for c in p["careers"])
+    if intent == "duration":
+        return f"{name} is a {p['level']} program of **{p['duration']}**."
+    return None
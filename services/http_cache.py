@@ -0,0 +1,155 @@
+"""
+Pre-serialized HTTP responses with ETags and compressed variants.
+
+A PreparedResponse holds a JSON body serialized once, a strong ETag (hash of
+the bytes) and gzip / brotli copies made up front. Serving one is a dict
+lookup: If-None-Match hits get a 304, everything else gets the best encoding
+the client accepts. Callers memoize PreparedResponses per catalog version
+(services.catalog_cache), so unchanged catalog data is never re-encoded.
+
+Static files get content-hash ETags too. Templates link them as
+/static/<file>?v=<hash> (static_url), which is cached for a year as
+immutable; requests without the matching hash revalidate instead.
+
+Optional speedups, used when installed:
+  orjson    faster JSON encoding
+  brotli    br variants alongside gzip
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import threading
+
+from flask import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent uncompressed; the headers would eat the gain.
+MIN_COMPRESS_BYTES = 512
+
+REVALIDATE = "no-cache"
+IMMUTABLE  = "public, max-age=31536000, immutable"
+
+
+def dumps(obj) -> bytes:
+    """JSON bytes with sorted keys, as Flask's jsonify would produce."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=12).hexdigest()
+
+
+class PreparedResponse:
+    def __init__(self, body: bytes, status: int = 200, mimetype: str = "application/json"):
+        self.status    = status
+        self.mimetype  = mimetype
+        self.etag      = content_hash(body)
+        self.cacheable = True      # callers may clear this to keep it out of their memo
+        self.variants  = {"identity": body}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            self.variants["gzip"] = gzip.compress(body, compresslevel=6, mtime=0)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=5)
+
+    @classmethod
+    def json(cls, obj, status: int = 200) -> "PreparedResponse":
+        return cls(dumps(obj), status)
+
+    def to_response(self, request, cache_control: str = REVALIDATE) -> Response:
+        if self.status == 200 and _etag_matches(request.headers.get("If-None-Match"), self.etag):
+            resp = Response(status=304)
+            resp.set_etag(self.etag)
+            resp.headers["Cache-Control"] = cache_control
+            resp.headers["Vary"]          = "Accept-Encoding"
+            return resp
+
+        encoding = choose_encoding(request.headers.get("Accept-Encoding", ""), self.variants)
+        resp = Response(self.variants[encoding], status=self.status, mimetype=self.mimetype)
+        if encoding != "identity":
+            resp.headers["Content-Encoding"] = encoding
+        resp.set_etag(self.etag)
+        resp.headers["Cache-Control"] = cache_control
+        resp.headers["Vary"]          = "Accept-Encoding"
+        return resp
+
+
+def choose_encoding(accept_encoding: str, available) -> str:
+    """Best of br > gzip > identity that the client accepts (q > 0)."""
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            accepted[name] = q
+
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return "identity"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"') == etag:
+            return True
+    return False
+
+
+# ── Static files ──────────────────────────────────────────────────────
+_static_lock   = threading.Lock()
+_static_hashes = {}    # path -> (mtime_ns, size, hash)
+
+
+def static_hash(static_folder: str, filename: str) -> str:
+    """Content hash of a static file, recomputed only when it changes on disk."""
+    path = os.path.join(static_folder, filename)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    cached = _static_hashes.get(path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+
+    with open(path, "rb") as f:
+        digest = content_hash(f.read())
+    with _static_lock:
+        _static_hashes[path] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+
+def apply_static_headers(resp: Response, request, static_folder: str, filename: str) -> Response:
+    """Content-hash ETag; immutable caching when the URL carries the matching ?v=."""
+    digest = static_hash(static_folder, filename)
+    if digest is None or resp.status_code not in (200, 304):
+        return resp
+
+    resp.set_etag(digest)
+    resp.headers["Cache-Control"] = IMMUTABLE if request.args.get("v") == digest else REVALIDATE
+    return resp.make_conditional(request)
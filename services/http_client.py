@@ -0,0 +1,174 @@
+"""
+Shared upstream HTTP client for Groq.
+
+One long-lived requests.Session per process, with a keep-alive connection
+pool that every request thread reuses. This avoids a fresh TCP + TLS
+handshake on each chat turn.
+
+The async serving mode (asgi.py) gets the same thing as an httpx.AsyncClient
+per event loop (get_async_client); httpx is only imported when it is used.
+
+Tuning (all optional, read from environment once):
+  GROQ_POOL_SIZE        max pooled connections per host    (default 10)
+  GROQ_ASYNC_POOL_SIZE  max connections for the async client (default 100)
+  GROQ_CONNECT_TIMEOUT  seconds to establish a connection  (default 5)
+  GROQ_READ_TIMEOUT     seconds to wait between bytes      (default 30)
+"""
+
+import os
+import weakref
+import asyncio
+import threading
+from contextlib import contextmanager
+import requests as http
+from requests.adapters import HTTPAdapter
+
+_lock    = threading.Lock()
+_session = None
+_api_key = None
+
+# Requests currently holding a connection (used for the "open" pool stat).
+_in_flight = 0
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+POOL_SIZE       = int(_env_float("GROQ_POOL_SIZE", 10))
+CONNECT_TIMEOUT = _env_float("GROQ_CONNECT_TIMEOUT", 5)
+READ_TIMEOUT    = _env_float("GROQ_READ_TIMEOUT", 30)
+ASYNC_POOL_SIZE = int(_env_float("GROQ_ASYNC_POOL_SIZE", 100))
+
+# event loop -> httpx.AsyncClient (clients can't be shared across loops)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_session() -> http.Session:
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                session = http.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=POOL_SIZE,
+                    pool_block=False,
+                    max_retries=0,
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def get_api_key() -> str:
+    """GROQ_API_KEY, read from the environment once and then cached."""
+    global _api_key
+    if _api_key is None:
+        _api_key = os.getenv("GROQ_API_KEY", "").strip()
+    return _api_key
+
+
+def post(url: str, **kwargs) -> http.Response:
+    """POST through the shared pool with split connect/read timeouts."""
+    global _in_flight
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+    with _lock:
+        _in_flight += 1
+    try:
+        return get_session().post(url, **kwargs)
+    finally:
+        with _lock:
+            _in_flight -= 1
+
+
+@contextmanager
+def stream_post(url: str, **kwargs):
+    """
+    POST with a streamed response body. The connection counts as in use
+    until the caller leaves the with-block, then returns to the pool.
+    """
+    global _in_flight
+    kwargs.setdefault("timeout", (CONNECT_TIMEOUT, READ_TIMEOUT))
+    with _lock:
+        _in_flight += 1
+    try:
+        resp = get_session().post(url, stream=True, **kwargs)
+        try:
+            yield resp
+        finally:
+            resp.close()
+    finally:
+        with _lock:
+            _in_flight -= 1
+
+
+def get_async_client():
+    """The httpx.AsyncClient for the running event loop, created on first use."""
+    loop   = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        import httpx
+        client = httpx.AsyncClient(
+            timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+            limits=httpx.Limits(max_connections=ASYNC_POOL_SIZE, max_keepalive_connections=ASYNC_POOL_SIZE),
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def close_async_client() -> None:
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def pool_stats() -> dict:
+    """
+    Connection pool statistics, summed over every upstream host.
+
+    Returns:
+        {"pool_size": int, "open": int, "idle": int, "in_use": int,
+         "connections_created": int, "requests": int, "reused": int}
+    """
+    created = requests_sent = idle = 0
+
+    if _session is not None:
+        seen = set()
+        for adapter in _session.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            for key in list(adapter.poolmanager.pools.keys()):
+                pool = adapter.poolmanager.pools.get(key)
+                if pool is None:
+                    continue
+                created       += pool.num_connections
+                requests_sent += pool.num_requests
+                if pool.pool is not None:
+                    idle += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+
+    return {
+        "pool_size":           POOL_SIZE,
+        "open":                idle + _in_flight,
+        "idle":                idle,
+        "in_use":              _in_flight,
+        "connections_created": created,
+        "requests":            requests_sent,
+        "reused":              max(0, requests_sent - created),
+    }
+
+
+def reset() -> None:
+    """Close pooled connections and forget the cached key (e.g. after .env changes)."""
+    global _session, _api_key
+    with _lock:
+        if _session is not None:
+            _session.close()
+        _session = None
+        _api_key = None
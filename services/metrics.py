@@ -0,0 +1,206 @@
+"""
+Metrics — counters, gauges and histograms in Prometheus text format.
+
+Small in-process registry (no prometheus_client dependency). Modules create
+their metrics at import time and record into them; /api/metrics renders
+everything in the text exposition format (version 0.0.4). Values that other
+modules already count (response cache, catalog memos, scheduler, connection
+pool) are read at scrape time through collectors instead of being copied.
+
+Request phases:
+    with phase("context"):
+        ...
+records into phase_duration_seconds{phase="context"} and, inside a Flask
+request, into that response's Server-Timing header.
+
+Config (environment):
+  SERVER_TIMING   1 = add Server-Timing headers to responses   (default 1)
+"""
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+from flask import g, has_request_context, request
+
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") == "1"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry   = []
+_collectors = []
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name: str, help: str, labels=()):
+        self.name    = name
+        self.help    = help
+        self.labels  = tuple(labels)
+        self._lock   = threading.Lock()
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(label, "")) for label in self.labels)
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, dict(zip(self.labels, key)), value
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, dict(zip(self.labels, key)), value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[0][i] += 1
+                    break
+            entry[1] += value
+            entry[2] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), total, n) for key, (counts, total, n) in self._values.items()]
+        for key, counts, total, n in items:
+            labels = dict(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format(bound)}, cumulative
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, n
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, n
+
+
+def register_collector(fn) -> None:
+    """
+    fn() -> [(name, type, help, [(labels, value), ...]), ...], called on
+    every scrape. For values another module already tracks.
+    """
+    _collectors.append(fn)
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format."""
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(_sample_line(name, labels, value) for name, labels, value in metric.samples())
+
+    for collector in _collectors:
+        try:
+            families = collector()
+        except Exception:
+            continue
+        for name, kind, help, samples in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(_sample_line(name, labels, value) for labels, value in samples if value is not None)
+    return "\n".join(lines) + "\n"
+
+
+# ── Request timing ────────────────────────────────────────────────────
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Time to produce a response (until the first byte for streams)",
+    ("route", "method", "status"),
+)
+PHASE_SECONDS = Histogram(
+    "phase_duration_seconds",
+    "Time spent in named phases of request handling",
+    ("phase",),
+)
+
+
+@contextmanager
+def phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        PHASE_SECONDS.observe(elapsed, phase=name)
+        if has_request_context():
+            g.setdefault("server_timing", []).append((name, elapsed))
+
+
+def init_app(app) -> None:
+    """Time every request and add Server-Timing headers."""
+
+    @app.before_request
+    def _start_timer():
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request(resp):
+        start = g.get("request_start")
+        if start is None:
+            return resp
+        elapsed = time.perf_counter() - start
+        route   = request.url_rule.rule if request.url_rule else "unmatched"
+        REQUEST_SECONDS.observe(elapsed, route=route, method=request.method, status=resp.status_code)
+
+        if SERVER_TIMING:
+            entries = [f"{name};dur={secs * 1000:.1f}" for name, secs in g.get("server_timing", [])]
+            entries.append(f"app;dur={elapsed * 1000:.1f}")
+            resp.headers["Server-Timing"] = ", ".join(entries)
+        return resp
+
+
+def _sample_line(name: str, labels: dict, value) -> str:
+    if labels:
+        body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items())
+        return f"{name}{{{body}}} {_format(value)}"
+    return f"{name} {_format(value)}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value) -> str:
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value) if isinstance(value, float) else str(value)
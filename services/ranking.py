@@ -0,0 +1,323 @@
+"""
+Program ranking and comparison over parsed numeric features.
+
+The catalog stores money as display strings ("Rs. 6-25 LPA",
+"Rs. 1.5-4L/yr"). They are parsed once per program revision into a row of
+numbers, and the rows are laid out as a columnar NumPy table per catalog
+version:
+
+  min_percent            12th marks needed
+  salary_lo, salary_hi   salary range, lakhs per annum
+  fee_lo, fee_hi         cheapest and dearest listed fee, lakhs per year
+                         (NaN when the program lists no fees)
+  duration               years
+  level                  "UG" / "PG"
+  streams                bool column per stream (eligibility stream keys)
+
+Only programs whose revision changed are re-parsed when the catalog moves
+(see services.catalog_cache), so the table stays cheap to keep current as
+the catalog grows.
+
+rank_programs(profile) scores every row in one vectorized pass:
+  eligible  stream open to the student, marks >= min_percent, level matches,
+            cheapest fee within budget (unknown fees are not excluded)
+  score     0-100, a weighted mix of
+              marks     how far the student clears min_percent
+              salary    salary midpoint, log-scaled against the catalog's best
+              fees      share of the budget left at the cheapest fee
+                        (only when a budget is given; 0.5 for unknown fees)
+            salary_weight (0-1, default 0.5) is the salary share; marks and
+            fees split the rest.
+The top `limit` rows are picked with argpartition, so ranking a catalog of
+many thousands of rows never sorts all of them.
+
+Profile: {"stream", "marks", "level"?: "ug"|"pg"|"all",
+          "budget"?: lakhs per year, or a string like "Rs. 3L/yr",
+          "salary_weight"?: 0-1}
+"""
+
+import re
+import math
+import numpy as np
+
+from services.admissions_data import PROGRAMS
+from services.catalog_cache import CatalogMemo, memoize
+from services.eligibility import STREAM_IMPLIES, normalize_stream, parse_student
+
+DEFAULT_SALARY_WEIGHT = 0.5
+MAX_RANK_LIMIT        = 200
+MAX_COMPARE           = 20
+
+# "6-25", "1.5 - 4", "2,50,000", "2 to 3" followed by an optional unit.
+_MONEY_RE = re.compile(
+    r"(\d[\d,]*(?:\.\d+)?)(?:\s*(?:-|–|to)\s*(\d[\d,]*(?:\.\d+)?))?\s*(lpa|lakhs?|lacs?|l|k|cr|crores?)?",
+    re.IGNORECASE,
+)
+# unit -> lakhs; plain numbers of 1000 or more are taken as rupees.
+_UNITS = {"lpa": 1.0, "lakh": 1.0, "lakhs": 1.0, "lac": 1.0, "lacs": 1.0, "l": 1.0,
+          "k": 0.01, "cr": 100.0, "crore": 100.0, "crores": 100.0}
+_YEARS_RE = re.compile(r"(\d+(?:\.\d+)?)")
+
+
+def parse_money(text) -> tuple:
+    """("Rs. 1.5-4L/yr") -> (1.5, 4.0) in lakhs; None when there is no amount."""
+    if isinstance(text, (int, float)):
+        return float(text), float(text)
+    match = _MONEY_RE.search(str(text or ""))
+    if not match:
+        return None
+    lo_text, hi_text, unit = match.groups()
+    lo = float(lo_text.replace(",", ""))
+    hi = float(hi_text.replace(",", "")) if hi_text else lo
+    if unit:
+        scale = _UNITS[unit.lower()]
+    else:
+        scale = 1e-5 if lo >= 1000 else 1.0
+    return lo * scale, hi * scale
+
+
+def parse_years(text) -> float:
+    match = _YEARS_RE.search(str(text or ""))
+    return float(match.group(1)) if match else math.nan
+
+
+def parse_program(program: dict) -> tuple:
+    """One table row: (min_percent, salary_lo, salary_hi, fee_lo, fee_hi, duration, level, streams)."""
+    salary = parse_money(program.get("salary")) or (math.nan, math.nan)
+    fees   = [r for r in (parse_money(v) for v in (program.get("fees") or {}).values()) if r]
+    fee_lo = min(lo for lo, _ in fees) if fees else math.nan
+    fee_hi = max(hi for _, hi in fees) if fees else math.nan
+    try:
+        min_percent = float(program.get("min_percent"))
+    except (TypeError, ValueError):
+        min_percent = math.nan
+    streams = frozenset(normalize_stream(s) for s in program.get("streams", ()))
+    return (min_percent, *salary, fee_lo, fee_hi, parse_years(program.get("duration")),
+            program.get("level"), streams)
+
+
+class FeatureTable:
+    """Columnar view of the catalog; row i is program ids[i]."""
+
+    def __init__(self, ids: list, rows: list):
+        self.ids      = ids
+        self.position = {pid: i for i, pid in enumerate(ids)}
+        numeric = np.array([r[:6] for r in rows], dtype=np.float64).reshape(len(rows), 6)
+        (self.min_percent, self.salary_lo, self.salary_hi,
+         self.fee_lo, self.fee_hi, self.duration) = numeric.T
+        self.level   = np.array([r[6] or "" for r in rows], dtype=object)
+        self.streams = sorted({s for r in rows for s in r[7]} | set(STREAM_IMPLIES))
+        column       = {s: j for j, s in enumerate(self.streams)}
+        self.stream_mask = np.zeros((len(rows), len(self.streams)), dtype=bool)
+        for i, r in enumerate(rows):
+            self.stream_mask[i, [column[s] for s in r[7]]] = True
+        self._column = column
+
+        salary_mid      = (self.salary_lo + self.salary_hi) / 2
+        best            = np.nanmax(salary_mid) if np.isfinite(salary_mid).any() else 0.0
+        self.salary_fit = np.nan_to_num(np.log1p(salary_mid) / math.log1p(best)) if best > 0 \
+            else np.zeros(len(rows))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def score(self, profile: dict) -> dict:
+        """Score and eligibility of every row for a parsed profile (see _parse_profile)."""
+        n      = len(self)
+        cols   = [self._column[s] for s in (profile["stream"], *STREAM_IMPLIES.get(profile["stream"], ()))
+                  if s in self._column]
+        stream = self.stream_mask[:, cols].any(axis=1) if cols else np.zeros(n, dtype=bool)
+        marks  = profile["marks"] >= self.min_percent
+        level  = np.ones(n, dtype=bool) if profile["level"] == "all" \
+            else self.level == profile["level"].upper()
+
+        budget = profile["budget"]
+        if budget is None:
+            within, fee_fit = np.ones(n, dtype=bool), None
+        else:
+            known   = np.isfinite(self.fee_lo)
+            within  = ~known | (self.fee_lo <= budget)
+            fee_fit = np.where(known, np.clip(1 - self.fee_lo / max(budget, 1e-9), 0, 1), 0.5)
+
+        headroom  = np.maximum(100 - self.min_percent, 1)
+        marks_fit = np.nan_to_num(np.clip((profile["marks"] - self.min_percent) / headroom, 0, 1))
+
+        w_salary = profile["salary_weight"]
+        if fee_fit is None:
+            fit = w_salary * self.salary_fit + (1 - w_salary) * marks_fit
+        else:
+            fit = w_salary * self.salary_fit + (1 - w_salary) / 2 * (marks_fit + fee_fit)
+
+        return {
+            "score":      np.round(100 * fit, 1),
+            "eligible":   stream & marks & level & within,
+            "checks":     {"stream": stream, "marks": marks, "level": level, "budget": within},
+            "components": {"marks": marks_fit, "salary": self.salary_fit,
+                           "fees": fee_fit if fee_fit is not None else np.full(n, math.nan)},
+        }
+
+    def features(self, i: int) -> dict:
+        return {
+            "min_percent":         _num(self.min_percent[i]),
+            "salary_lpa":          _range(self.salary_lo[i], self.salary_hi[i]),
+            "fees_lakh_per_year":  _range(self.fee_lo[i], self.fee_hi[i]),
+            "duration_years":      _num(self.duration[i]),
+        }
+
+
+_rows = CatalogMemo("ranking.rows", per_program=True)    # (program_id,) -> parsed row
+
+
+@memoize(exclusive=True)
+def get_table() -> FeatureTable:
+    """The feature table for the current catalog, re-parsing only changed programs."""
+    ids, rows = [], []
+    for pid, program in PROGRAMS.items():
+        ids.append(pid)
+        rows.append(_rows.get((pid,), lambda program=program: parse_program(program)))
+    return FeatureTable(ids, rows)
+
+
+def rank_programs(profile: dict, limit: int = 20) -> dict:
+    """
+    Best-scoring eligible programs for a profile.
+
+    Returns:
+        {"profile", "count", "excluded": {check: n}, "results": [...]}, or
+        {"error": str} when the profile is invalid.
+    """
+    table  = get_table()
+    parsed = _parse_profile(profile, table)
+    if isinstance(parsed, str):
+        return {"error": parsed}
+
+    scored   = table.score(parsed)
+    eligible = np.flatnonzero(scored["eligible"])
+    top      = eligible
+    if len(eligible) > limit:
+        top = eligible[np.argpartition(-scored["score"][eligible], limit - 1)[:limit]]
+    # Best score first, then catalog order.
+    top = top[np.lexsort((top, -scored["score"][top]))]
+
+    return {
+        "profile":  parsed,
+        "count":    int(len(eligible)),
+        "excluded": {name: int((~check).sum()) for name, check in scored["checks"].items()},
+        "results":  [_result(table, scored, i) for i in top],
+    }
+
+
+def compare_programs(program_ids: list, profile: dict = None) -> dict:
+    """
+    Side-by-side features for the given programs, the best program per
+    feature and, with a profile, each program's eligibility and score.
+    """
+    table   = get_table()
+    parsed  = None
+    if profile is not None:
+        parsed = _parse_profile(profile, table)
+        if isinstance(parsed, str):
+            return {"error": parsed}
+
+    missing = [pid for pid in program_ids if pid not in table.position]
+    rows    = np.array([table.position[pid] for pid in dict.fromkeys(program_ids) if pid in table.position],
+                       dtype=np.int64)
+    scored  = table.score(parsed) if parsed else None
+
+    programs = []
+    for i in rows:
+        entry = _summary(table, i)
+        if scored is not None:
+            entry.update(_fit(scored, i))
+        programs.append(entry)
+
+    best = {
+        "lowest_fees":        _pick(table, rows, table.fee_lo, min),
+        "highest_salary":     _pick(table, rows, (table.salary_lo + table.salary_hi) / 2, max),
+        "lowest_min_percent": _pick(table, rows, table.min_percent, min),
+        "shortest":           _pick(table, rows, table.duration, min),
+    }
+    if scored is not None:
+        best["best_fit"] = _pick(table, rows, np.where(scored["eligible"], scored["score"], np.nan), max)
+
+    result = {"programs": programs, "best": best, "missing": missing}
+    if parsed:
+        result["profile"] = parsed
+    return result
+
+
+# ── Internals ─────────────────────────────────────────────────────────
+def _parse_profile(profile, table: FeatureTable):
+    """Parsed profile dict, or an error message."""
+    student = parse_student(profile, table.streams)
+    if isinstance(student, str):
+        return student
+    stream, marks, level = student
+
+    budget = profile.get("budget")
+    if budget not in (None, ""):
+        parsed = parse_money(budget) if not isinstance(budget, bool) else None
+        if parsed is None or parsed[1] <= 0:
+            return "budget must be a positive amount in lakhs per year (e.g. 3 or \"Rs. 3L/yr\")"
+        budget = parsed[1]
+    else:
+        budget = None
+
+    weight = profile.get("salary_weight", DEFAULT_SALARY_WEIGHT)
+    try:
+        weight = float(weight)
+    except (TypeError, ValueError):
+        return "salary_weight must be a number between 0 and 1"
+    if not 0 <= weight <= 1:
+        return "salary_weight must be a number between 0 and 1"
+
+    return {"stream": stream, "marks": marks, "level": level, "budget": budget, "salary_weight": weight}
+
+
+def _summary(table: FeatureTable, i: int) -> dict:
+    pid = table.ids[i]
+    p   = PROGRAMS.get(pid) or {}
+    return {
+        "program_id": pid,
+        "name":       p.get("name", pid),
+        "full":       p.get("full"),
+        "level":      p.get("level"),
+        "category":   p.get("category"),
+        **table.features(i),
+    }
+
+
+def _fit(scored: dict, i: int) -> dict:
+    return {
+        "eligible":   bool(scored["eligible"][i]),
+        "score":      float(scored["score"][i]),
+        "failed":     [name for name, check in scored["checks"].items() if not check[i]],
+        "components": {name: _num(values[i], 3) for name, values in scored["components"].items()},
+    }
+
+
+def _result(table: FeatureTable, scored: dict, i: int) -> dict:
+    entry = {**_summary(table, i), **_fit(scored, i)}
+    del entry["eligible"], entry["failed"]
+    return entry
+
+
+def _pick(table: FeatureTable, rows, values, best):
+    """program_id of the row with the best finite value, or None."""
+    candidates = [(float(values[i]), table.ids[i]) for i in rows if np.isfinite(values[i])]
+    if not candidates:
+        return None
+    return best(candidates, key=lambda c: c[0])[1]
+
+
+def _range(lo: float, hi: float):
+    if not np.isfinite(lo):
+        return None
+    return [_num(lo), _num(hi)]
+
+
+def _num(value: float, digits: int = 2):
+    if not np.isfinite(value):
+        return None
+    value = round(float(value), digits)
+    return int(value) if value.is_integer() else value
@@ -0,0 +1,203 @@
+"""
+Response cache for chat replies.
+
+Repeated questions ("BCA eligibility?") with the same program context and
+history are answered from here instead of a Groq round trip.
+
+Key:     normalized message + hash(program context) + hash(trimmed history)
+         (+ the session summary, when there is one)
+Evicts:  least-recently-used past the size caps, and anything older than the TTL
+Never:   caches error replies (model_used == "error")
+
+Config (environment):
+  RESPONSE_CACHE_BACKEND   memory | redis | off        (default memory)
+  RESPONSE_CACHE_URL       redis://host:6379/0         (redis backend only)
+  RESPONSE_CACHE_TTL       seconds                     (default 3600)
+  RESPONSE_CACHE_SIZE      max entries (memory)        (default 1024)
+  RESPONSE_CACHE_MAX_BYTES max reply bytes (memory)    (default 8 MB)
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+_WS_RE    = re.compile(r"\s+")
+_TRAIL_RE = re.compile(r"[\s?!.]+$")
+
+
+def make_key(message: str, program_context: str, history: list, summary: str = None) -> str:
+    """Cache key for a chat request. `history` must already be trimmed."""
+    normalized = _TRAIL_RE.sub("", _WS_RE.sub(" ", message.strip().lower()))
+    h = hashlib.sha1()
+    h.update(normalized.encode())
+    h.update(b"\x00")
+    h.update((program_context or "").encode())
+    h.update(b"\x00")
+    h.update(json.dumps(history, sort_keys=True, ensure_ascii=False).encode())
+    if summary:
+        h.update(b"\x00")
+        h.update(summary.encode())
+    return "chat:" + h.hexdigest()
+
+
+class MemoryBackend:
+    """In-process LRU + TTL store, bounded by entry count and total reply bytes."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600, max_bytes: int = 8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.ttl         = ttl
+        self.max_bytes   = max_bytes
+        self._data       = OrderedDict()   # key -> (expires_at, size, value)
+        self._bytes      = 0
+        self._lock       = threading.Lock()
+        self.evictions   = 0
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(key)
+                return None
+            self._data.move_to_end(key)
+            return entry[2]
+
+    def set(self, key: str, value: dict) -> None:
+        size = len(value.get("reply", ""))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._drop(key)
+            self._data[key] = (time.monotonic() + self.ttl, size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._data)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def size(self) -> int:
+        return len(self._data)
+
+    def _drop(self, key: str) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+
+class RedisBackend:
+    """
+    Redis-compatible store (Redis, Valkey, KeyDB, ...). TTL via SET EX;
+    LRU is left to the server's maxmemory-policy (allkeys-lru).
+    """
+
+    def __init__(self, url: str, ttl: float = 3600):
+        import redis
+        self.ttl       = int(ttl)
+        self._client   = redis.Redis.from_url(url)
+        self.evictions = 0
+
+    def get(self, key: str):
+        raw = self._client.get(key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key: str, value: dict) -> None:
+        self._client.set(key, json.dumps(value), ex=self.ttl)
+
+    def clear(self) -> None:
+        for key in self._client.scan_iter("chat:*"):
+            self._client.delete(key)
+
+    def size(self) -> int:
+        return sum(1 for _ in self._client.scan_iter("chat:*"))
+
+
+class ResponseCache:
+    """Wraps a backend with hit/miss counters and the never-cache-errors rule."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits    = 0
+        self.misses  = 0
+        self.stores  = 0
+
+    def get(self, key: str):
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logger.error(f"Response cache read failed: {e}")
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: str, result: dict) -> None:
+        if result.get("model_used") == "error":
+            return
+        try:
+            self.backend.set(key, {"reply": result["reply"], "model_used": result["model_used"]})
+            self.stores += 1
+        except Exception as e:
+            logger.error(f"Response cache write failed: {e}")
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend":   type(self.backend).__name__,
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "hit_rate":  round(self.hits / lookups, 3) if lookups else 0.0,
+            "stores":    self.stores,
+            "evictions": self.backend.evictions,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Process-wide cache built from environment config, or None when disabled."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _build_from_env()
+    return _cache or None
+
+
+def _build_from_env():
+    kind = os.getenv("RESPONSE_CACHE_BACKEND", "memory").lower()
+    ttl  = float(os.getenv("RESPONSE_CACHE_TTL", 3600))
+
+    if kind == "off":
+        return False
+
+    if kind == "redis":
+        url = os.getenv("RESPONSE_CACHE_URL", "redis://localhost:6379/0")
+        try:
+            return ResponseCache(RedisBackend(url, ttl))
+        except ImportError:
+            logger.error("RESPONSE_CACHE_BACKEND=redis but the redis package is not installed. Using memory.")
+
+    return ResponseCache(MemoryBackend(
+        max_entries=int(os.getenv("RESPONSE_CACHE_SIZE", 1024)),
+        ttl=ttl,
+        max_bytes=int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 8 * 1024 * 1024)),
+    ))
@@ -0,0 +1,175 @@
+"""
+Lexical retrieval over program fields.
+
+Each program is split into small chunks (overview, eligibility, exams,
+cutoffs, fees, salary, colleges, careers). A BM25 index over all chunks is
+built once per catalog version with NumPy; chunk lists themselves are
+memoized per program revision, so a catalog change only re-chunks the
+programs that changed.
+
+Chat then injects just the top-k chunks relevant to the user's message
+instead of the whole context block.
+
+Config (environment):
+  RETRIEVAL_TOP_K          chunks injected per turn           (default 3)
+  RETRIEVAL_ALL_PROGRAMS   1 = search every program when none
+                           is selected                        (default 0)
+"""
+
+import os
+import numpy as np
+
+from services.admissions_data import PROGRAMS
+from services.catalog_cache import memoize
+from services.tokenizer import terms
+
+TOP_K        = int(os.getenv("RETRIEVAL_TOP_K", 3))
+ALL_PROGRAMS = os.getenv("RETRIEVAL_ALL_PROGRAMS", "0") == "1"
+
+# BM25 parameters
+K1 = 1.2
+B  = 0.75
+
+
+@memoize(per_program=True, should_cache=bool)
+def program_chunks(program_id: str) -> tuple:
+    """
+    ((section, text), ...) for one program. Every chunk names the program so
+    it still makes sense when retrieved on its own. Unknown ids give () and
+    are not cached, so client-supplied ids can't grow the memo.
+    """
+    p = PROGRAMS.get(program_id)
+    if not p:
+        return ()
+
+    name   = f"{p['name']} ({p['full']})"
+    chunks = [
+        ("overview",
+         f"Program: {name}\n"
+         f"Level: {p['level']} | Duration: {p['duration']} | Category: {p['category']}\n"
+         f"About: {p['description']}"),
+        ("eligibility",
+         f"{p['name']} eligibility: streams {', '.join(p['streams'])}; "
+         f"minimum 12th marks {p['min_percent']}%"),
+        ("exams", f"{p['name']} entrance exams: {', '.join(p['exams'])}"),
+        ("salary", f"{p['name']} average salary: {p['salary']}"),
+        ("colleges", f"{p['name']} top colleges: {', '.join(p['top_colleges'])}"),
+    ]
+    if p.get("cutoffs"):
+        chunks.append(("cutoffs", f"{p['name']} cutoffs: " + "; ".join(f"{k}: {v}" for k, v in p["cutoffs"].items())))
+    if p.get("fees"):
+        chunks.append(("fees", f"{p['name']} fees: " + "; ".join(f"{k}: {v}" for k, v in p["fees"].items())))
+    if p.get("careers"):
+        chunks.append(("careers", f"{p['name']} career paths: {', '.join(p['careers'])}"))
+    return tuple(chunks)
+
+
+class ChunkIndex:
+    """
+    BM25 over chunks, stored as CSR-style postings:
+      indptr[t]:indptr[t+1] slices doc_ids / tf for term id t.
+    """
+
+    def __init__(self, chunks: list):
+        self.chunks = chunks                          # [(program_id, section, text)]
+        self.ranges = {}                              # program_id -> (start, stop)
+        vocab, rows = {}, []
+        for i, (pid, _, text) in enumerate(chunks):
+            start, _ = self.ranges.get(pid, (i, i))
+            self.ranges[pid] = (start, i + 1)
+            counts = {}
+            for t in terms(text):
+                tid = vocab.setdefault(t, len(vocab))
+                counts[tid] = counts.get(tid, 0) + 1
+            rows.append(counts)
+
+        self.vocab   = vocab
+        n_docs       = len(chunks)
+        self.doc_len = np.array([sum(r.values()) for r in rows], dtype=np.float32)
+        avgdl        = float(self.doc_len.mean()) if n_docs else 1.0
+
+        term_ids = np.fromiter((t for r in rows for t in r), dtype=np.int64)
+        doc_ids  = np.fromiter((d for d, r in enumerate(rows) for _ in r), dtype=np.int64)
+        tfs      = np.fromiter((c for r in rows for c in r.values()), dtype=np.float32)
+        order    = np.argsort(term_ids, kind="stable")
+        self.doc_ids = doc_ids[order]
+        self.tf      = tfs[order]
+        self.indptr  = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.add.at(self.indptr, term_ids + 1, 1)
+        np.cumsum(self.indptr, out=self.indptr)
+
+        df        = np.diff(self.indptr).astype(np.float32)
+        self.idf  = np.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+        self.norm = K1 * (1 - B + B * self.doc_len / max(avgdl, 1e-6))
+
+    def search(self, query: str, k: int = TOP_K, program_id: str = None) -> list:
+        """
+        Top-k chunks by BM25 score, optionally restricted to one program.
+
+        Returns:
+            [(program_id, section, text, score), ...] with score > 0, best first.
+        """
+        start, stop = (0, len(self.chunks))
+        if program_id is not None:
+            if program_id not in self.ranges:
+                return []
+            start, stop = self.ranges[program_id]
+
+        scores = np.zeros(stop - start, dtype=np.float32)
+        for t in set(terms(query)):
+            tid = self.vocab.get(t)
+            if tid is None:
+                continue
+            lo, hi = self.indptr[tid], self.indptr[tid + 1]
+            docs, tf = self.doc_ids[lo:hi], self.tf[lo:hi]
+            mask = (docs >= start) & (docs < stop)
+            docs, tf = docs[mask], tf[mask]
+            scores[docs - start] += self.idf[tid] * tf * (K1 + 1) / (tf + self.norm[docs])
+
+        hits = np.flatnonzero(scores > 0)
+        if not len(hits):
+            return []
+        top = hits[np.argsort(-scores[hits], kind="stable")[:k]]
+        return [(*self.chunks[start + i], float(scores[i])) for i in top]
+
+
+@memoize(exclusive=True)
+def get_index() -> ChunkIndex:
+    chunks = [
+        (pid, section, text)
+        for pid in PROGRAMS
+        for section, text in program_chunks(pid)
+    ]
+    return ChunkIndex(chunks)
+
+
+def build_context(message: str, program_id: str = None, k: int = TOP_K, all_programs: bool = None):
+    """
+    Context block for the system prompt: the top-k chunks relevant to the
+    message.
+
+    With program_id: that program's chunks; its overview is used when
+    nothing matches. Without: every program's chunks if all_programs (default
+    RETRIEVAL_ALL_PROGRAMS), else None.
+    """
+    if all_programs is None:
+        all_programs = ALL_PROGRAMS
+
+    if program_id:
+        chunks = program_chunks(program_id)
+        if not chunks:
+            return None
+        hits = get_index().search(message, k, program_id)
+        if not hits:
+            return chunks[0][1]
+        texts = [text for _, _, text, _ in hits]
+        if not any(section == "overview" for _, section, _, _ in hits):
+            # Always say which program this is about.
+            texts.insert(0, chunks[0][1].split("\n", 1)[0])
+        return "\n".join(texts)
+
+    if all_programs:
+        hits = get_index().search(message, k)
+        return "\n".join(text for _, _, text, _ in hits) or None
+
+    return None
@@ -0,0 +1,498 @@
+"""
+Upstream scheduler for Groq calls.
+
+Sits between ai_service and the pooled http_client:
+  - Pacing: a token bucket kept in sync with Groq's x-ratelimit-* response
+    headers (requests and tokens). Callers wait for capacity instead of
+    getting an immediate 429.
+  - Retries: 429 / 5xx / connection errors are retried with jittered
+    exponential backoff (or the server's retry-after) until the deadline.
+  - Coalescing: identical non-streaming requests already in flight share
+    one upstream call.
+
+post_json_async / stream_async are the asyncio versions for the async
+serving mode (asgi.py). They share the buckets and counters above, wait
+with asyncio.sleep, and go through http_client's httpx.AsyncClient. httpx
+transport errors are re-raised as the matching requests exceptions, so
+callers handle one set of error types.
+
+Config (environment):
+  GROQ_DEADLINE         seconds a call may spend queueing + retrying  (default 20)
+  GROQ_MAX_RETRIES      retry attempts per call                       (default 4)
+  GROQ_BACKOFF_BASE     first backoff in seconds                      (default 0.5)
+  GROQ_BACKOFF_MAX      cap on a single backoff sleep                 (default 8)
+
+stats() reports queue depth, in-flight calls, retries, coalesced calls and
+wait-time percentiles. Every upstream attempt is also recorded in the
+groq_request_duration_seconds histogram (by mode and status).
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import random
+import hashlib
+import logging
+import threading
+from collections import deque, namedtuple
+from contextlib import contextmanager, asynccontextmanager
+
+import requests as http
+
+from services import http_client
+from services.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+DEADLINE     = float(os.getenv("GROQ_DEADLINE", 20))
+MAX_RETRIES  = int(os.getenv("GROQ_MAX_RETRIES", 4))
+BACKOFF_BASE = float(os.getenv("GROQ_BACKOFF_BASE", 0.5))
+BACKOFF_MAX  = float(os.getenv("GROQ_BACKOFF_MAX", 8))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+UPSTREAM_SECONDS = Histogram(
+    "groq_request_duration_seconds",
+    "Groq call latency per attempt (until response headers for streams)",
+    ("mode", "status"),
+)
+
+# Shared, read-only view of a finished upstream call.
+Result = namedtuple("Result", "status_code ok data text headers")
+
+_DURATION_RE = re.compile(r"(?:(\d+(?:\.\d+)?)h)?(?:(\d+(?:\.\d+)?)m(?!s))?(?:(\d+(?:\.\d+)?)s)?(?:(\d+(?:\.\d+)?)ms)?$")
+
+
+def parse_duration(value) -> float:
+    """Groq reset headers look like "2m59.56s", "7.66s" or "120ms". Returns seconds."""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    m = _DURATION_RE.match(value)
+    if not m or not any(m.groups()):
+        return None
+    h, mins, s, ms = (float(g) if g else 0.0 for g in m.groups())
+    return h * 3600 + mins * 60 + s + ms / 1000
+
+
+class RateLimitBucket:
+    """
+    One limit (requests or tokens). Spends locally on each send and re-syncs
+    from the remaining/reset headers on each response.
+    """
+
+    def __init__(self, name: str):
+        self.name      = name
+        self.remaining = None      # unknown until the first response
+        self.reset_at  = 0.0
+
+    def wait_time(self, cost: float, now: float) -> float:
+        if self.remaining is None or now >= self.reset_at:
+            return 0.0
+        return 0.0 if self.remaining >= cost else self.reset_at - now
+
+    def spend(self, cost: float, now: float) -> None:
+        if self.remaining is not None and now < self.reset_at:
+            self.remaining -= cost
+
+    def update(self, headers, now: float) -> None:
+        remaining = headers.get(f"x-ratelimit-remaining-{self.name}")
+        reset     = parse_duration(headers.get(f"x-ratelimit-reset-{self.name}"))
+        if remaining is not None:
+            try:
+                self.remaining = float(remaining)
+            except ValueError:
+                return
+            self.reset_at = now + (reset or 0.0)
+
+
+class Scheduler:
+    def __init__(self):
+        self._lock      = threading.Lock()
+        self._buckets   = {"requests": RateLimitBucket("requests"), "tokens": RateLimitBucket("tokens")}
+        self._blocked_until = 0.0          # set by retry-after on a 429
+        self._in_flight = {}               # coalescing key -> _Call
+        self._in_flight_async = {}         # coalescing key -> asyncio.Future
+        self._waits     = deque(maxlen=1000)
+        self.queued     = 0
+        self.active     = 0
+        self.calls      = 0
+        self.retries    = 0
+        self.coalesced  = 0
+        self.rate_limited = 0
+
+    # ── Pacing ────────────────────────────────────────────────────────
+    def _reserve(self, est_tokens: int, start: float) -> tuple:
+        """(now, wait): spends capacity and returns wait 0, or how long to wait."""
+        with self._lock:
+            now  = time.monotonic()
+            wait = max(
+                self._blocked_until - now,
+                self._buckets["requests"].wait_time(1, now),
+                self._buckets["tokens"].wait_time(est_tokens, now),
+            )
+            if wait <= 0:
+                self._buckets["requests"].spend(1, now)
+                self._buckets["tokens"].spend(est_tokens, now)
+                self._waits.append(now - start)
+            return now, wait
+
+    def _acquire(self, est_tokens: int, deadline: float) -> bool:
+        """Block until the buckets allow a send. False if that would pass the deadline."""
+        start = time.monotonic()
+        with self._lock:
+            self.queued += 1
+        try:
+            while True:
+                now, wait = self._reserve(est_tokens, start)
+                if wait <= 0:
+                    return True
+                if now + wait > deadline:
+                    self._waits.append(now - start)
+                    return False
+                time.sleep(min(wait, 1.0))
+        finally:
+            with self._lock:
+                self.queued -= 1
+
+    async def _acquire_async(self, est_tokens: int, deadline: float) -> bool:
+        start = time.monotonic()
+        with self._lock:
+            self.queued += 1
+        try:
+            while True:
+                now, wait = self._reserve(est_tokens, start)
+                if wait <= 0:
+                    return True
+                if now + wait > deadline:
+                    self._waits.append(now - start)
+                    return False
+                await asyncio.sleep(min(wait, 1.0))
+        finally:
+            with self._lock:
+                self.queued -= 1
+
+    def _observe(self, resp) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for bucket in self._buckets.values():
+                bucket.update(resp.headers, now)
+            if resp.status_code == 429:
+                self.rate_limited += 1
+                retry_after = parse_duration(resp.headers.get("retry-after"))
+                if retry_after:
+                    self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def _backoff(self, attempt: int, resp=None) -> float:
+        retry_after = parse_duration(resp.headers.get("retry-after")) if resp is not None else None
+        if retry_after is not None:
+            return retry_after
+        # Full jitter: uniform in [0, base * 2^attempt], capped.
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** attempt)))
+
+    # ── Calls ─────────────────────────────────────────────────────────
+    def post_json(self, url: str, headers: dict, payload: dict, est_tokens: int = 0,
+                  deadline: float = None) -> Result:
+        """
+        POST with pacing, retries and coalescing. Raises the last connection
+        error or timeout if every attempt failed that way.
+        """
+        key = hashlib.sha1((url + json.dumps(payload, sort_keys=True)).encode()).hexdigest()
+
+        with self._lock:
+            call = self._in_flight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._in_flight[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            return call.wait()
+
+        try:
+            call.result = self._post_with_retries(url, headers, payload, est_tokens, deadline)
+        except Exception as e:
+            call.error = e
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            call.done.set()
+        return call.wait()
+
+    def _post_with_retries(self, url, headers, payload, est_tokens, deadline) -> Result:
+        deadline = time.monotonic() + (DEADLINE if deadline is None else deadline)
+        attempt  = 0
+        while True:
+            if not self._acquire(est_tokens, deadline):
+                return Result(429, False, None, "Rate limit: no capacity before deadline", {})
+
+            resp, error = None, None
+            with self._lock:
+                self.active += 1
+                self.calls  += 1
+            start = time.perf_counter()
+            try:
+                resp = http_client.post(url, headers=headers, json=payload)
+                self._observe(resp)
+            except (http.exceptions.ConnectionError, http.exceptions.Timeout) as e:
+                error = e
+            finally:
+                with self._lock:
+                    self.active -= 1
+                UPSTREAM_SECONDS.observe(time.perf_counter() - start, mode="json",
+                                         status=resp.status_code if resp is not None else "error")
+
+            retryable = error is not None or resp.status_code in RETRY_STATUSES
+            if not retryable:
+                return _to_result(resp)
+
+            delay = self._backoff(attempt, resp)
+            if attempt >= MAX_RETRIES or time.monotonic() + delay > deadline:
+                if error is not None:
+                    raise error
+                return _to_result(resp)
+
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+            logger.warning(f"Groq {'error ' + type(error).__name__ if error else resp.status_code}; "
+                           f"retry {attempt}/{MAX_RETRIES} in {delay:.2f}s")
+            time.sleep(delay)
+
+    @contextmanager
+    def stream(self, url: str, headers: dict, payload: dict, est_tokens: int = 0, deadline: float = None):
+        """
+        Streaming POST with pacing and retries before the first byte. Not
+        coalesced. Yields the open response (possibly a final 429/5xx).
+        """
+        deadline = time.monotonic() + (DEADLINE if deadline is None else deadline)
+        attempt  = 0
+        while True:
+            if not self._acquire(est_tokens, deadline):
+                yield _Unavailable()
+                return
+
+            with self._lock:
+                self.calls += 1
+            start, resp = time.perf_counter(), None
+            try:
+                with http_client.stream_post(url, headers=headers, json=payload) as resp:
+                    UPSTREAM_SECONDS.observe(time.perf_counter() - start, mode="stream", status=resp.status_code)
+                    self._observe(resp)
+                    delay = self._backoff(attempt, resp) if resp.status_code in RETRY_STATUSES else None
+                    last  = delay is None or attempt >= MAX_RETRIES or time.monotonic() + delay > deadline
+                    if last:
+                        with self._lock:
+                            self.active += 1
+                        try:
+                            yield resp
+                        finally:
+                            with self._lock:
+                                self.active -= 1
+                        return
+            except (http.exceptions.ConnectionError, http.exceptions.Timeout):
+                if resp is None:    # failed before any response headers
+                    UPSTREAM_SECONDS.observe(time.perf_counter() - start, mode="stream", status="error")
+                raise
+
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+            time.sleep(delay)
+
+    # ── Async calls ───────────────────────────────────────────────────
+    async def post_json_async(self, url: str, headers: dict, payload: dict, est_tokens: int = 0,
+                              deadline: float = None) -> Result:
+        """post_json() for asyncio callers. Coalesces within the running event loop."""
+        key  = hashlib.sha1((url + json.dumps(payload, sort_keys=True)).encode()).hexdigest()
+        call = self._in_flight_async.get(key)
+        if call is not None:
+            with self._lock:
+                self.coalesced += 1
+            await asyncio.wait([call])      # unlike awaiting it, never cancels the shared call
+            if call.cancelled():
+                return await self.post_json_async(url, headers, payload, est_tokens, deadline)
+            return call.result()
+
+        call = asyncio.get_running_loop().create_future()
+        self._in_flight_async[key] = call
+        try:
+            call.set_result(await self._post_with_retries_async(url, headers, payload, est_tokens, deadline))
+        except asyncio.CancelledError:
+            call.cancel()       # the leader's client went away; followers see the cancellation
+            raise
+        except Exception as e:
+            call.set_exception(e)
+        finally:
+            self._in_flight_async.pop(key, None)
+        return call.result()
+
+    async def _post_with_retries_async(self, url, headers, payload, est_tokens, deadline) -> Result:
+        import httpx
+        client   = http_client.get_async_client()
+        deadline = time.monotonic() + (DEADLINE if deadline is None else deadline)
+        attempt  = 0
+        while True:
+            if not await self._acquire_async(est_tokens, deadline):
+                return Result(429, False, None, "Rate limit: no capacity before deadline", {})
+
+            resp, error = None, None
+            with self._lock:
+                self.active += 1
+                self.calls  += 1
+            start = time.perf_counter()
+            try:
+                resp = await client.post(url, headers=headers, json=payload)
+                self._observe(resp)
+            except httpx.TransportError as e:
+                error = _as_requests_error(e)
+            finally:
+                with self._lock:
+                    self.active -= 1
+                UPSTREAM_SECONDS.observe(time.perf_counter() - start, mode="json",
+                                         status=resp.status_code if resp is not None else "error")
+
+            retryable = error is not None or resp.status_code in RETRY_STATUSES
+            if not retryable:
+                return _to_result(resp)
+
+            delay = self._backoff(attempt, resp)
+            if attempt >= MAX_RETRIES or time.monotonic() + delay > deadline:
+                if error is not None:
+                    raise error
+                return _to_result(resp)
+
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+            logger.warning(f"Groq {'error ' + type(error).__name__ if error else resp.status_code}; "
+                           f"retry {attempt}/{MAX_RETRIES} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def stream_async(self, url: str, headers: dict, payload: dict, est_tokens: int = 0,
+                           deadline: float = None):
+        """
+        stream() for asyncio callers. Yields an httpx response (iterate with
+        aiter_lines()); a final error response has its body read, so .text works.
+        """
+        import httpx
+        client   = http_client.get_async_client()
+        deadline = time.monotonic() + (DEADLINE if deadline is None else deadline)
+        attempt  = 0
+        while True:
+            if not await self._acquire_async(est_tokens, deadline):
+                yield _Unavailable()
+                return
+
+            with self._lock:
+                self.calls += 1
+            start, resp = time.perf_counter(), None
+            try:
+                async with client.stream("POST", url, headers=headers, json=payload) as resp:
+                    UPSTREAM_SECONDS.observe(time.perf_counter() - start, mode="stream", status=resp.status_code)
+                    self._observe(resp)
+                    delay = self._backoff(attempt, resp) if resp.status_code in RETRY_STATUSES else None
+                    last  = delay is None or attempt >= MAX_RETRIES or time.monotonic() + delay > deadline
+                    if last:
+                        if resp.is_error:
+                            await resp.aread()
+                        with self._lock:
+                            self.active += 1
+                        try:
+                            yield resp
+                        finally:
+                            with self._lock:
+                                self.active -= 1
+                        return
+            except httpx.TransportError as e:
+                if resp is None:
+                    UPSTREAM_SECONDS.observe(time.perf_counter() - start, mode="stream", status="error")
+                raise _as_requests_error(e) from e
+
+            attempt += 1
+            with self._lock:
+                self.retries += 1
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            return {
+                "queue_depth":  self.queued,
+                "in_flight":    self.active,
+                "calls":        self.calls,
+                "retries":      self.retries,
+                "coalesced":    self.coalesced,
+                "rate_limited": self.rate_limited,
+                "wait_ms": {
+                    "p50": _percentile_ms(waits, 0.50),
+                    "p95": _percentile_ms(waits, 0.95),
+                    "max": _percentile_ms(waits, 1.0),
+                },
+                "limits": {
+                    name: {"remaining": b.remaining, "reset_in": round(max(0.0, b.reset_at - time.monotonic()), 2)}
+                    for name, b in self._buckets.items()
+                },
+            }
+
+
+class _Call:
+    def __init__(self):
+        self.done   = threading.Event()
+        self.result = None
+        self.error  = None
+
+    def wait(self) -> Result:
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class _Unavailable:
+    """Stand-in response when no capacity frees up before the deadline."""
+    status_code = 429
+    ok          = False
+    text        = "Rate limit: no capacity before deadline"
+    headers     = {}
+
+
+def _to_result(resp) -> Result:
+    """Result from a requests or httpx response."""
+    try:
+        data = resp.json()
+    except ValueError:
+        data = None
+    ok = 200 <= resp.status_code < 400
+    return Result(resp.status_code, ok, data, resp.text, dict(resp.headers))
+
+
+def _as_requests_error(e: Exception) -> Exception:
+    """httpx transport error -> the requests exception ai_service already handles."""
+    import httpx
+    if isinstance(e, httpx.TimeoutException):
+        return http.exceptions.Timeout(str(e))
+    return http.exceptions.ConnectionError(str(e))
+
+
+def _percentile_ms(sorted_values: list, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(q * (len(sorted_values) - 1) + 0.5))
+    return round(sorted_values[index] * 1000, 2)
+
+
+_scheduler = Scheduler()
+
+
+def get_scheduler() -> Scheduler:
+    return _scheduler
@@ -0,0 +1,242 @@
+"""
+In-memory search index over the program catalog.
+
+Built once from the catalog and kept in sync incrementally: when the
+catalog version moves, only programs whose revision changed are
+re-indexed (see services.catalog_cache).
+
+Indexed fields (weight):
+  name, short_name (3.0) · full (2.0) · exams (1.5) · top_colleges (1.2) · careers (1.0)
+Facets: category, level
+
+Matching, per query term, best of:
+  exact token   weight * idf * 2
+  token prefix  weight * idf        (edge n-grams, for search-as-you-type)
+  substring     weight * 0.5        (char trigrams, verified against the field)
+Every query term must match somewhere. Results are ranked by summed score,
+then catalog order.
+"""
+
+import re
+import math
+import threading
+from collections import defaultdict
+
+from services.admissions_data import PROGRAMS
+from services.catalog_cache import catalog_version, program_revision
+
+FIELD_WEIGHTS = {
+    "name":         3.0,
+    "short_name":   3.0,
+    "full":         2.0,
+    "exams":        1.5,
+    "top_colleges": 1.2,
+    "careers":      1.0,
+}
+FACETS = ("category", "level")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_MIN_PREFIX = 1
+
+
+def tokenize(text: str) -> list:
+    """Lowercase alphanumeric tokens, plus the punctuation-free form of dotted names (b.tech -> btech)."""
+    text   = text.lower()
+    tokens = _TOKEN_RE.findall(text)
+    for word in text.split():
+        compact = "".join(_TOKEN_RE.findall(word))
+        if compact and compact not in tokens:
+            tokens.append(compact)
+    return tokens
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _field_text(program: dict, field: str) -> str:
+    value = program.get(field, "")
+    return " ".join(value) if isinstance(value, list) else str(value)
+
+
+class SearchIndex:
+    def __init__(self):
+        self._lock      = threading.Lock()
+        self._version   = None
+        self._revisions = {}                    # program_id -> indexed revision
+        self._order     = {}                    # program_id -> catalog position
+        self._docs      = {}                    # program_id -> {field: lowercased text}
+        self._facets    = {f: defaultdict(set) for f in FACETS}
+        self._doc_facets = {}                   # program_id -> {facet: value}
+        # postings: key -> {program_id: best field weight}
+        self._tokens    = defaultdict(dict)
+        self._prefixes  = defaultdict(dict)
+        self._grams     = defaultdict(set)
+        self._doc_keys  = {}                    # program_id -> (tokens, prefixes, grams) for removal
+
+    # ── Maintenance ───────────────────────────────────────────────────
+    def sync(self) -> None:
+        """Bring the index up to date with the catalog, re-indexing only changed programs."""
+        if self._version == catalog_version():
+            return
+        with self._lock:
+            version = catalog_version()
+            if self._version == version:
+                return
+
+            current = list(PROGRAMS.keys())
+            for pid in set(self._revisions) - set(current):
+                self._remove(pid)
+            for position, pid in enumerate(current):
+                if self._revisions.get(pid) != program_revision(pid):
+                    self._remove(pid)
+                    self._add(pid, PROGRAMS[pid])
+                self._order[pid] = position
+            self._version = version
+
+    def _add(self, pid: str, program: dict) -> None:
+        tokens, prefixes, grams = set(), set(), set()
+        doc = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            text = _field_text(program, field).lower()
+            doc[field] = text
+            for token in tokenize(text):
+                tokens.add(token)
+                _best(self._tokens[token], pid, weight)
+                for n in range(_MIN_PREFIX, len(token)):
+                    prefix = token[:n]
+                    prefixes.add(prefix)
+                    _best(self._prefixes[prefix], pid, weight)
+            for gram in _trigrams(text):
+                grams.add(gram)
+                self._grams[gram].add(pid)
+
+        self._docs[pid] = doc
+        self._doc_keys[pid] = (tokens, prefixes, grams)
+        self._doc_facets[pid] = {}
+        for facet in FACETS:
+            value = program.get(facet)
+            if value:
+                self._facets[facet][value].add(pid)
+                self._doc_facets[pid][facet] = value
+        self._revisions[pid] = program_revision(pid)
+
+    def _remove(self, pid: str) -> None:
+        keys = self._doc_keys.pop(pid, None)
+        if keys is None:
+            return
+        tokens, prefixes, grams = keys
+        for postings, used in ((self._tokens, tokens), (self._prefixes, prefixes)):
+            for key in used:
+                postings[key].pop(pid, None)
+                if not postings[key]:
+                    del postings[key]
+        for gram in grams:
+            self._grams[gram].discard(pid)
+            if not self._grams[gram]:
+                del self._grams[gram]
+        for facet, value in self._doc_facets.pop(pid, {}).items():
+            self._facets[facet][value].discard(pid)
+            if not self._facets[facet][value]:
+                del self._facets[facet][value]
+        self._docs.pop(pid, None)
+        self._revisions.pop(pid, None)
+        self._order.pop(pid, None)
+
+    # ── Queries ───────────────────────────────────────────────────────
+    def search(self, query: str = "", category: str = None, level: str = None,
+               limit: int = 50, offset: int = 0) -> dict:
+        """
+        Returns:
+            {"ids": [program_id, ...] (one page), "total": int,
+             "facets": {"category": {value: count}, "level": {value: count}}}
+        """
+        self.sync()
+        with self._lock:
+            terms = tokenize(query) if query else []
+            if terms:
+                scores = self._score(terms)
+                ranked = sorted(scores, key=lambda pid: (-scores[pid], self._order[pid]))
+            else:
+                ranked = sorted(self._docs, key=self._order.__getitem__)
+
+            facets = {
+                facet: _counts(ranked, self._doc_facets, facet)
+                for facet in FACETS
+            }
+
+            for facet, wanted in (("category", category), ("level", level)):
+                if wanted and wanted != "All":
+                    allowed = self._facets[facet].get(wanted, set())
+                    ranked  = [pid for pid in ranked if pid in allowed]
+
+            return {
+                "ids":    ranked[offset:offset + limit],
+                "total":  len(ranked),
+                "facets": facets,
+            }
+
+    def _score(self, terms: list) -> dict:
+        n_docs = max(len(self._docs), 1)
+        scores = None
+        for term in terms:
+            term_scores = {}
+            candidates = [
+                (self._tokens.get(term, {}), 2.0),
+                (self._prefixes.get(term, {}), 1.0),
+            ]
+            for postings, boost in candidates:
+                if not postings:
+                    continue
+                idf = math.log(1 + n_docs / len(postings))
+                for pid, weight in postings.items():
+                    _best(term_scores, pid, weight * idf * boost)
+
+            if len(term) >= 3:
+                for pid, weight in self._substring_matches(term).items():
+                    _best(term_scores, pid, weight * 0.5)
+
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {pid: s + term_scores[pid] for pid, s in scores.items() if pid in term_scores}
+            if not scores:
+                return {}
+        return scores or {}
+
+    def _substring_matches(self, term: str) -> dict:
+        grams = _trigrams(term)
+        candidates = None
+        for gram in grams:
+            docs = self._grams.get(gram)
+            if not docs:
+                return {}
+            candidates = set(docs) if candidates is None else candidates & docs
+        matches = {}
+        for pid in candidates or ():
+            for field, weight in FIELD_WEIGHTS.items():
+                if term in self._docs[pid][field]:
+                    _best(matches, pid, weight)
+        return matches
+
+
+def _best(scores: dict, key, value: float) -> None:
+    if value > scores.get(key, 0.0):
+        scores[key] = value
+
+
+def _counts(ids: list, doc_facets: dict, facet: str) -> dict:
+    counts = defaultdict(int)
+    for pid in ids:
+        value = doc_facets[pid].get(facet)
+        if value:
+            counts[value] += 1
+    return dict(sorted(counts.items()))
+
+
+_index = SearchIndex()
+
+
+def search_programs(query: str = "", category: str = None, level: str = None,
+                    limit: int = 50, offset: int = 0) -> dict:
+    return _index.search(query, category, level, limit, offset)
@@ -0,0 +1,302 @@
+"""
+Chat sessions — server-side conversation state keyed by a session id.
+
+With a session the client sends only the new message; the server keeps the
+turns. Each session holds:
+  window   the newest turns, verbatim (CHAT_SESSION_WINDOW of them)
+  summary  turns older than the window, folded one at a time into a short
+           extractive summary that goes into the system prompt
+
+Folding is incremental: a turn leaving the window adds one line to the
+summary, and the oldest lines fall off past CHAT_SESSION_SUMMARY_TOKENS, so
+prompt size stays flat however long the conversation runs. The summary
+string is cached on the session and only rebuilt when a turn is folded.
+
+Turns are stored as (is_user, text) tuples. A session over
+CHAT_SESSION_MAX_BYTES of verbatim text folds its oldest turns early.
+Sessions idle past CHAT_SESSION_TTL are dropped, and the store keeps at most
+CHAT_SESSION_MAX of them (least recently used go first).
+Sessions live in process memory, one store per worker. A request may send
+its recent turns as "history" alongside "session_id". They are ignored
+while this worker knows the session. When the id is unknown (another
+worker, a restart, an expired session), a new session is seeded from them,
+so the conversation keeps its recent context. The web UI always sends them.
+
+Config (environment):
+  CHAT_SESSION_MAX             sessions kept per process              (default 10000)
+  CHAT_SESSION_TTL             seconds idle before a session expires  (default 1800)
+  CHAT_SESSION_WINDOW          newest turns kept verbatim             (default 8)
+  CHAT_SESSION_MAX_BYTES       verbatim text per session, bytes       (default 16384)
+  CHAT_SESSION_SUMMARY_TOKENS  rolling summary cap, tokens            (default 300)
+"""
+
+import os
+import re
+import time
+import secrets
+import threading
+from collections import OrderedDict, deque
+
+from services.tokenizer import count_tokens
+
+MAX_SESSIONS   = int(os.getenv("CHAT_SESSION_MAX", 10000))
+SESSION_TTL    = float(os.getenv("CHAT_SESSION_TTL", 1800))
+WINDOW_TURNS   = int(os.getenv("CHAT_SESSION_WINDOW", 8))
+MAX_BYTES      = int(os.getenv("CHAT_SESSION_MAX_BYTES", 16384))
+SUMMARY_TOKENS = int(os.getenv("CHAT_SESSION_SUMMARY_TOKENS", 300))
+
+# Verbatim turns a session always keeps, even when over its byte cap.
+MIN_WINDOW_TURNS = 2
+# Longest line one folded turn contributes to the summary.
+MAX_LINE_CHARS = 220
+# Client turns accepted when rebuilding an unknown session.
+MAX_REHYDRATE_TURNS = 50
+
+_ID_RE       = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+|\n+")
+_MARKDOWN_RE = re.compile(r"[*_`#>]+|^\s*(?:[-•]|\d+[.)])\s+", re.MULTILINE)
+_WORD_RE     = re.compile(r"[a-z0-9]+")
+_FACT_RE     = re.compile(r"\d|rs\.?|₹|%|lpa|rank|cutoff|percentile", re.IGNORECASE)
+
+_STOPWORDS = frozenset(
+    "a an the is are was were be to of in on for and or with what which who how "
+    "can i my me do does it this that at by from as about you your will should".split()
+)
+
+
+class Session:
+    __slots__ = ("id", "turns", "bytes", "lines", "summary", "summary_tokens",
+                 "folded", "last_seen", "lock", "_question")
+
+    def __init__(self, session_id: str):
+        self.id             = session_id
+        self.turns          = deque()   # (is_user, text), oldest first
+        self.bytes          = 0
+        self.lines          = deque()   # (line, tokens), oldest first
+        self.summary        = ""
+        self.summary_tokens = 0
+        self.folded         = 0
+        self.last_seen      = time.monotonic()
+        self.lock           = threading.Lock()
+        self._question      = ""        # last folded user turn, to score the reply after it
+
+    def history(self) -> list:
+        """Verbatim window as chat turns, oldest first."""
+        with self.lock:
+            return [{"role": "user" if is_user else "assistant", "content": text}
+                    for is_user, text in self.turns]
+
+    def append(self, message: str, reply: str) -> int:
+        """Add one completed exchange; fold what no longer fits. Returns turns folded."""
+        return self.extend(((True, message), (False, reply)))
+
+    def extend(self, turns) -> int:
+        """Add completed (is_user, text) turns, oldest first; fold what no longer fits."""
+        with self.lock:
+            for is_user, text in turns:
+                text = text.strip()
+                self.turns.append((is_user, text))
+                self.bytes += len(text.encode())
+
+            folded = 0
+            while len(self.turns) > MIN_WINDOW_TURNS and (
+                len(self.turns) > WINDOW_TURNS or self.bytes > MAX_BYTES
+            ):
+                self._fold(self.turns.popleft())
+                folded += 1
+            if folded:
+                self.summary = "\n".join(line for line, _ in self.lines)
+            return folded
+
+    def _fold(self, turn: tuple) -> None:
+        is_user, text = turn
+        self.bytes  -= len(text.encode())
+        self.folded += 1
+
+        if is_user:
+            self._question = text
+            line = f"- User asked: {_first_sentence(text)}"
+        else:
+            line = f"- Assistant: {_key_sentences(text, self._question)}"
+
+        tokens = count_tokens(line)
+        self.lines.append((line, tokens))
+        self.summary_tokens += tokens
+        while self.summary_tokens > SUMMARY_TOKENS and len(self.lines) > 1:
+            self.summary_tokens -= self.lines.popleft()[1]
+
+    def stats(self) -> dict:
+        return {
+            "turns":          len(self.turns),
+            "bytes":          self.bytes,
+            "folded":         self.folded,
+            "summary_tokens": self.summary_tokens,
+        }
+
+
+class SessionStore:
+    """Sessions by id: LRU past max_sessions, expired after ttl seconds idle."""
+
+    def __init__(self, max_sessions: int = MAX_SESSIONS, ttl: float = SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl          = ttl
+        self._data        = OrderedDict()   # id -> Session, least recently used first
+        self._lock        = threading.Lock()
+        self.created      = 0
+        self.expired      = 0
+        self.evicted      = 0
+        self.rehydrated   = 0
+
+    def get(self, session_id: str):
+        """The live session for session_id, or None."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._data.get(session_id)
+            if session is not None:
+                session.last_seen = now
+                self._data.move_to_end(session_id)
+            return session
+
+    def get_or_create(self, session_id: str = None) -> Session:
+        """
+        The session for session_id, or a new one. Ids are always minted
+        here; an unknown or malformed id starts a fresh session rather than
+        adopting the client's value.
+        """
+        if session_id and isinstance(session_id, str) and _ID_RE.match(session_id):
+            session = self.get(session_id)
+            if session is not None:
+                return session
+
+        session = Session(secrets.token_urlsafe(18))
+        with self._lock:
+            self._expire(session.last_seen)
+            self._data[session.id] = session
+            self.created += 1
+            while len(self._data) > self.max_sessions:
+                self._data.popitem(last=False)
+                self.evicted += 1
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._data.pop(session_id, None) is not None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._expire(time.monotonic())
+            return {
+                "active":     len(self._data),
+                "created":    self.created,
+                "expired":    self.expired,
+                "evicted":    self.evicted,
+                "rehydrated": self.rehydrated,
+            }
+
+    def _expire(self, now: float) -> None:
+        # Least recently used first, so stop at the first live one.
+        while self._data:
+            session = next(iter(self._data.values()))
+            if now - session.last_seen <= self.ttl:
+                break
+            self._data.popitem(last=False)
+            self.expired += 1
+
+
+_store = SessionStore()
+
+
+def get_store() -> SessionStore:
+    return _store
+
+
+def open_session(data: dict):
+    """
+    Session for a chat request body, or None for stateless requests.
+    A request is session-backed when it sends "session_id", or
+    "session": true to start one. An unknown session_id starts a new
+    session seeded from the body's "history", if it has one.
+    """
+    session_id = data.get("session_id")
+    if session_id is None and data.get("session") is not True:
+        return None
+
+    known = _store.get(session_id) if isinstance(session_id, str) and _ID_RE.match(session_id) else None
+    if known is not None:
+        return known
+
+    session = _store.get_or_create()
+    if session_id is not None:
+        turns = _history_turns(data.get("history"))
+        if turns:
+            session.extend(turns)
+            _store.rehydrated += 1
+    return session
+
+
+def _history_turns(history) -> list:
+    """(is_user, text) turns from a client history list; malformed turns are skipped."""
+    if not isinstance(history, list):
+        return []
+    turns = []
+    for turn in history[-MAX_REHYDRATE_TURNS:]:
+        if not isinstance(turn, dict):
+            continue
+        role, content = turn.get("role"), turn.get("content")
+        if role in ("user", "assistant") and isinstance(content, str) and content.strip():
+            turns.append((role == "user", content))
+    return turns
+
+
+def record_turn(session: Session, message: str, result: dict) -> dict:
+    """Store a finished exchange (errors are not kept) and tag the result with the id."""
+    if session is None:
+        return result
+    if result.get("model_used") != "error" and result.get("reply"):
+        session.append(message, result["reply"])
+    result["session_id"] = session.id
+    return result
+
+
+# ── Extractive summary ────────────────────────────────────────────────
+def _clean(text: str) -> str:
+    return _MARKDOWN_RE.sub("", text).strip()
+
+
+def _clip(text: str, limit: int = MAX_LINE_CHARS) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 1].rsplit(" ", 1)[0] + "…"
+
+
+def _sentences(text: str) -> list:
+    return [s for s in (_clean(part) for part in _SENTENCE_RE.split(text)) if len(s) > 3]
+
+
+def _first_sentence(text: str) -> str:
+    sentences = _sentences(text)
+    return _clip(sentences[0] if sentences else text)
+
+
+def _key_sentences(text: str, question: str, limit: int = 2) -> str:
+    """
+    The reply's most informative sentences, in their original order:
+    scored by overlap with the question plus figures (fees, ranks, cutoffs).
+    """
+    sentences = _sentences(text)
+    if not sentences:
+        return _clip(text)
+
+    asked  = {w for w in _WORD_RE.findall(question.lower()) if w not in _STOPWORDS}
+    scored = []
+    for i, sentence in enumerate(sentences):
+        words = set(_WORD_RE.findall(sentence.lower()))
+        score = len(words & asked) * 2 + len(_FACT_RE.findall(sentence))
+        scored.append((score, -i, sentence))
+
+    best = sorted(sorted(scored, reverse=True)[:limit], key=lambda s: -s[1])
+    return _clip(" ".join(sentence for _, _, sentence in best))
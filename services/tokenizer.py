@@ -0,0 +1,138 @@
+"""
+Token counting for prompt budgeting and compression stats.
+
+Two backends:
+  tiktoken  fast path, used when the package is installed and its encoding
+            loads (TOKENIZER_ENCODING, default cl100k_base — close to the
+            Llama 3 tokenizer Groq uses)
+  bundled   offline counter: GPT-style pre-tokenization, then greedy
+            longest-match over services/data/tokenizer_vocab.txt
+
+TOKENIZER=auto (default) | tiktoken | bundled picks the backend.
+Counts are cached per string, so repeated system prompts and program
+context blocks are counted once.
+
+terms() is the separate word-level splitter used for lexical matching
+(compression's query boost, retrieval BM25, the local FAQ index).
+"""
+
+import os
+import re
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+VOCAB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "tokenizer_vocab.txt")
+
+# Per-message overhead of the chat template (role header + separators).
+MESSAGE_OVERHEAD = 4
+# Tokens that prime the assistant reply.
+REPLY_PRIMING = 3
+
+# Contractions | words with optional leading space | 1-3 digit groups |
+# punctuation runs | newline runs | other whitespace
+_PRETOKEN_RE = re.compile(
+    r"'(?:s|t|re|ve|m|ll|d)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s*\n+|\s+",
+    re.IGNORECASE,
+)
+_ASCII_WORD_RE = re.compile(r"[a-z]+")
+
+_TERM_RE   = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are about be can do does for how i in is it me my of on or "
+    "the to what which who why with you your".split()
+)
+
+
+def _load_vocab() -> tuple:
+    words, max_len = set(), 1
+    with open(VOCAB_PATH, encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0]
+            for piece in line.split():
+                words.add(piece.lower())
+                max_len = max(max_len, len(piece))
+    return frozenset(words), max_len
+
+
+_VOCAB, _MAX_PIECE = _load_vocab()
+
+
+def _word_tokens(word: str) -> int:
+    """Greedy longest-match segmentation of one lowercase word."""
+    if word in _VOCAB:
+        return 1
+    if not _ASCII_WORD_RE.fullmatch(word):
+        # Non-Latin scripts: byte-level BPE spends roughly a token per character.
+        return len(word)
+
+    count, i, n = 0, 0, len(word)
+    while i < n:
+        for size in range(min(_MAX_PIECE, n - i), 1, -1):
+            if word[i:i + size] in _VOCAB:
+                i += size
+                break
+        else:
+            # No known piece: unknown runs average ~3 characters per token.
+            i += 3
+        count += 1
+    return count
+
+
+def _bundled_count(text: str) -> int:
+    count = 0
+    for piece in _PRETOKEN_RE.findall(text):
+        stripped = piece.strip()
+        if not stripped:
+            count += 1
+        elif stripped[0].isdigit():
+            count += 1
+        elif stripped[0].isalpha():
+            count += _word_tokens(stripped.lower())
+        else:
+            count += (len(stripped) + 1) // 2
+    return count
+
+
+def _load_tiktoken():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(os.getenv("TOKENIZER_ENCODING", "cl100k_base"))
+    except Exception as e:
+        logger.info(f"tiktoken unavailable ({e}); using bundled tokenizer.")
+        return None
+
+
+def _select_backend():
+    choice = os.getenv("TOKENIZER", "auto").lower()
+    if choice in ("auto", "tiktoken"):
+        encoding = _load_tiktoken()
+        if encoding is not None:
+            return "tiktoken", lambda text: len(encoding.encode(text, disallowed_special=()))
+    return "bundled", _bundled_count
+
+
+BACKEND, _count = _select_backend()
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    return _count(text)
+
+
+def count_message_tokens(messages: list) -> int:
+    """Prompt tokens for a chat messages array, including template overhead."""
+    return sum(count_tokens(m["content"]) + MESSAGE_OVERHEAD for m in messages) + REPLY_PRIMING
+
+
+def terms(text: str) -> list:
+    """Lowercase alphanumeric terms without stopwords; trailing plural 's' folded."""
+    # Crude plural folding so "fees" matches "fee" and "cutoffs" matches "cutoff".
+    return [
+        t[:-1] if len(t) > 3 and t.endswith("s") else t
+        for t in _TERM_RE.findall(text.lower())
+        if t not in _STOPWORDS
+    ]
@@ -0,0 +1,157 @@
+"""
+Startup warmup and readiness.
+
+warmup(app) loads the catalog and builds everything the first requests
+would otherwise build: search, retrieval and eligibility indexes, the
+ranking feature table, the local FAQ index, the tokenizer, program
+list/detail responses (with their compressed context), checklists and
+static asset hashes. Under the production launcher
+(wsgi.py + gunicorn.conf.py) it runs once in the master before workers
+fork, then gc.freeze() moves the result out of the collector's reach, so
+workers share those pages copy-on-write instead of each rebuilding and
+dirtying them.
+
+/api/ready answers 503 until warmup has finished, then 200.
+
+Startup time is exported as app_startup_seconds{phase=...}:
+  import       importing the app and its services (when the launcher measured it)
+  create_app   building the Flask app
+  warmup       warmup(), total; plus one warmup_<step> phase per step
+"""
+
+import gc
+import time
+import logging
+import threading
+from contextlib import contextmanager
+
+from services.metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+STARTUP_SECONDS = Gauge("app_startup_seconds", "Time spent in each startup phase", ("phase",))
+READY           = Gauge("app_ready", "1 once warmup has finished")
+
+WARM_QUERIES = ["", "engineering", "mba", "law", "medical"]
+WARM_MESSAGE = "eligibility fees and cutoff"
+
+_lock   = threading.Lock()
+_phases = {}
+_ready  = False
+_errors = []
+
+
+@contextmanager
+def startup_phase(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - start)
+
+
+def record_phase(name: str, seconds: float) -> None:
+    _phases[name] = round(seconds, 4)
+    STARTUP_SECONDS.set(seconds, phase=name)
+
+
+def warmup(app, freeze: bool = False) -> dict:
+    """
+    Build caches and indexes once, then mark the process ready. Safe to call
+    more than once; later calls return the first result. A failing step is
+    logged and skipped, never fatal.
+    """
+    global _ready
+    with _lock:
+        if _ready:
+            return readiness()
+
+        with startup_phase("warmup"):
+            for name, step in _steps(app):
+                try:
+                    with startup_phase(f"warmup_{name}"):
+                        step()
+                except Exception as e:
+                    logger.error(f"Warmup step {name} failed: {e}")
+                    _errors.append(f"{name}: {e}")
+
+        if freeze:
+            gc.collect()
+            gc.freeze()
+
+        _ready = True
+        READY.set(1)
+        logger.info(f"Warmup finished in {_phases['warmup']:.2f}s")
+        return readiness()
+
+
+def is_ready() -> bool:
+    return _ready
+
+
+def readiness() -> dict:
+    return {
+        "ready":           _ready,
+        "startup_seconds": dict(_phases),
+        "warmup_errors":   list(_errors),
+    }
+
+
+def after_fork() -> None:
+    """
+    Per-worker cleanup after a pre-fork: drop upstream connections and
+    pooled Scaledown compressors the master may have opened, so no socket
+    is shared between processes.
+    """
+    from services import http_client
+    from services.compression import reset_provider
+    http_client.reset()
+    reset_provider()
+
+
+def _steps(app) -> list:
+    from services.admissions_data import PROGRAMS, get_all_programs
+    from services.tokenizer import count_tokens
+    from services.search import search_programs
+    from services.retrieval import build_context
+    from services.eligibility import get_index as eligibility_index
+    from services.checklist import program_checklist
+    from services.faq import get_index as faq_index
+    from services.ranking import get_table as ranking_table
+
+    def catalog():
+        get_all_programs()
+        count_tokens(WARM_MESSAGE)
+
+    def search():
+        for query in WARM_QUERIES:
+            search_programs(query)
+
+    def retrieval():
+        build_context(WARM_MESSAGE, None)
+        for pid in PROGRAMS:
+            build_context(WARM_MESSAGE, pid)
+
+    def checklists():
+        for pid in PROGRAMS:
+            program_checklist(pid)
+
+    def responses():
+        # Through the routes, so the prepared list/detail bodies and the
+        # SPA's static hashes are what real requests will hit.
+        client = app.test_client()
+        client.get("/")
+        client.get("/api/programs")
+        for pid in PROGRAMS:
+            client.get(f"/api/programs/{pid}")
+
+    return [
+        ("catalog",     catalog),
+        ("search",      search),
+        ("retrieval",   retrieval),
+        ("eligibility", eligibility_index),
+        ("ranking",     ranking_table),
+        ("faq",         faq_index),
+        ("checklists",  checklists),
+        ("responses",   responses),
+    ]
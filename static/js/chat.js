@@ -2,22 +2,25 @@
  * chat.js
  * Responsibility: AI chat interface.
  *
- * KEY FIX — history bug:
- * history[] stores COMPLETED turns only.
- * The current message is sent separately to /api/chat as `message`.
- * The server appends history + message itself.
- * We push to history ONLY AFTER the API responds successfully.
+ * Conversation state lives on the server (services/sessions.py).
+ * Each request carries the new `message` plus the `session_id` returned
+ * by the previous reply; the first request asks for a session with
+ * `session: true`. The server records a turn only after a successful
+ * reply, so the current message is never part of its own history.
  *
- * This means:
- *   - history sent: [{role:"user","Hi"}, {role:"assistant","Hello!"}]
- *   - message sent: "What is JEE?"
- *   - NOT: [...history, {role:"user","What is JEE?"}] ← this was the bug
+ * The last few completed turns also go along as `history`. The server
+ * ignores them while it knows the session. A request that lands on a
+ * worker without it (several gunicorn workers, a restart, an expired
+ * session) rebuilds the session from them instead of starting over.
  */
 
 const Chat = (() => {
+  const RECENT_TURNS = 8;             // matches CHAT_SESSION_WINDOW
+
   let initialized     = false;
   let isLoading       = false;
-  let history         = [];           // completed turns only
+  let sessionId       = null;         // server-side conversation, set by the first reply
+  let recentTurns     = [];           // completed turns only, fallback for an unknown session
   let selectedProgram = '';           // program context id
 
   // ── Init ──────────────────────────────────────────────────────────
@@ -158,15 +161,15 @@ const Chat = (() => {
     if (typingEl) typingEl.style.display = 'flex';
     scrollToBottom();
 
+    let bubble = null;   // assistant bubble, created on the first streamed delta
+
     try {
-      // KEY FIX: send history (completed turns) + message (current turn) separately.
-      // Do NOT push message to history before sending.
-      const response = await fetch('/api/chat', {
+      const response = await fetch('/api/chat/stream', {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({
           message,
-          history: history.slice(-10),          // last 10 completed turns
+          ...(sessionId ? { session_id: sessionId, history: recentTurns } : { session: true }),
           program_id: selectedProgram || undefined,
         }),
       });
@@ -176,20 +179,34 @@ const Chat = (() => {
         throw new Error(err.error || `Server error ${response.status}`);
       }
 
-      const data = await response.json();
-      const reply = data.reply || 'No response received.';
-
-      // Now push both turns to history (after successful response)
-      history.push({ role: 'user',      content: message });
-      history.push({ role: 'assistant', content: reply });
+      // Render partial text as SSE deltas arrive
+      let partial = '';
+      const done = await readStream(response, event => {
+        if (event.delta) {
+          if (!bubble) {
+            if (typingEl) typingEl.style.display = 'none';
+            bubble = addMessage('assistant', '');
+          }
+          partial += event.delta;
+          bubble.innerHTML = formatMarkdown(partial);
+          scrollToBottom();
+        }
+      });
 
-      // Keep history manageable
-      if (history.length > 20) history = history.slice(-20);
+      const reply = done?.reply || partial || 'No response received.';
+      if (!bubble) bubble = addMessage('assistant', reply);
+      else bubble.innerHTML = formatMarkdown(reply);
 
-      addMessage('assistant', reply);
+      // The server has recorded the turn; keep its id for the next message
+      if (done?.session_id) sessionId = done.session_id;
+      if (done && done.model_used !== 'error') {
+        recentTurns.push({ role: 'user', content: message }, { role: 'assistant', content: reply });
+        recentTurns = recentTurns.slice(-RECENT_TURNS);
+      }
 
     } catch (err) {
-      addMessage('assistant', `**Error:** ${err.message}`);
+      if (bubble) bubble.innerHTML += formatMarkdown(`\n\n**Error:** ${err.message}`);
+      else addMessage('assistant', `**Error:** ${err.message}`);
     } finally {
       isLoading = false;
       if (typingEl) typingEl.style.display = 'none';
@@ -198,6 +215,33 @@ const Chat = (() => {
     }
   }
 
+  // ── Read an SSE response body; returns the final {done:true} event ─
+  async function readStream(response, onEvent) {
+    const reader  = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer    = '';
+    let last      = null;
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line
+      let sep;
+      while ((sep = buffer.indexOf('\n\n')) !== -1) {
+        const raw = buffer.slice(0, sep);
+        buffer    = buffer.slice(sep + 2);
+        const line = raw.split('\n').find(l => l.startsWith('data:'));
+        if (!line) continue;
+        const event = JSON.parse(line.slice(5).trim());
+        if (event.done) last = event;
+        onEvent(event);
+      }
+    }
+    return last;
+  }
+
   // ── Public: send a pre-filled question (from other pages) ─────────
   function sendQuestion(text) {
     // Navigate to chat then send
@@ -226,6 +270,7 @@ const Chat = (() => {
 
     container.appendChild(el);
     scrollToBottom();
+    return el.querySelector('.msg-bubble');
   }
 
   function scrollToBottom() {
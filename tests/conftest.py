@@ -0,0 +1,18 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep tests off the real catalog file and Groq.
+os.environ.setdefault("CATALOG_DB", os.path.join(tempfile.mkdtemp(prefix="admissai-tests-"), "catalog.sqlite3"))
+os.environ.setdefault("GROQ_API_KEY", "")
+
+
+@pytest.fixture
+def client():
+    from app import create_app
+    return create_app().test_client()
@@ -0,0 +1,39 @@
+import pytest
+
+import routes.admin
+from services.admissions_data import PROGRAMS
+from services.catalog_cache import catalog_version
+
+HEADERS = {"Authorization": "Bearer test-token"}
+
+
+@pytest.fixture(autouse=True)
+def admin_token(monkeypatch):
+    monkeypatch.setattr(routes.admin, "ADMIN_TOKEN", "test-token")
+
+
+def test_upsert_with_non_string_exams_is_rejected(client):
+    exams   = list(PROGRAMS["btech"]["exams"])
+    version = catalog_version()
+
+    resp = client.post("/api/admin/programs", json={"upsert": [{"id": "btech", "exams": [1, 2]}]}, headers=HEADERS)
+
+    assert resp.status_code == 400
+    assert "exams" in resp.get_json()["error"]
+    assert PROGRAMS["btech"]["exams"] == exams
+    assert catalog_version() == version
+    assert client.get("/api/programs/btech").status_code == 200
+    assert client.get("/api/programs?q=b").status_code == 200
+
+
+@pytest.mark.parametrize("change", [
+    {"upsert": [{"id": "btech", "fees": {"IITs": 2.2}}]},
+    {"upsert": [{"id": "btech", "careers": ["Engineer", None]}]},
+    {"delete": [["x"]]},
+    {"delete": [""]},
+])
+def test_malformed_changes_are_rejected(client, change):
+    version = catalog_version()
+    resp = client.post("/api/admin/programs", json=change, headers=HEADERS)
+    assert resp.status_code == 400
+    assert catalog_version() == version
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from services import admission, ai_service, http_client
+
+
+@pytest.fixture
+def fake_upstream(monkeypatch):
+    """A valid-looking key and an upstream that takes 50 ms per reply."""
+    monkeypatch.setattr(http_client, "_api_key", "gsk_" + "x" * 40)
+
+    async def upstream(api_key, messages, est_tokens=0, deadline=None):
+        await asyncio.sleep(0.05)
+        return {"reply": "ok", "model_used": "groq/test", "usage": None}
+
+    monkeypatch.setattr(ai_service, "_chat_upstream_async", upstream)
+
+
+def test_asgi_chat_is_not_shed_at_thread_limits(monkeypatch, fake_upstream):
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("asgiref")
+    import asgi
+
+    # gunicorn.conf.py-sized thread limits must not apply to the event loop.
+    monkeypatch.setattr(admission, "_controller", admission.AdmissionController(4, 2))
+
+    async def run():
+        transport = httpx.ASGITransport(app=asgi.AsyncApp(asgi.create_app()))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(
+                client.post("/api/chat", json={"message": f"Unusual question number {i} about hostels"})
+                for i in range(60)
+            ))
+
+    statuses = [resp.status_code for resp in asyncio.run(run())]
+    assert statuses.count(200) == 60
+
+
+def test_batch_waits_for_admission_instead_of_failing(monkeypatch):
+    from services import batch
+
+    # gunicorn.conf.py defaults: 4 in flight, 2 queued.
+    monkeypatch.setattr(admission, "_controller", admission.AdmissionController(4, 2, queue_timeout=0.2))
+    monkeypatch.setattr(http_client, "_api_key", "gsk_" + "x" * 40)
+
+    def upstream(api_key, messages, est_tokens=0, deadline=None):
+        import time
+        time.sleep(0.05)
+        return {"reply": "ok", "model_used": "groq/test", "usage": None}
+
+    monkeypatch.setattr(ai_service, "_chat_upstream", upstream)
+
+    items = [{"message": f"Unusual batch question number {i} about hostels"} for i in range(24)]
+    rows  = list(batch.run_batch(items, concurrency=8))
+    assert [r["status"] for r in rows].count("ok") == 24
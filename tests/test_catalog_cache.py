@@ -0,0 +1,37 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.catalog_cache import mark_catalog_changed, memoize
+from services.retrieval import get_index, program_chunks
+
+
+def test_exclusive_memo_builds_once_under_concurrency():
+    builds = []
+
+    @memoize(exclusive=True)
+    def build():
+        builds.append(threading.get_ident())
+        time.sleep(0.05)
+        return object()
+
+    with ThreadPoolExecutor(8) as pool:
+        values = list(pool.map(lambda _: build(), range(8)))
+
+    assert len(builds) == 1
+    assert all(v is values[0] for v in values)
+
+
+def test_index_is_rebuilt_once_per_catalog_version():
+    index = get_index()
+    assert get_index() is index
+
+    mark_catalog_changed()
+    assert get_index() is not index
+
+
+def test_unknown_program_ids_are_not_memoized():
+    before = program_chunks.memo.stats()["entries"]
+    for i in range(50):
+        assert program_chunks(f"no-such-program-{i}") == ()
+    assert program_chunks.memo.stats()["entries"] == before
@@ -0,0 +1,16 @@
+from services import ai_service, http_client
+
+
+def _errors() -> float:
+    return sum(value for _, labels, value in ai_service.CHAT_REPLIES.samples() if labels["outcome"] == "error")
+
+
+def test_stream_without_key_counts_one_error(monkeypatch, client):
+    monkeypatch.setattr(http_client, "_api_key", "")
+    before = _errors()
+
+    resp = client.post("/api/chat/stream", json={"message": "Unusual question about hostel food"})
+
+    assert resp.status_code == 200
+    assert b'"model_used": "error"' in resp.data
+    assert _errors() - before == 1
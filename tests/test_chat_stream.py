@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from services import ai_service, http_client
+from tools.fake_groq import DEFAULT_REPLY, start_server
+
+
+@pytest.fixture
+def fake_groq(monkeypatch):
+    server = start_server()
+    monkeypatch.setattr(ai_service, "GROQ_URL", f"{server.base_url}/chat/completions")
+    monkeypatch.setattr(http_client, "_api_key", "gsk_fake_key_for_local_testing")
+    yield server
+    server.shutdown()
+
+
+def _events(body: bytes) -> list:
+    frames = body.decode().split("\n\n")
+    assert frames[-1] == ""
+    assert all(frame.startswith("data: ") for frame in frames[:-1])
+    return [json.loads(frame[len("data: "):]) for frame in frames[:-1]]
+
+
+def test_stream_is_sse_deltas_then_done(client, fake_groq):
+    resp = client.post("/api/chat/stream", json={"message": "Which hostel blocks have single rooms?"})
+
+    assert resp.status_code == 200
+    assert resp.mimetype == "text/event-stream"
+    assert resp.headers["Cache-Control"] == "no-cache"
+
+    events = _events(resp.data)
+    *deltas, done = events
+    assert len(deltas) > 1
+    assert all(set(event) == {"delta"} for event in deltas)
+    assert done["done"] is True
+    assert done["reply"] == "".join(event["delta"] for event in deltas) == DEFAULT_REPLY
+    assert done["model_used"] == f"groq/{ai_service.GROQ_MODEL}"
+
+
+def test_stream_final_event_carries_session_id(client, fake_groq):
+    resp = client.post("/api/chat/stream", json={"message": "Is there a night library?", "session": True})
+
+    done = _events(resp.data)[-1]
+    assert done["done"] is True
+    assert done["session_id"]
+
+
+def test_stream_requires_message(client):
+    resp = client.post("/api/chat/stream", json={"message": "  "})
+    assert resp.status_code == 400
@@ -0,0 +1,67 @@
+import pytest
+
+from services.admissions_data import PROGRAMS
+from services.checklist import categorize, program_checklist
+
+
+def _legacy_categorize(task: str) -> str:
+    # The chain routes/checklist.py used before categorize() replaced it.
+    task_lower = task.lower()
+    if any(w in task_lower for w in ["essay", "statement", "write", "answer"]):
+        return "Essays"
+    elif any(w in task_lower for w in ["recommendation", "reference"]):
+        return "Recommendations"
+    elif any(w in task_lower for w in ["test", "sat", "act", "toefl", "ielts", "lnat", "score"]):
+        return "Testing"
+    elif any(w in task_lower for w in ["transcript", "grade", "academic"]):
+        return "Academics"
+    elif any(w in task_lower for w in ["fee", "pay", "submit", "complete", "application"]):
+        return "Application"
+    elif any(w in task_lower for w in ["interview"]):
+        return "Interviews"
+    else:
+        return "Other"
+
+
+TASKS = [
+    "Write the personal statement",
+    "Request two recommendation letters",
+    "Send official SAT scores",
+    "Book the LNAT",
+    "Upload transcripts",
+    "Pay the application fee",
+    "Complete the online form",
+    "Attend the interview",
+    "Enter the contest",                        # "test" inside "contest"
+    "Register for the JEE Main exam and note its test date",
+    "Keep 12th marksheet and academic documents ready",
+    "Shortlist colleges (IIT Bombay, ...)",
+    "Apply before the deadline",
+    "",
+]
+
+
+@pytest.mark.parametrize("task", TASKS)
+def test_categorize_matches_legacy_chain(task):
+    assert categorize(task) == _legacy_categorize(task)
+
+
+def test_derived_checklist_categories():
+    items = program_checklist(next(iter(PROGRAMS)))["items"]
+    by_task = {item["task"]: item["category"] for item in items}
+
+    assert by_task["Keep 12th marksheet and academic documents ready"] == "Academics"
+    assert by_task["Submit application forms and pay the application fee"] == "Application"
+    assert by_task["Prepare for counselling or interview rounds"] == "Interviews"
+    assert all(category == "Testing" for task, category in by_task.items() if task.startswith("Register for"))
+
+
+def test_unknown_ids_are_not_memoized(client):
+    before = program_checklist.memo.stats()["entries"]
+    ids    = ",".join(f"no-such-program-{i}" for i in range(50))
+
+    response = client.get(f"/api/checklists?ids={ids}")
+
+    assert response.status_code == 200
+    assert len(response.get_json()["missing"]) == 50
+    assert program_checklist.memo.stats()["entries"] == before
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+TEXT = "B.Tech fees are Rs. 1.5-4L/yr.\nJEE Main is the entrance exam.\nHostels are available."
+
+
+@pytest.mark.parametrize("query", [5, ["fees"], {"q": "fees"}])
+def test_non_string_query_is_rejected(client, query):
+    response = client.post("/api/compress", json={"text": TEXT, "query": query})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "query must be a string"
+
+
+def test_query_is_optional(client):
+    for body in ({"text": TEXT}, {"text": TEXT, "query": None}, {"text": TEXT, "query": "fees"}):
+        assert client.post("/api/compress", json=body).status_code == 200
+
+
+def test_batch_rejects_non_string_query_per_item(client):
+    response = client.post("/api/compress/batch", json={"items": [
+        {"text": TEXT, "query": "fees"},
+        {"text": TEXT, "query": 5},
+    ]})
+
+    assert response.status_code == 200
+    ok, bad = response.get_json()["results"]
+    assert ok["status"] == "ok"
+    assert bad == {"index": 1, "status": "invalid", "error": "query must be a string"}
+
+
+def test_asgi_rejects_non_string_query():
+    httpx = pytest.importorskip("httpx")
+    pytest.importorskip("asgiref")
+    import asgi
+
+    async def run():
+        transport = httpx.ASGITransport(app=asgi.AsyncApp(asgi.create_app()))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/compress", json={"text": TEXT, "query": 5})
+
+    assert asyncio.run(run()).status_code == 400
@@ -0,0 +1,15 @@
+def test_non_object_scores_is_a_400(client):
+    resp = client.post("/api/eligibility", json={"stream": "pcm", "marks": 85, "scores": [1, 2]})
+    assert resp.status_code == 400
+    assert "scores" in resp.get_json()["error"]
+
+
+def test_non_object_scores_in_a_roster_fails_only_that_profile(client):
+    resp = client.post("/api/eligibility", json={"profiles": [
+        {"id": "ok", "stream": "pcm", "marks": 85, "scores": {"jee": 97}},
+        {"id": "bad", "stream": "pcm", "marks": 85, "scores": "jee"},
+    ]})
+    assert resp.status_code == 200
+    ok, bad = resp.get_json()["results"]
+    assert "error" not in ok and ok["count"] > 0
+    assert "scores" in bad["error"]
@@ -0,0 +1,52 @@
+import pytest
+
+from services import faq, http_client
+
+
+@pytest.mark.parametrize("message, program_id, faq_id", [
+    ("BBA salary", None, "bba:salary"),
+    ("What is B.Tech?", None, "btech:overview"),
+    ("fees", "btech", "btech:fees"),                     # scoped row, program selected
+    ("JEE Main vs Advanced", None, "jee-main-vs-advanced"),
+])
+def test_confident_matches_are_answered_locally(message, program_id, faq_id):
+    reply = faq.answer(message, program_id)
+
+    assert reply["model_used"] == faq.MODEL_TAG
+    assert reply["faq"]["id"] == faq_id
+    assert reply["faq"]["score"] >= faq.THRESHOLD
+
+
+@pytest.mark.parametrize("message, program_id", [
+    ("BCA vs BBA fees", None),
+    ("BBA or MBA salary", None),                         # two answers tie: no margin
+    ("B.Tech fees at IIT Bombay hostel", None),          # goes beyond the FAQ: below threshold
+    ("fees", None),                                      # scoped rows need a selected program
+])
+def test_uncertain_matches_fall_through(message, program_id):
+    assert faq.answer(message, program_id) is None
+
+
+def test_margin_is_what_rejects_a_comparison(monkeypatch):
+    monkeypatch.setattr(faq, "MARGIN", 0.0)
+    reply = faq.answer("BBA or MBA salary")
+
+    assert reply["faq"]["score"] >= faq.THRESHOLD
+
+
+def test_threshold_is_what_rejects_a_longer_question(monkeypatch):
+    threshold = faq.THRESHOLD
+    monkeypatch.setattr(faq, "THRESHOLD", 0.3)
+    reply = faq.answer("B.Tech fees at IIT Bombay hostel")
+
+    assert reply["faq"]["id"] == "btech:fees"
+    assert reply["faq"]["score"] < threshold
+
+
+def test_comparison_goes_to_groq(monkeypatch, client):
+    monkeypatch.setattr(http_client, "_api_key", "")
+
+    resp = client.post("/api/chat", json={"message": "BCA vs BBA fees"})
+
+    assert resp.status_code == 200
+    assert resp.get_json()["model_used"] != faq.MODEL_TAG
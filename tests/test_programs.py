@@ -0,0 +1,58 @@
+import pytest
+
+from services.admissions_data import PROGRAMS
+
+
+def _ids(resp) -> list:
+    return [program["id"] for program in resp.get_json()["programs"]]
+
+
+def test_lists_the_catalog_in_order(client):
+    resp = client.get("/api/programs")
+    data = resp.get_json()
+
+    assert resp.status_code == 200
+    assert _ids(resp) == list(PROGRAMS)
+    assert data["total"] == len(PROGRAMS)
+    assert (data["limit"], data["offset"]) == (50, 0)
+    assert sum(data["facets"]["level"].values()) == len(PROGRAMS)
+
+
+def test_name_match_ranks_first(client):
+    ids = _ids(client.get("/api/programs?q=mba"))
+
+    assert ids[0] == "mba"
+    assert len(ids) > 1                            # weaker substring matches follow
+
+
+def test_ties_keep_catalog_order(client):
+    assert _ids(client.get("/api/programs?q=business")) == ["bba", "mba"]
+
+
+def test_query_and_facet_filter_combine(client):
+    resp = client.get("/api/programs?q=symbiosis&category=Management")
+
+    assert _ids(resp) == ["bba"]
+    assert resp.get_json()["facets"]["category"] == {"Computer Science": 1, "Management": 1}
+
+
+def test_limit_and_offset_paginate(client):
+    everything = list(PROGRAMS)
+    pages = [_ids(client.get(f"/api/programs?limit=2&offset={offset}")) for offset in range(0, len(everything), 2)]
+
+    assert all(len(page) <= 2 for page in pages)
+    assert [pid for page in pages for pid in page] == everything
+    assert _ids(client.get(f"/api/programs?offset={len(everything)}")) == []
+
+
+def test_limit_is_clamped(client):
+    assert client.get("/api/programs?limit=0").get_json()["limit"] == 1
+    assert client.get("/api/programs?limit=1000").get_json()["limit"] == 200
+    assert client.get("/api/programs?offset=-5").get_json()["offset"] == 0
+
+
+@pytest.mark.parametrize("query", ["limit=ten", "offset=x", "limit=1.5"])
+def test_non_integer_paging_is_rejected(client, query):
+    resp = client.get(f"/api/programs?{query}")
+    assert resp.status_code == 400
+    assert resp.get_json()["error"] == "limit and offset must be integers"
@@ -0,0 +1,59 @@
+import time
+
+from services.response_cache import MemoryBackend, ResponseCache, make_key
+
+
+def _reply(text: str = "ok", model_used: str = "groq/test") -> dict:
+    return {"reply": text, "model_used": model_used}
+
+
+def test_least_recently_used_entry_is_evicted():
+    backend = MemoryBackend(max_entries=2)
+    backend.set("a", _reply())
+    backend.set("b", _reply())
+    backend.get("a")                  # a is now the most recently used
+
+    backend.set("c", _reply())
+
+    assert backend.get("a") is not None
+    assert backend.get("b") is None
+    assert backend.get("c") is not None
+    assert backend.evictions == 1
+
+
+def test_byte_cap_evicts_oldest_replies():
+    backend = MemoryBackend(max_entries=100, max_bytes=10)
+    backend.set("a", _reply("x" * 6))
+    backend.set("b", _reply("y" * 6))
+
+    assert backend.get("a") is None
+    assert backend.get("b") is not None
+
+
+def test_entries_expire_after_ttl():
+    backend = MemoryBackend(ttl=0.05)
+    backend.set("a", _reply())
+    assert backend.get("a") is not None
+
+    time.sleep(0.1)
+
+    assert backend.get("a") is None
+    assert backend.size() == 0
+
+
+def test_error_replies_are_never_cached():
+    cache = ResponseCache(MemoryBackend())
+    cache.set("err", _reply("Groq is down", model_used="error"))
+    cache.set("ok", _reply())
+
+    assert cache.get("err") is None
+    assert cache.get("ok") == _reply()
+    assert cache.stats()["stores"] == 1
+
+
+def test_key_ignores_case_whitespace_and_trailing_punctuation():
+    key = make_key("BCA eligibility?", "ctx", [])
+
+    assert make_key("  bca   Eligibility ", "ctx", []) == key
+    assert make_key("BCA eligibility?", "other ctx", []) != key
+    assert make_key("BCA eligibility?", "ctx", [{"role": "user", "content": "hi"}]) != key
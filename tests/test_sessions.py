@@ -0,0 +1,30 @@
+from services.sessions import get_store, open_session
+
+HISTORY = [
+    {"role": "user", "content": "What is the B.Tech cutoff at NIT Trichy?"},
+    {"role": "assistant", "content": "Around 98.5 percentile in JEE Main for CS."},
+]
+
+
+def test_unknown_session_is_rebuilt_from_history():
+    # An id minted by another worker: valid shape, unknown here.
+    session = open_session({"session_id": "A" * 24, "history": HISTORY})
+
+    assert session.id != "A" * 24
+    assert session.history() == HISTORY
+    assert get_store().stats()["rehydrated"] >= 1
+
+
+def test_known_session_ignores_client_history():
+    session = open_session({"session": True})
+    session.append("Hi", "Hello!")
+
+    again = open_session({"session_id": session.id, "history": HISTORY})
+
+    assert again is session
+    assert again.history() == [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello!"}]
+
+
+def test_malformed_history_turns_are_skipped():
+    session = open_session({"session_id": "B" * 24, "history": [1, {"role": "system", "content": "x"}, *HISTORY]})
+    assert session.history() == HISTORY
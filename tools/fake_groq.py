@@ -0,0 +1,202 @@
+"""
+Local fake of Groq's OpenAI-compatible chat completions API.
+
+Lets you exercise /api/chat and /api/chat/stream without a real key or
+network access. It can also act like a busy upstream:
+  --latency SECONDS      delay before each response
+  --rpm N                requests-per-minute bucket; over it -> 429 + retry-after
+  --fail-first N         answer the first N requests with 429
+  --retry-after SECONDS  retry-after sent with injected 429s
+Every response carries Groq-style x-ratelimit-* headers.
+
+Start:
+  python tools/fake_groq.py --port 8080
+
+Then run the app against it:
+  GROQ_BASE_URL=http://127.0.0.1:8080/openai/v1 GROQ_API_KEY=gsk_fake_key_for_local_testing python app.py
+
+Or from Python:
+  server = start_server()          # random free port, runs in a daemon thread
+  server.base_url                  # -> "http://127.0.0.1:<port>/openai/v1"
+  server.shutdown()
+"""
+
+import json
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+DEFAULT_REPLY = (
+    "**JEE Main** is the gateway to NITs and IIITs. "
+    "Aim for a 98+ percentile for CS at a top NIT, and keep 75% in 12th for eligibility."
+)
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version        = "HTTP/1.1"
+    disable_nagle_algorithm = True    # headers and body go out as separate writes
+
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": "not found"}})
+
+        length = int(self.headers.get("Content-Length", 0))
+        body   = json.loads(self.rfile.read(length) or b"{}")
+        config = self.server.config
+
+        if not self.headers.get("Authorization", "").startswith("Bearer gsk_"):
+            return self._send_json(401, {"error": {"message": "Invalid API Key"}})
+
+        if config["latency"]:
+            time.sleep(config["latency"])
+
+        limited, limit_headers = self.server.limiter.take()
+        self.extra_headers = limit_headers
+        if limited:
+            return self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}})
+
+        reply = config["reply"]
+        usage = _usage(body.get("messages", []), reply)
+        if body.get("stream"):
+            return self._send_stream(reply, config["chunk_delay"], usage)
+
+        self._send_json(200, {
+            "id":      "chatcmpl-fake",
+            "object":  "chat.completion",
+            "model":   body.get("model", "fake"),
+            "choices": [{
+                "index":         0,
+                "message":       {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        })
+
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self._send_extra_headers()
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, reply: str, chunk_delay: float, usage: dict):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self._send_extra_headers()
+        self.end_headers()
+
+        words = reply.split(" ")
+        for i, word in enumerate(words):
+            piece = word if i == len(words) - 1 else word + " "
+            event = {"choices": [{"index": 0, "delta": {"content": piece}}]}
+            self._write_chunk(f"data: {json.dumps(event)}\n\n")
+            if chunk_delay:
+                time.sleep(chunk_delay)
+
+        # Groq sends usage with the final chunk under x_groq.
+        final = {"choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "x_groq": {"usage": usage}}
+        self._write_chunk(f"data: {json.dumps(final)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _send_extra_headers(self):
+        for name, value in getattr(self, "extra_headers", {}).items():
+            self.send_header(name, value)
+
+    def _write_chunk(self, text: str):
+        data = text.encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class RequestLimiter:
+    """Fixed one-minute window of `rpm` requests, plus `fail_first` forced 429s."""
+
+    def __init__(self, rpm: int = 0, fail_first: int = 0, retry_after: float = 1.0):
+        self.rpm          = rpm
+        self.fail_first   = fail_first
+        self.retry_after  = retry_after
+        self.window_start = time.monotonic()
+        self.used         = 0
+        self.seen         = 0
+        self.lock         = threading.Lock()
+
+    def take(self) -> tuple:
+        """Returns (limited, headers)."""
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= 60:
+                self.window_start, self.used = now, 0
+            self.seen += 1
+            reset = 60 - (now - self.window_start)
+            limit = self.rpm or 14400
+
+            if self.seen <= self.fail_first:
+                limited, wait = True, self.retry_after
+            elif self.rpm and self.used >= self.rpm:
+                limited, wait = True, reset
+            else:
+                limited, wait = False, 0
+                self.used += 1
+
+            headers = {
+                "x-ratelimit-limit-requests":     str(limit),
+                "x-ratelimit-remaining-requests": str(max(0, limit - self.used)),
+                "x-ratelimit-reset-requests":     f"{reset:.2f}s",
+            }
+            if limited:
+                headers["retry-after"] = f"{wait:.2f}"
+            return limited, headers
+
+
+def _usage(messages: list, reply: str) -> dict:
+    # Rough whitespace count; real servers use their own tokenizer.
+    prompt     = sum(len(str(m.get("content", "")).split()) + 4 for m in messages)
+    completion = len(reply.split())
+    return {"prompt_tokens": prompt, "completion_tokens": completion, "total_tokens": prompt + completion}
+
+
+class FakeGroqServer(ThreadingHTTPServer):
+    daemon_threads     = True
+    request_queue_size = 1024     # accept bursts of concurrent connections (load tests)
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, reply: str = DEFAULT_REPLY,
+                 chunk_delay: float = 0.0, latency: float = 0.0, rpm: int = 0,
+                 fail_first: int = 0, retry_after: float = 1.0) -> ThreadingHTTPServer:
+    """Start the fake server in a daemon thread and return it."""
+    server = FakeGroqServer((host, port), FakeGroqHandler)
+    server.config  = {"reply": reply, "chunk_delay": chunk_delay, "latency": latency}
+    server.limiter = RequestLimiter(rpm, fail_first, retry_after)
+    server.base_url = f"http://{host}:{server.server_port}/openai/v1"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake Groq chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--reply", default=DEFAULT_REPLY)
+    parser.add_argument("--chunk-delay", type=float, default=0.05,
+                        help="seconds between streamed chunks")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds before each response")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before 429s (0 = unlimited)")
+    parser.add_argument("--fail-first", type=int, default=0, help="answer the first N requests with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after for injected 429s")
+    args = parser.parse_args()
+
+    server = start_server(args.host, args.port, args.reply, args.chunk_delay,
+                          args.latency, args.rpm, args.fail_first, args.retry_after)
+    print(f"Fake Groq listening at {server.base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,74 @@
+"""
+Local stand-in for the Scaledown SDK.
+
+Same surface services/compression.py uses (set_api_key,
+ScaleDownCompressor(compression_ratio).compress(text)), with adjustable
+latency and failures, so the compressor pool, circuit breaker and
+/api/compress/batch can be exercised without the real service:
+
+  SCALEDOWN_MODULE=tools.fake_scaledown SCALEDOWN_API_KEY=sd-local python app.py
+
+Behaviour (environment, or configure() from a script):
+  FAKE_SCALEDOWN_LATENCY    seconds per compress() call          (default 0)
+  FAKE_SCALEDOWN_FAIL_RATE  fraction of calls that raise, 0-1    (default 0)
+
+Compression keeps the first (1 - ratio) of each text's words.
+"""
+
+import os
+import time
+import random
+import threading
+
+_lock    = threading.Lock()
+_config  = {
+    "latency":   float(os.getenv("FAKE_SCALEDOWN_LATENCY", 0)),
+    "fail_rate": float(os.getenv("FAKE_SCALEDOWN_FAIL_RATE", 0)),
+}
+counters = {"calls": 0, "failures": 0, "instances": 0, "set_api_key": 0}
+api_key  = None
+
+
+class ScaleDownError(Exception):
+    pass
+
+
+def configure(latency: float = None, fail_rate: float = None) -> None:
+    if latency is not None:
+        _config["latency"] = latency
+    if fail_rate is not None:
+        _config["fail_rate"] = fail_rate
+
+
+def reset_counters() -> None:
+    with _lock:
+        for name in counters:
+            counters[name] = 0
+
+
+def set_api_key(key: str) -> None:
+    global api_key
+    api_key = key
+    with _lock:
+        counters["set_api_key"] += 1
+
+
+class ScaleDownCompressor:
+    def __init__(self, compression_ratio: float = 0.5):
+        self.compression_ratio = compression_ratio
+        with _lock:
+            counters["instances"] += 1
+
+    def compress(self, text: str) -> str:
+        with _lock:
+            counters["calls"] += 1
+        if _config["latency"]:
+            time.sleep(_config["latency"])
+        if random.random() < _config["fail_rate"]:
+            with _lock:
+                counters["failures"] += 1
+            raise ScaleDownError("fake Scaledown failure")
+
+        words = text.split()
+        keep  = max(1, round(len(words) * (1 - self.compression_ratio)))
+        return " ".join(words[:keep])
@@ -0,0 +1,26 @@
+"""
+AdmissAI India — production WSGI entry point.
+
+Builds the app and warms it up at import, so under gunicorn with
+preload_app (see gunicorn.conf.py) the catalog, indexes and prepared
+responses are built once in the master and shared copy-on-write by every
+forked worker.
+
+Run:
+  pip install gunicorn
+  gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import time
+
+_start = time.perf_counter()
+
+from app import create_app  # noqa: E402
+from services.warmup import record_phase, startup_phase, warmup  # noqa: E402
+
+record_phase("import", time.perf_counter() - _start)
+
+with startup_phase("create_app"):
+    app = create_app()
+
+warmup(app, freeze=True)